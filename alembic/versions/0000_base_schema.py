@@ -0,0 +1,112 @@
+"""Base schema (users, jobs, transcripts, supporting_documents)
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-19 16:10:00.000000
+
+These tables predate Alembic and used to be created by create_all() at app
+startup; this revision creates them as they were then, so `alembic upgrade
+head` alone builds a fresh database. Databases already at a later revision
+treat it as applied.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    tables = inspector.get_table_names()
+
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=True),
+            sa.Column('username', sa.String(), nullable=True),
+            sa.Column('hashed_password', sa.String(), nullable=True),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('last_login', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('total_uploads', sa.Integer(), nullable=True),
+            sa.Column('total_completed', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+        op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    else:
+        # Lifetime counters were added by a startup ALTER before migrations covered them
+        user_cols = [c['name'] for c in inspector.get_columns('users')]
+        if 'total_uploads' not in user_cols:
+            op.add_column('users', sa.Column('total_uploads', sa.Integer(), nullable=True, server_default='0'))
+        if 'total_completed' not in user_cols:
+            op.add_column('users', sa.Column('total_completed', sa.Integer(), nullable=True, server_default='0'))
+
+    if 'jobs' not in tables:
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('original_filename', sa.String(), nullable=False),
+            sa.Column('storage_path', sa.String(), nullable=False),
+            sa.Column('duration_seconds', sa.Integer(), nullable=True),
+            sa.Column('file_size_bytes', sa.BigInteger(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('client_name', sa.String(), nullable=True),
+            sa.Column('client_surname', sa.String(), nullable=True),
+            sa.Column('service_type', sa.String(), nullable=True),
+            sa.Column('date_of_birth', sa.DateTime(), nullable=True),
+            sa.Column('login_date', sa.DateTime(), nullable=True),
+            sa.Column('phone_number', sa.String(), nullable=True),
+            sa.Column('payment', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'transcripts' not in tables:
+        op.create_table(
+            'transcripts',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('job_id', sa.String(), nullable=False),
+            sa.Column('text_content', sa.Text(), nullable=False),
+            sa.Column('json_metadata', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('job_id')
+        )
+
+    if 'supporting_documents' not in tables:
+        op.create_table(
+            'supporting_documents',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('job_id', sa.String(), nullable=False),
+            sa.Column('original_filename', sa.String(), nullable=False),
+            sa.Column('storage_path', sa.String(), nullable=False),
+            sa.Column('file_size_bytes', sa.BigInteger(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_supporting_documents_job_id'), 'supporting_documents', ['job_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_supporting_documents_job_id'), table_name='supporting_documents')
+    op.drop_table('supporting_documents')
+    op.drop_table('transcripts')
+    op.drop_table('jobs')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
@@ -1,7 +1,7 @@
 """Add Shared Audio Queue
 
 Revision ID: 0001
-Revises: 
+Revises: 0000
 Create Date: 2026-08-17 21:20:00.000000
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '0001'
-down_revision = None
+down_revision = '0000'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,50 @@
+"""add_stored_objects
+
+Revision ID: 05a754e4f374
+Revises: eb2ec6c3e49c
+Create Date: 2026-10-19 11:26:02.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05a754e4f374'
+down_revision: Union[str, Sequence[str], None] = 'eb2ec6c3e49c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if not inspector.has_table('stored_objects'):
+        op.create_table(
+            'stored_objects',
+            sa.Column('sha256', sa.String(length=64), nullable=False),
+            sa.Column('storage_path', sa.String(), nullable=False),
+            sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+            sa.Column('mime_type', sa.String(), nullable=True),
+            sa.Column('ref_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('sha256'),
+            sa.UniqueConstraint('storage_path')
+        )
+
+    us_cols = [c['name'] for c in inspector.get_columns('upload_sessions')] if inspector.has_table('upload_sessions') else []
+    if 'content_sha256' not in us_cols:
+        op.add_column('upload_sessions', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('upload_sessions') as batch_op:
+        batch_op.drop_column('content_sha256')
+    op.drop_table('stored_objects')
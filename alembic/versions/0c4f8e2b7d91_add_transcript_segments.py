@@ -0,0 +1,48 @@
+"""add_transcript_segments
+
+Revision ID: 0c4f8e2b7d91
+Revises: 6b0e9d3a4f17
+Create Date: 2026-10-19 19:20:04.612871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4f8e2b7d91'
+down_revision: Union[str, Sequence[str], None] = '6b0e9d3a4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Existing transcripts get their segment rows on first GET /jobs/{id}/segments
+    if not inspector.has_table('transcript_segments'):
+        op.create_table(
+            'transcript_segments',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('job_id', sa.String(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('start_ms', sa.Integer(), nullable=True),
+            sa.Column('end_ms', sa.Integer(), nullable=True),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('job_id', 'position', name='uq_transcript_segments_job_id_position')
+        )
+        op.create_index('ix_transcript_segments_job_id_start_ms', 'transcript_segments', ['job_id', 'start_ms'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcript_segments_job_id_start_ms', table_name='transcript_segments')
+    op.drop_table('transcript_segments')
@@ -0,0 +1,42 @@
+"""add_job_archival_fields
+
+Revision ID: 14804af4637b
+Revises: 05a754e4f374
+Create Date: 2026-10-19 12:40:51.337012
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '14804af4637b'
+down_revision: Union[str, Sequence[str], None] = '05a754e4f374'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    jobs_cols = [c['name'] for c in inspector.get_columns('jobs')] if inspector.has_table('jobs') else []
+    if 'original_storage_path' not in jobs_cols:
+        op.add_column('jobs', sa.Column('original_storage_path', sa.String(), nullable=True))
+    if 'archived_size_bytes' not in jobs_cols:
+        op.add_column('jobs', sa.Column('archived_size_bytes', sa.BigInteger(), nullable=True))
+    if 'archived_at' not in jobs_cols:
+        op.add_column('jobs', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('archived_at')
+        batch_op.drop_column('archived_size_bytes')
+        batch_op.drop_column('original_storage_path')
@@ -0,0 +1,38 @@
+"""add_waveform_peaks
+
+Revision ID: 3b9e1f7c52a8
+Revises: 14804af4637b
+Create Date: 2026-10-19 13:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f7c52a8'
+down_revision: Union[str, Sequence[str], None] = '14804af4637b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    for table in ('jobs', 'audio_queue'):
+        cols = [c['name'] for c in inspector.get_columns(table)] if inspector.has_table(table) else []
+        if 'waveform_peaks' not in cols:
+            op.add_column(table, sa.Column('waveform_peaks', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('audio_queue', 'jobs'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('waveform_peaks')
@@ -0,0 +1,40 @@
+"""add_transcript_docx_cache
+
+Revision ID: 4a7c2e9b1d63
+Revises: d93b6a0f2e58
+Create Date: 2026-10-19 20:31:15.840227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7c2e9b1d63'
+down_revision: Union[str, Sequence[str], None] = 'd93b6a0f2e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Existing transcripts render on their next download
+    transcript_cols = [c['name'] for c in inspector.get_columns('transcripts')] if inspector.has_table('transcripts') else []
+    if 'docx_path' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('docx_path', sa.String(), nullable=True))
+    if 'docx_sha256' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('docx_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('transcripts') as batch_op:
+        batch_op.drop_column('docx_sha256')
+        batch_op.drop_column('docx_path')
@@ -0,0 +1,46 @@
+"""add_transcript_body_storage
+
+Revision ID: 6b0e9d3a4f17
+Revises: f2d7a1c94b36
+Create Date: 2026-10-19 18:42:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b0e9d3a4f17'
+down_revision: Union[str, Sequence[str], None] = 'f2d7a1c94b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Existing rows keep their inline bodies (body_encoding NULL); scripts/compact_transcripts.py moves them
+    transcript_cols = [c['name'] for c in inspector.get_columns('transcripts')] if inspector.has_table('transcripts') else []
+    if 'body_encoding' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('body_encoding', sa.String(), nullable=True))
+    if 'body_blob' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('body_blob', sa.LargeBinary(), nullable=True))
+    if 'body_path' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('body_path', sa.String(), nullable=True))
+    if 'body_size' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('body_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('transcripts') as batch_op:
+        batch_op.drop_column('body_size')
+        batch_op.drop_column('body_path')
+        batch_op.drop_column('body_blob')
+        batch_op.drop_column('body_encoding')
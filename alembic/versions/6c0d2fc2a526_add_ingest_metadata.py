@@ -0,0 +1,54 @@
+"""add_ingest_metadata
+
+Revision ID: 6c0d2fc2a526
+Revises: 80466bf63a06
+Create Date: 2026-10-19 09:12:40.118205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c0d2fc2a526'
+down_revision: Union[str, Sequence[str], None] = '80466bf63a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    jobs_cols = [c['name'] for c in inspector.get_columns('jobs')] if inspector.has_table('jobs') else []
+    if 'mime_type' not in jobs_cols:
+        op.add_column('jobs', sa.Column('mime_type', sa.String(), nullable=True))
+    if 'content_sha256' not in jobs_cols:
+        op.add_column('jobs', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+    aq_cols = [c['name'] for c in inspector.get_columns('audio_queue')] if inspector.has_table('audio_queue') else []
+    if 'content_sha256' not in aq_cols:
+        op.add_column('audio_queue', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+    sd_cols = [c['name'] for c in inspector.get_columns('supporting_documents')] if inspector.has_table('supporting_documents') else []
+    if 'mime_type' not in sd_cols:
+        op.add_column('supporting_documents', sa.Column('mime_type', sa.String(), nullable=True))
+    if 'content_sha256' not in sd_cols:
+        op.add_column('supporting_documents', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('supporting_documents') as batch_op:
+        batch_op.drop_column('content_sha256')
+        batch_op.drop_column('mime_type')
+    with op.batch_alter_table('audio_queue') as batch_op:
+        batch_op.drop_column('content_sha256')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('content_sha256')
+        batch_op.drop_column('mime_type')
@@ -0,0 +1,63 @@
+"""add_upload_session_expiry
+
+Revision ID: 7e3a9c1f5b20
+Revises: 4a7c2e9b1d63
+Create Date: 2026-10-19 21:12:40.518307
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9c1f5b20'
+down_revision: Union[str, Sequence[str], None] = '4a7c2e9b1d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+# Open sessions get the default RESUMABLE_SESSION_TTL_HOURS from their last chunk
+BACKFILL_TTL = timedelta(hours=24)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if not inspector.has_table('upload_sessions'):
+        return
+
+    session_cols = [c['name'] for c in inspector.get_columns('upload_sessions')]
+    if 'expires_at' not in session_cols:
+        op.add_column('upload_sessions', sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    sessions = sa.table(
+        'upload_sessions',
+        sa.column('id', sa.String), sa.column('status', sa.String),
+        sa.column('updated_at', sa.DateTime), sa.column('expires_at', sa.DateTime)
+    )
+    stale = conn.execute(
+        sa.select(sessions.c.id, sessions.c.updated_at).where(
+            sessions.c.status == 'ACTIVE', sessions.c.expires_at.is_(None)
+        )
+    ).fetchall()
+    for session_id, updated_at in stale:
+        conn.execute(
+            sessions.update().where(sessions.c.id == session_id).values(
+                expires_at=(updated_at or datetime.utcnow()) + BACKFILL_TTL
+            )
+        )
+
+    if 'ix_upload_sessions_status_expires_at' not in [ix['name'] for ix in inspector.get_indexes('upload_sessions')]:
+        op.create_index('ix_upload_sessions_status_expires_at', 'upload_sessions', ['status', 'expires_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_upload_sessions_status_expires_at', table_name='upload_sessions')
+    with op.batch_alter_table('upload_sessions') as batch_op:
+        batch_op.drop_column('expires_at')
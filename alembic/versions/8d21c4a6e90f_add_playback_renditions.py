@@ -0,0 +1,45 @@
+"""add_playback_renditions
+
+Revision ID: 8d21c4a6e90f
+Revises: 3b9e1f7c52a8
+Create Date: 2026-10-19 13:48:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d21c4a6e90f'
+down_revision: Union[str, Sequence[str], None] = '3b9e1f7c52a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    jobs_cols = [c['name'] for c in inspector.get_columns('jobs')] if inspector.has_table('jobs') else []
+    if 'playback_path' not in jobs_cols:
+        op.add_column('jobs', sa.Column('playback_path', sa.String(), nullable=True))
+    if 'playback_hls_path' not in jobs_cols:
+        op.add_column('jobs', sa.Column('playback_hls_path', sa.String(), nullable=True))
+
+    queue_cols = [c['name'] for c in inspector.get_columns('audio_queue')] if inspector.has_table('audio_queue') else []
+    if 'playback_path' not in queue_cols:
+        op.add_column('audio_queue', sa.Column('playback_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('audio_queue') as batch_op:
+        batch_op.drop_column('playback_path')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('playback_hls_path')
+        batch_op.drop_column('playback_path')
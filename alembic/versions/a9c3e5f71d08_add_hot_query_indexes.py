@@ -0,0 +1,65 @@
+"""add_hot_query_indexes
+
+Revision ID: a9c3e5f71d08
+Revises: e1f4b8d27c65
+Create Date: 2026-10-19 15:37:19.644501
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e5f71d08'
+down_revision: Union[str, Sequence[str], None] = 'e1f4b8d27c65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+# (index name, table, columns) — as declared in app/db/models.py at this revision
+# (c2e6a8d04f71 later appends id to the two filtered job indexes)
+INDEXES = [
+    ('ix_jobs_user_id_created_at_id', 'jobs', ['user_id', 'created_at', 'id']),
+    ('ix_jobs_user_id_status_created_at', 'jobs', ['user_id', 'status', 'created_at']),
+    ('ix_jobs_user_id_service_type_created_at', 'jobs', ['user_id', 'service_type', 'created_at']),
+    ('ix_audio_queue_status_uploaded_at_id', 'audio_queue', ['status', 'uploaded_at', 'id']),
+    ('ix_supporting_documents_job_id', 'supporting_documents', ['job_id']),
+]
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    is_postgres = conn.dialect.name == "postgresql"
+
+    missing = []
+    for name, table, columns in INDEXES:
+        if not inspector.has_table(table):
+            continue
+        if name not in [ix['name'] for ix in inspector.get_indexes(table)]:
+            missing.append((name, table, columns))
+
+    if is_postgres:
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction; writes keep flowing while it builds
+        with op.get_context().autocommit_block():
+            for name, table, columns in missing:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in missing:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""extend_job_filter_indexes
+
+Revision ID: c2e6a8d04f71
+Revises: 7e3a9c1f5b20
+Create Date: 2026-10-19 21:48:03.271964
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e6a8d04f71'
+down_revision: Union[str, Sequence[str], None] = '7e3a9c1f5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+# The filtered job listings order by (created_at, id): with id in the index
+# the keyset tie-break is read in index order instead of sorted per page.
+# (old name, new name, new columns) — must match app/db/models.py
+REPLACED = [
+    ('ix_jobs_user_id_status_created_at', 'ix_jobs_user_id_status_created_at_id',
+     ['user_id', 'status', 'created_at', 'id']),
+    ('ix_jobs_user_id_service_type_created_at', 'ix_jobs_user_id_service_type_created_at_id',
+     ['user_id', 'service_type', 'created_at', 'id']),
+]
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if not inspector.has_table('jobs'):
+        return
+    existing = [ix['name'] for ix in inspector.get_indexes('jobs')]
+
+    if conn.dialect.name == "postgresql":
+        # Build the replacement before dropping the old index, both without blocking writes
+        with op.get_context().autocommit_block():
+            for old, new, columns in REPLACED:
+                op.create_index(new, 'jobs', columns, postgresql_concurrently=True, if_not_exists=True)
+                op.drop_index(old, table_name='jobs', postgresql_concurrently=True, if_exists=True)
+    else:
+        for old, new, columns in REPLACED:
+            if new not in existing:
+                op.create_index(new, 'jobs', columns)
+            if old in existing:
+                op.drop_index(old, table_name='jobs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for old, new, columns in reversed(REPLACED):
+                op.create_index(old, 'jobs', columns[:-1], postgresql_concurrently=True, if_not_exists=True)
+                op.drop_index(new, table_name='jobs', postgresql_concurrently=True, if_exists=True)
+    else:
+        for old, new, columns in reversed(REPLACED):
+            op.create_index(old, 'jobs', columns[:-1])
+            op.drop_index(new, table_name='jobs')
@@ -0,0 +1,51 @@
+"""add_daily_job_stats
+
+Revision ID: c57a0e93d1b4
+Revises: 8d21c4a6e90f
+Create Date: 2026-10-19 14:22:05.771349
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c57a0e93d1b4'
+down_revision: Union[str, Sequence[str], None] = '8d21c4a6e90f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if not inspector.has_table('daily_job_stats'):
+        op.create_table(
+            'daily_job_stats',
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('uploaded', sa.Integer(), nullable=False),
+            sa.Column('completed', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('user_id', 'day')
+        )
+
+        # Seed the rollup from the jobs that still exist (one grouped pass)
+        if inspector.has_table('jobs'):
+            op.execute(
+                "INSERT INTO daily_job_stats (user_id, day, uploaded, completed) "
+                "SELECT user_id, date(created_at), COUNT(*), "
+                "SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END) "
+                "FROM jobs WHERE user_id IS NOT NULL AND created_at IS NOT NULL "
+                "GROUP BY user_id, date(created_at)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_job_stats')
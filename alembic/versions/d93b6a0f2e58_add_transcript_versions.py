@@ -0,0 +1,54 @@
+"""add_transcript_versions
+
+Revision ID: d93b6a0f2e58
+Revises: 0c4f8e2b7d91
+Create Date: 2026-10-19 19:58:41.273610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93b6a0f2e58'
+down_revision: Union[str, Sequence[str], None] = '0c4f8e2b7d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    transcript_cols = [c['name'] for c in inspector.get_columns('transcripts')] if inspector.has_table('transcripts') else []
+    if 'version' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    if 'body_version' not in transcript_cols:
+        op.add_column('transcripts', sa.Column('body_version', sa.Integer(), nullable=False, server_default='0'))
+
+    if not inspector.has_table('transcript_versions'):
+        op.create_table(
+            'transcript_versions',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('job_id', sa.String(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=True),
+            sa.Column('delta', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('job_id', 'version', name='uq_transcript_versions_job_id_version')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transcript_versions')
+    with op.batch_alter_table('transcripts') as batch_op:
+        batch_op.drop_column('body_version')
+        batch_op.drop_column('version')
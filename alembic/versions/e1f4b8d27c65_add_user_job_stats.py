@@ -0,0 +1,47 @@
+"""add_user_job_stats
+
+Revision ID: e1f4b8d27c65
+Revises: c57a0e93d1b4
+Create Date: 2026-10-19 14:51:40.208816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4b8d27c65'
+down_revision: Union[str, Sequence[str], None] = 'c57a0e93d1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if not inspector.has_table('user_job_stats'):
+        op.create_table(
+            'user_job_stats',
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('job_count', sa.Integer(), nullable=False),
+            sa.Column('duration_seconds', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+        if inspector.has_table('jobs'):
+            op.execute(
+                "INSERT INTO user_job_stats (user_id, job_count, duration_seconds) "
+                "SELECT user_id, COUNT(*), COALESCE(SUM(duration_seconds), 0) "
+                "FROM jobs WHERE user_id IS NOT NULL GROUP BY user_id"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_job_stats')
@@ -0,0 +1,59 @@
+"""add_upload_sessions
+
+Revision ID: eb2ec6c3e49c
+Revises: 6c0d2fc2a526
+Create Date: 2026-10-19 10:03:17.552081
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eb2ec6c3e49c'
+down_revision: Union[str, Sequence[str], None] = '6c0d2fc2a526'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if not inspector.has_table('upload_sessions'):
+        op.create_table(
+            'upload_sessions',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('target', sa.String(), nullable=False),
+            sa.Column('original_filename', sa.String(), nullable=False),
+            sa.Column('storage_path', sa.String(), nullable=False),
+            sa.Column('mime_type', sa.String(), nullable=True),
+            sa.Column('duration_seconds', sa.Integer(), nullable=True),
+            sa.Column('total_size', sa.BigInteger(), nullable=False),
+            sa.Column('offset', sa.BigInteger(), nullable=False),
+            sa.Column('chunk_size', sa.Integer(), nullable=False),
+            sa.Column('backend_upload_id', sa.Text(), nullable=False),
+            sa.Column('parts', sa.JSON(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('job_id', sa.String(), nullable=True),
+            sa.Column('queue_item_id', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+            sa.ForeignKeyConstraint(['queue_item_id'], ['audio_queue.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_upload_sessions_user_id'), 'upload_sessions', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_sessions_user_id'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,73 @@
+"""add_job_search_index
+
+Revision ID: f2d7a1c94b36
+Revises: a9c3e5f71d08
+Create Date: 2026-10-19 18:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d7a1c94b36'
+down_revision: Union[str, Sequence[str], None] = 'a9c3e5f71d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+from sqlalchemy.engine.reflection import Inspector
+from app.core.config import settings
+
+_LEDGER = (
+    "concat_ws(' ', j.client_name, j.client_surname, j.service_type, "
+    "j.phone_number, j.payment, j.original_filename)"
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if inspector.has_table('job_search'):
+        return
+
+    if conn.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE job_search ("
+            "job_id VARCHAR PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE, "
+            "user_id VARCHAR NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        )
+        # Backfill before building the GIN index (one bulk build instead of per-row updates)
+        conn.execute(sa.text(
+            "INSERT INTO job_search (job_id, user_id, document) "
+            "SELECT j.id, j.user_id, "
+            f"setweight(to_tsvector(CAST(:cfg AS regconfig), {_LEDGER}), 'A') || "
+            "setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(t.text_content, '')), 'B') "
+            "FROM jobs j LEFT JOIN transcripts t ON t.job_id = j.id"
+        ), {"cfg": settings.SEARCH_TS_CONFIG})
+        op.execute("CREATE INDEX ix_job_search_document ON job_search USING GIN (document)")
+        op.execute("CREATE INDEX ix_job_search_user_id ON job_search (user_id)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE job_search USING fts5("
+            "job_id UNINDEXED, user_id UNINDEXED, ledger, transcript, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO job_search (job_id, user_id, ledger, transcript) "
+            "SELECT j.id, j.user_id, "
+            "trim(coalesce(j.client_name, '') || ' ' || coalesce(j.client_surname, '') || ' ' || "
+            "coalesce(j.service_type, '') || ' ' || coalesce(j.phone_number, '') || ' ' || "
+            "coalesce(j.payment, '') || ' ' || j.original_filename), "
+            "coalesce(t.text_content, '') "
+            "FROM jobs j LEFT JOIN transcripts t ON t.job_id = j.id"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS job_search")
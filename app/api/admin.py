@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case
 from typing import List
 
 from app.db.base import get_db
-from app.db.models import User, Job
-from app.api.auth import get_current_user
+from app.db.models import User, Job, DailyJobStat, UserJobStat
+from app.services.stats import stats_service
+from app.core.config import settings
+from app.api.auth import get_current_user, invalidate_cached_user
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -25,28 +27,31 @@ def get_user_stats(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Query stats
-    # We want: User.username, Count(Job.id), Sum(Job.duration_seconds)
-    # Users who have valid username (i.e. real login users)
+    # One query for all users: the materialized totals, or a LEFT JOIN + GROUP BY over jobs
+    rows = stats_service.user_totals(db, materialized=settings.ADMIN_USER_STATS_MATERIALIZED)
     
-    users = db.query(User).filter(User.username != None).all()
-    
-    stats = []
-    for u in users:
-        job_count = db.query(Job).filter(Job.user_id == u.id).count()
-        # duration is in seconds.
-        duration_seconds = db.query(func.sum(Job.duration_seconds)).filter(Job.user_id == u.id).scalar() or 0
-        minutes = round(duration_seconds / 60, 2)
-        
-        stats.append(UserStat(
-            username=u.username,
+    return [
+        UserStat(
+            username=username,
             upload_count=job_count,
-            transcribed_minutes=minutes,
-            last_login=str(u.last_login) if u.last_login else None,
-            is_admin=u.is_admin
-        ))
-        
-    return stats
+            transcribed_minutes=round((duration_seconds or 0) / 60, 2),  # duration is in seconds
+            last_login=str(last_login) if last_login else None,
+            is_admin=is_admin
+        )
+        for username, last_login, is_admin, job_count, duration_seconds in rows
+    ]
+
+@router.post("/users/stats/rebuild")
+def rebuild_user_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute the materialized per-user totals from jobs."""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    users = stats_service.rebuild_user_totals(db)
+    db.commit()
+    return {"message": "User stats rebuilt", "users": users}
 
 class CreateUserRequest(BaseModel):
     username: str
@@ -96,8 +101,11 @@ def delete_user(
     if user_to_delete.is_admin:
         raise HTTPException(status_code=403, detail="Cannot delete administrator accounts")
     
+    db.query(DailyJobStat).filter(DailyJobStat.user_id == user_to_delete.id).delete(synchronize_session=False)
+    db.query(UserJobStat).filter(UserJobStat.user_id == user_to_delete.id).delete(synchronize_session=False)
     db.delete(user_to_delete)
     db.commit()
+    invalidate_cached_user(user_to_delete.id)
     return {"message": "User deleted successfully"}
 
 @router.post("/users/{username}/reset-tracker")
@@ -120,3 +128,40 @@ def reset_tracker(
     user_to_reset.total_completed = 0
     db.commit()
     return {"message": "Tracker reset successfully"}
+
+class ArchivalReport(BaseModel):
+    archived_jobs: int
+    original_bytes: int
+    archived_bytes: int
+    egress_saved_per_playback_bytes: int  # Each full listen now streams the Opus copy instead of the original
+    originals_deleted: int
+    storage_saved_bytes: int  # Net: deleted originals minus the Opus copies added next to retained originals
+
+@router.get("/storage/archival", response_model=ArchivalReport)
+def get_archival_report(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    original_deleted = Job.original_storage_path == None
+    archived_jobs, original_bytes, archived_bytes, originals_deleted, storage_saved = db.query(
+        func.count(Job.id),
+        func.coalesce(func.sum(Job.file_size_bytes), 0),
+        func.coalesce(func.sum(Job.archived_size_bytes), 0),
+        func.coalesce(func.sum(case((original_deleted, 1), else_=0)), 0),
+        func.coalesce(func.sum(case(
+            (original_deleted, Job.file_size_bytes - Job.archived_size_bytes),
+            else_=-Job.archived_size_bytes
+        )), 0)
+    ).filter(Job.archived_at != None).one()
+
+    return ArchivalReport(
+        archived_jobs=archived_jobs,
+        original_bytes=original_bytes,
+        archived_bytes=archived_bytes,
+        egress_saved_per_playback_bytes=original_bytes - archived_bytes,
+        originals_deleted=originals_deleted,
+        storage_saved_bytes=storage_saved
+    )
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
 from app.db.models import User
 from app.core import security
 from app.core.config import settings
+from app.core.cache import user_cache
 
 router = APIRouter()
 
@@ -44,6 +48,7 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     # Update last_login timestamp
     user.last_login = datetime.now(timezone.utc)
     db.commit()
+    invalidate_cached_user(user.id)
     
     return {
         "access_token": access_token, 
@@ -52,22 +57,71 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         "username": user.username
     }
 
-# Dependency for other routes
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+# Fields kept in the user cache — no password hash, and no counters (those change per job)
+_CACHED_USER_FIELDS = ("id", "username", "email", "is_admin")
+_CACHED_USER_DATETIMES = ("last_login", "created_at")
+
+def _user_snapshot(user: User) -> dict:
+    snapshot = {field: getattr(user, field) for field in _CACHED_USER_FIELDS}
+    for field in _CACHED_USER_DATETIMES:
+        value = getattr(user, field)
+        snapshot[field] = value.isoformat() if value else None
+    return snapshot
+
+def _user_from_snapshot(snapshot: dict) -> User:
+    """A detached User carrying the cached identity fields (not attached to any session)."""
+    fields = {field: snapshot.get(field) for field in _CACHED_USER_FIELDS}
+    for field in _CACHED_USER_DATETIMES:
+        value = snapshot.get(field)
+        fields[field] = datetime.fromisoformat(value) if value else None
+    return User(**fields)
+
+def invalidate_cached_user(user_id: str):
+    """Call after deleting a user or changing their password or admin flag."""
+    user_cache.delete(user_id)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_identity(token: str) -> Tuple[str, Optional[str], Optional[User]]:
+    """(username, user_id, cached user or None) from a bearer token; raises 401 when invalid."""
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.username == username).first()
+        raise _credentials_exception()
+
+    # Tokens carry the user id: serve the user from the cache without touching the DB
+    user_id = payload.get("user_id")
+    if user_id:
+        snapshot = user_cache.get(user_id)
+        if snapshot and snapshot.get("username") == username:
+            return username, user_id, _user_from_snapshot(snapshot)
+    return username, user_id, None
+
+def _checked_user(user: Optional[User], user_id: Optional[str]) -> User:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if user_id == user.id:
+        user_cache.set(user.id, _user_snapshot(user))
     return user
+
+# Dependency for other routes
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    username, user_id, cached = _token_identity(token)
+    if cached:
+        return cached
+    return _checked_user(db.query(User).filter(User.username == username).first(), user_id)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async routes: the lookup on a cache miss doesn't take a threadpool slot."""
+    username, user_id, cached = _token_identity(token)
+    if cached:
+        return cached
+    return _checked_user(await db.scalar(select(User).where(User.username == username)), user_id)
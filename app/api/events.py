@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.db.models import User
+from app.api.auth import get_current_user_async
+from app.services.events import event_bus
+
+router = APIRouter()
+
+@router.get("/stream")
+async def event_stream(
+    user: User = Depends(get_current_user_async),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event (sent automatically on reconnect)")
+):
+    """
+    Server-Sent Events: queue.added / queue.claimed for the shared queue,
+    job.status / job.removed for the caller's jobs, and resync
+    when the client was away too long to replay what it missed.
+    """
+    if not event_bus.enabled:
+        raise HTTPException(status_code=503, detail="Live updates are not configured")
+    return StreamingResponse(
+        event_bus.stream(user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
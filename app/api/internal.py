@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
 
 from app.core.config import settings
-from app.db.base import get_db
+from app.db.base import get_db, dialect_insert
 from app.db.models import AudioQueueItem, AudioQueueStatus
+from app.workers.tasks import prepare_queue_item_media
+from app.api.queue import invalidate_queue_count
+from app.services.events import QUEUE_STREAM, event_bus
 
 router = APIRouter()
 security = HTTPBearer()
@@ -37,6 +42,87 @@ class APIngestPayload(BaseModel):
     artist: Optional[str] = None
     note: Optional[str] = None
 
+def upsert_queue_items(db: Session, payloads: List[APIngestPayload]) -> List[Tuple[str, str, bool]]:
+    """
+    Insert AP items, skipping (source, source_upload_id) pairs that already
+    exist, with one INSERT ... ON CONFLICT DO NOTHING RETURNING per
+    INGEST_BATCH_CHUNK_ROWS rows (no SELECT-then-INSERT); the unique constraint settles concurrent
+    ingests of the same upload. Returns (queue_item_id, status, duplicate)
+    per payload, in order. The caller commits.
+    """
+    insert = dialect_insert(db.get_bind())
+    now = datetime.now(timezone.utc)
+    resolved = {}  # (source, source_upload_id) -> (queue_item_id, status, duplicate)
+    rows = []
+    for payload in payloads:
+        key = (payload.source, payload.source_upload_id)
+        if key in resolved:
+            continue
+        resolved[key] = None
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "source": payload.source,
+            "source_upload_id": payload.source_upload_id,
+            "title": payload.title,
+            "artist": payload.artist,
+            "note": payload.note,
+            "original_filename": payload.filename,
+            "storage_path": payload.storage_key,
+            "file_size_bytes": payload.file_size,
+            "mime_type": payload.mime_type,
+            "duration_seconds": payload.duration,
+            "status": AudioQueueStatus.AVAILABLE.value,
+            "uploaded_at": now
+            # uploaded_by_id is null since it's anonymous from AP
+        })
+
+    # Core table + executemany: the statement is compiled once and SQLAlchemy's
+    # insertmanyvalues renders each chunk as a single multi-row INSERT ... RETURNING
+    table = AudioQueueItem.__table__
+    stmt = insert(table).on_conflict_do_nothing(
+        index_elements=[table.c.source, table.c.source_upload_id]
+    ).returning(table.c.id, table.c.source, table.c.source_upload_id, table.c.status)
+    chunk_rows = settings.INGEST_BATCH_CHUNK_ROWS
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        result = db.connection().execute(stmt.execution_options(insertmanyvalues_page_size=chunk_rows), chunk)
+        for item_id, source, source_upload_id, item_status in result:
+            resolved[(source, source_upload_id)] = (item_id, item_status, False)
+
+        # Conflicts: report the item that was already there
+        missing = [(row["source"], row["source_upload_id"]) for row in chunk if resolved[(row["source"], row["source_upload_id"])] is None]
+        if missing:
+            existing = db.query(
+                AudioQueueItem.id, AudioQueueItem.source, AudioQueueItem.source_upload_id, AudioQueueItem.status
+            ).filter(
+                AudioQueueItem.source.in_(sorted({source for source, _ in missing})),
+                AudioQueueItem.source_upload_id.in_([upload_id for _, upload_id in missing])
+            )
+            for item_id, source, source_upload_id, item_status in existing:
+                if resolved.get((source, source_upload_id), ()) is None:
+                    resolved[(source, source_upload_id)] = (item_id, item_status, True)
+
+    results, seen = [], set()
+    for payload in payloads:
+        key = (payload.source, payload.source_upload_id)
+        item_id, item_status, duplicate = resolved[key]
+        # Repeats within the request are duplicates of its first occurrence
+        results.append((item_id, item_status, duplicate or key in seen))
+        seen.add(key)
+    return results
+
+def _queue_items_added(queue_item_ids: List[str]):
+    if not queue_item_ids:
+        return
+    invalidate_queue_count()
+    if len(queue_item_ids) == 1:
+        event_bus.queue_changed("queue.added", queue_item_ids[0])
+    else:
+        event_bus.publish(QUEUE_STREAM, "queue.added", count=len(queue_item_ids))
+    # Waveform peaks are computed off the request path
+    for queue_item_id in queue_item_ids:
+        prepare_queue_item_media.delay(queue_item_id)
+
 @router.post("/ingest/audio", response_model=dict)
 def ingest_audio(
     payload: APIngestPayload,
@@ -44,49 +130,98 @@ def ingest_audio(
     token: str = Depends(verify_ingest_token)
 ):
     try:
-        # Check idempotency
-        existing_item = db.query(AudioQueueItem).filter(
-            AudioQueueItem.source == payload.source,
-            AudioQueueItem.source_upload_id == payload.source_upload_id
-        ).first()
-
-        if existing_item:
-            return {
-                "success": True,
-                "queue_item_id": existing_item.id,
-                "status": existing_item.status,
-                "duplicate": True
-            }
-
-        # Create new item
-        new_item = AudioQueueItem(
-            source=payload.source,
-            source_upload_id=payload.source_upload_id,
-            title=payload.title,
-            artist=payload.artist,
-            note=payload.note,
-            original_filename=payload.filename,
-            storage_path=payload.storage_key,
-            file_size_bytes=payload.file_size,
-            mime_type=payload.mime_type,
-            duration_seconds=payload.duration,
-            status=AudioQueueStatus.AVAILABLE.value,
-            uploaded_at=datetime.now(timezone.utc)
-            # uploaded_by_id is null since it's anonymous from AP
-        )
-        
-        db.add(new_item)
+        (queue_item_id, item_status, duplicate), = upsert_queue_items(db, [payload])
         db.commit()
-        db.refresh(new_item)
-        
+        if not duplicate:
+            _queue_items_added([queue_item_id])
+
         return {
             "success": True,
-            "queue_item_id": new_item.id,
-            "status": new_item.status,
-            "duplicate": False
+            "queue_item_id": queue_item_id,
+            "status": item_status,
+            "duplicate": duplicate
         }
     except Exception as e:
         db.rollback()
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+
+async def batch_documents(request: Request) -> List:
+    """
+    The batch's items: a JSON array, or NDJSON (one object per line).
+    Unparseable NDJSON lines become None and are reported per item.
+    """
+    text = (await request.body()).decode("utf-8-sig").strip()
+    if "ndjson" not in request.headers.get("content-type", "") and text.startswith("["):
+        try:
+            documents = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body is not valid JSON")
+        if not isinstance(documents, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of items")
+    else:
+        documents = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                documents.append(json.loads(line))
+            except ValueError:
+                documents.append(None)
+
+    if len(documents) > settings.INGEST_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.INGEST_BATCH_MAX_ITEMS} items per batch"
+        )
+    return documents
+
+@router.post("/ingest/audio/batch", response_model=dict)
+def ingest_audio_batch(
+    token: str = Depends(verify_ingest_token),
+    documents: List = Depends(batch_documents),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk form of /ingest/audio for back-fills: a JSON array or NDJSON body of
+    the same items, inserted together. Returns one result per item, in order;
+    invalid items are reported without failing the rest.
+    """
+    results = [None] * len(documents)
+    valid = []
+    for index, document in enumerate(documents):
+        try:
+            valid.append((index, APIngestPayload.model_validate(document)))
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+            results[index] = {"index": index, "success": False, "error": error}
+
+    if valid:
+        try:
+            upserted = upsert_queue_items(db, [payload for _, payload in valid])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+
+        for (index, payload), (queue_item_id, item_status, duplicate) in zip(valid, upserted):
+            results[index] = {
+                "index": index,
+                "success": True,
+                "source_upload_id": payload.source_upload_id,
+                "queue_item_id": queue_item_id,
+                "status": item_status,
+                "duplicate": duplicate
+            }
+        _queue_items_added([results[index]["queue_item_id"] for index, _ in valid if not results[index]["duplicate"]])
+
+    return {
+        "success": True,
+        "created": sum(1 for result in results if result["success"] and not result["duplicate"]),
+        "duplicates": sum(1 for result in results if result["success"] and result["duplicate"]),
+        "failed": sum(1 for result in results if not result["success"]),
+        "results": results
+    }
@@ -1,73 +1,78 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, load_only
+from typing import List, Optional, Dict, Literal
 import uuid
 import os
-from io import BytesIO
-from docx import Document
-from fastapi.responses import StreamingResponse, Response
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import EmailStr, BaseModel
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
 from app.db.models import Job, JobStatus, Transcript, User, SupportingDocument
 from app.schemas import (
     JobCreate, JobResponse, UploadResponse, TranscriptResponse,
-    LedgerEntryUpdate, SupportingDocumentResponse
+    LedgerEntryUpdate, SupportingDocumentResponse, PlaybackSourceResponse, JobSummaryResponse,
+    JobSearchHit, JobSearchResponse, TranscriptSegmentResponse, TranscriptSegmentWindow,
+    TranscriptPatchRequest, TranscriptPatchResponse, TranscriptVersionSummary, TranscriptVersionResponse,
+    ExportBundleRequest, ExportBundleStatus
 )
 from app.services.storage import storage_service
-from app.workers.tasks import process_audio
-from app.api.auth import get_current_user
+from app.services.content_store import content_store
+from app.services.stats import stats_service
+from app.services.pagination import keyset_page
+from app.services.search import search_index
+from app.services.transcript_store import transcript_store
+from app.services.transcript_segments import split_like, transcript_segments
+from app.services.events import event_bus
+from app.services.exports import (
+    export_service, DOCX_MEDIA_TYPE, XLSX_MEDIA_TYPE, EXPORT_BATCH_ROWS, LEDGER_COLUMNS,
+    stream_csv, stream_ndjson, stream_xlsx
+)
+from app.workers.tasks import process_audio, refresh_transcript, render_docx_export, build_export_bundle
+from app.api.auth import get_current_user, get_current_user_async
+from app.api.playback import (
+    peaks_response, playback_object, playback_source, audio_media_type,
+    stream_stored_audio, signed_hls_playlist
+)
 from app.core.config import settings
 
 
-# Email Configuration — reads from centralized settings (which loads from .env)
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
+# Email Configuration — reads from centralized settings (which loads from .env).
+# fastapi-mail (and the redis/httpx stack it pulls in) is imported on first send, not at startup.
+_mail_conf = None
+
+def mail_config():
+    global _mail_conf
+    if _mail_conf is None:
+        from fastapi_mail import ConnectionConfig
+        _mail_conf = ConnectionConfig(
+            MAIL_USERNAME=settings.MAIL_USERNAME,
+            MAIL_PASSWORD=settings.MAIL_PASSWORD,
+            MAIL_FROM=settings.MAIL_FROM,
+            MAIL_PORT=settings.MAIL_PORT,
+            MAIL_SERVER=settings.MAIL_SERVER,
+            MAIL_STARTTLS=settings.MAIL_STARTTLS,
+            MAIL_SSL_TLS=settings.MAIL_SSL,
+            USE_CREDENTIALS=True,
+            VALIDATE_CERTS=True
+        )
+    return _mail_conf
 
 class EmailRequest(BaseModel):
     email: EmailStr
 
 class TranscriptUpdateRequest(BaseModel):
     text_content: str
-
-def generate_docx(job: Job) -> BytesIO:
-    document = Document()
-    document.add_heading(job.original_filename, 0)
-    
-    # Logic to populate document
-    # Safely access json_metadata, defaulting to empty dict if None
-    json_metadata = job.transcript.json_metadata or {}
-    segments = json_metadata.get("segments", [])
-    
-    if segments:
-        for seg in segments:
-            text = seg.get("text", "")
-            document.add_paragraph(text)
-    else:
-        # Fallback to plain text if no segments available
-        text_content = job.transcript.text_content or ""
-        for line in text_content.split('\n'):
-            if line.strip():
-                document.add_paragraph(line)
-                
-    buffer = BytesIO()
-    document.save(buffer)
-    buffer.seek(0)
-    return buffer
+    base_version: Optional[int] = None  # When set, the save is rejected (409) if someone saved since
 
 router = APIRouter()
 
+# /stats/daily serves at most a year per request
+MAX_DAILY_STATS_DAYS = 366
+
 @router.post("/upload", response_model=UploadResponse)
 def initiate_upload(
     file: UploadFile = File(...),
@@ -76,26 +81,32 @@ def initiate_upload(
 ):
     try:
         print(f"Starting upload for file: {file.filename}")
-        # Save file to local storage
-        saved_filename = storage_service.save_file(file.file, file.filename)
-        print(f"File saved successfully at: {saved_filename}")
+        # Stream to storage; size, hash and type are computed in the same pass,
+        # and identical content collapses onto one content-addressed object
+        ingested = content_store.store_upload(db, file.file, file.filename, file.content_type)
+        print(f"File saved successfully at: {ingested.storage_path}")
         
         # Create Job Record with login_date auto-set
         new_job = Job(
             user_id=user.id,
             original_filename=file.filename,
-            storage_path=saved_filename,
+            storage_path=ingested.storage_path,
+            file_size_bytes=ingested.size_bytes,
+            mime_type=ingested.mime_type,
+            content_sha256=ingested.sha256,
+            duration_seconds=ingested.duration_seconds,
             status=JobStatus.UPLOADED.value,
             login_date=datetime.now(timezone.utc)
         )
         db.add(new_job)
         
-        # Increment lifetime upload counter
-        user.total_uploads = (user.total_uploads or 0) + 1
+        # Lifetime upload counter + today's rollup row
+        stats_service.record_upload(db, user.id, duration_seconds=ingested.duration_seconds)
         
         db.commit()
         db.refresh(new_job)
         print(f"Job created successfully: {new_job.id}")
+        event_bus.job_status(user.id, new_job.id, new_job.status)
 
         return UploadResponse(
             upload_url="",
@@ -126,23 +137,39 @@ def start_processing(
     job.status = JobStatus.QUEUED.value
     db.commit()
     db.refresh(job)
+    event_bus.job_status(user.id, job.id, job.status)
 
     # Dispatch to Celery worker via Redis
     process_audio.delay(job_id)
 
     return job
 
-@router.get("/", response_model=List[JobResponse])
-def list_jobs(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-    skip: int = 0, 
-    limit: int = 100,
-    status: Optional[str] = Query(None, description="Filter by status"),
-    service_type: Optional[str] = Query(None, description="Filter by service type")
-):
-    query = db.query(Job).filter(Job.user_id == user.id)
-    
+def _list_load_options(fields: List[str]):
+    """
+    Loader options for a listing that serializes `fields`: only those columns
+    (plus the keyset key) are selected, and documents, when requested, arrive
+    in one batched SELECT ... WHERE job_id IN (...) for the whole page.
+    """
+    columns = {"id", "created_at"} | {f for f in fields if f in Job.__table__.columns}
+    options = [load_only(*[getattr(Job, c) for c in columns])]
+    if "supporting_documents" in fields:
+        options.append(selectinload(Job.supporting_documents))
+    return options
+
+def _parse_fields(view: str, fields: Optional[str]) -> Optional[List[str]]:
+    """None means the full JobResponse."""
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in JobResponse.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return ["id"] + [f for f in requested if f != "id"]
+    if view == "summary":
+        return list(JobSummaryResponse.model_fields)
+    return None
+
+def _filter_jobs(query, status: Optional[str], service_type: Optional[str]):
+    """The list filters, shared by the ledger list and its export."""
     if status == "TRASHED":
         query = query.filter(Job.status == JobStatus.TRASHED.value)
     elif status:
@@ -150,12 +177,63 @@ def list_jobs(
     else:
         # Default: everything NOT trashed
         query = query.filter(Job.status != JobStatus.TRASHED.value)
-    
+
     if service_type:
         query = query.filter(Job.service_type == service_type)
+    return query
+
+def _job_list_page(db: Session, user_id: str, selected: Optional[List[str]], cursor: Optional[str], skip: int,
+                   limit: int, status: Optional[str], service_type: Optional[str]):
+    """One page of the job list as (jobs, next_cursor); runs on the async session via run_sync."""
+    query = db.query(Job).filter(Job.user_id == user_id)
+    if selected is None:
+        query = query.options(selectinload(Job.supporting_documents))
+    else:
+        query = query.options(*_list_load_options(selected))
+    query = _filter_jobs(query, status, service_type)
+
+    if skip and not cursor:
+        return query.order_by(Job.created_at.desc(), Job.id.desc()).offset(skip).limit(limit).all(), None
+    # Keyset pagination on (created_at, id): deep pages cost the same as the first
+    return keyset_page(query, Job.created_at, Job.id, cursor, limit)
 
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
-    return jobs
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; ignored when cursor is given"),
+    limit: int = Query(100, ge=1, le=500),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    view: Literal["full", "summary"] = Query("full", description="summary: JobSummaryResponse rows, no documents"),
+    fields: Optional[str] = Query(None, description="Comma-separated JobResponse fields to return (sparse fieldset)")
+):
+    selected = _parse_fields(view, fields)
+    try:
+        jobs, next_cursor = await db.run_sync(
+            _job_list_page, user.id, selected, cursor, skip, limit, status, service_type
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if selected is None:
+        response.headers.update(headers)
+        return jobs
+
+    # Sparse rows: read only the loaded attributes so nothing lazy-loads per job
+    rows = []
+    for job in jobs:
+        row = {}
+        for field in selected:
+            if field == "supporting_documents":
+                row[field] = [SupportingDocumentResponse.model_validate(doc) for doc in job.supporting_documents]
+            else:
+                row[field] = getattr(job, field)
+        rows.append(row)
+    return JSONResponse(content=jsonable_encoder(rows), headers=headers)
 
 @router.get("/stats")
 def get_lifetime_stats(
@@ -163,45 +241,171 @@ def get_lifetime_stats(
     user: User = Depends(get_current_user)
 ):
     """Get lifetime upload/completion stats (survives permanent deletion)."""
+    # Read fresh: the authenticated user may come from the cache, which doesn't hold counters
+    total_uploads, total_completed = db.query(User.total_uploads, User.total_completed).filter(User.id == user.id).first() or (0, 0)
     return {
-        "total_ever": user.total_uploads or 0,
-        "completed_ever": user.total_completed or 0
+        "total_ever": total_uploads or 0,
+        "completed_ever": total_completed or 0
     }
 
 @router.get("/stats/daily")
 def get_daily_stats(
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+    start: Optional[date] = Query(None, description="First day (YYYY-MM-DD), defaults to 6 days before end"),
+    end: Optional[date] = Query(None, description="Last day (YYYY-MM-DD), defaults to today (UTC)")
+):
+    """Per-day upload/completion counts (default: last 7 days), read from the daily rollup."""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_DAILY_STATS_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_DAILY_STATS_DAYS} days")
+    return stats_service.daily_counts(db, user.id, start, end)
+
+_LEDGER_EXPORTS = {
+    "csv": ("text/csv; charset=utf-8", stream_csv),
+    "ndjson": ("application/x-ndjson", stream_ndjson),
+    "xlsx": (XLSX_MEDIA_TYPE, stream_xlsx),
+}
+
+@router.get("/export")
+def export_ledger(
+    format: Literal["csv", "ndjson", "xlsx"] = Query("csv"),
+    status: Optional[str] = Query(None, description="Same filter as the job list"),
+    service_type: Optional[str] = Query(None, description="Same filter as the job list"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Get per-day upload/completion counts for the last 7 days (includes all statuses)."""
-    now = datetime.now(timezone.utc)
-    days = []
-    for i in range(6, -1, -1):
-        day = now - timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        
-        uploaded = db.query(Job).filter(
-            Job.user_id == user.id,
-            Job.created_at >= day_start,
-            Job.created_at < day_end
-        ).count()
-        
-        completed = db.query(Job).filter(
-            Job.user_id == user.id,
-            Job.created_at >= day_start,
-            Job.created_at < day_end,
-            Job.status == JobStatus.COMPLETED.value
-        ).count()
-        
-        days.append({
-            "date": day_start.strftime("%Y-%m-%d"),
-            "label": day_start.strftime("%a"),
-            "uploaded": uploaded,
-            "completed": completed
-        })
-    
-    return days
+    """
+    Every ledger row matching the list filters, newest first, as one download.
+    Rows are read through a server-side cursor in batches and written out as
+    they arrive, so memory stays flat however many jobs the user has.
+    """
+    columns = [getattr(Job, column) for column in LEDGER_COLUMNS]
+    query = _filter_jobs(db.query(*columns).filter(Job.user_id == user.id), status, service_type)
+    query = query.order_by(Job.created_at.desc(), Job.id.desc()).yield_per(EXPORT_BATCH_ROWS)
+    media_type, writer = _LEDGER_EXPORTS[format]
+
+    def rows():
+        # Plain column tuples: nothing accumulates in the identity map. The
+        # request's session is already closed when the body streams; it reopens here
+        try:
+            yield from query
+        finally:
+            db.close()
+
+    filename = f"ledger-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        writer(LEDGER_COLUMNS, rows()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/export/bundle", response_model=ExportBundleStatus, responses={200: {"content": {"application/zip": {}}}})
+def export_bundle(
+    request: ExportBundleRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    One ZIP with the selected jobs' transcripts, supporting documents and
+    (optionally) original recordings. Small bundles stream back directly;
+    large ones (or background=true) are built by a worker and answered with
+    202 and a bundle id to poll.
+    """
+    job_ids = list(dict.fromkeys(request.job_ids))
+    owned = db.query(func.count(Job.id)).filter(Job.id.in_(job_ids), Job.user_id == user.id).scalar()
+    if owned != len(job_ids):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    background = request.background
+    if background is None:
+        background = export_service.bundle_size(db, job_ids, request.include_originals) > settings.EXPORT_BUNDLE_SYNC_MAX_BYTES
+    if background:
+        bundle_id = str(uuid.uuid4())
+        export_service.set_bundle_status(user.id, bundle_id, "pending")
+        build_export_bundle.delay(user.id, bundle_id, job_ids, request.include_originals)
+        return JSONResponse(status_code=202, content=ExportBundleStatus(bundle_id=bundle_id, status="pending").model_dump())
+
+    def body():
+        try:
+            yield from export_service.bundle(db, job_ids, request.include_originals)
+        finally:
+            db.close()
+
+    filename = f"export-{datetime.now(timezone.utc):%Y%m%d-%H%M}.zip"
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def _bundle_key(user: User, bundle_id: str) -> str:
+    try:
+        uuid.UUID(bundle_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export_service.bundle_key(user.id, bundle_id)
+
+@router.get("/export/bundle/{bundle_id}", response_model=ExportBundleStatus)
+def get_export_bundle(
+    bundle_id: str,
+    user: User = Depends(get_current_user)
+):
+    """Poll a background bundle; once ready, download_url points at the ZIP."""
+    key = _bundle_key(user, bundle_id)
+    marker = export_service.bundle_status(user.id, bundle_id)
+    if marker is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if marker.get("status") != "ready":
+        return ExportBundleStatus(bundle_id=bundle_id, status=marker.get("status", "pending"), error=marker.get("error"))
+    download_url = storage_service.signed_url(key, settings.EXPORT_BUNDLE_URL_TTL_SECONDS, "application/zip")
+    return ExportBundleStatus(bundle_id=bundle_id, status="ready", download_url=download_url)
+
+@router.get("/export/bundle/{bundle_id}/download")
+def download_export_bundle(
+    bundle_id: str,
+    user: User = Depends(get_current_user)
+):
+    """The finished bundle through the API, for backends that cannot sign URLs."""
+    key = _bundle_key(user, bundle_id)
+    try:
+        storage_service.object_size(key)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return StreamingResponse(
+        storage_service.iter_object(key),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="export-{bundle_id[:8]}.zip"'}
+    )
+
+@router.get("/search", response_model=JobSearchResponse)
+def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Full-text search over the user's transcripts and ledger fields, best matches first."""
+    hits, has_more = search_index.search(db, user.id, q, limit=limit, offset=offset)
+    items = [
+        JobSearchHit(
+            job_id=job.id,
+            original_filename=job.original_filename,
+            status=job.status,
+            created_at=job.created_at,
+            client_name=job.client_name,
+            client_surname=job.client_surname,
+            service_type=job.service_type,
+            rank=rank,
+            highlight=snippet
+        )
+        for job, rank, snippet in hits
+    ]
+    return JobSearchResponse(items=items, has_more=has_more, next_offset=offset + limit if has_more else None)
 
 @router.patch("/{job_id}", response_model=JobResponse)
 def update_ledger_entry(
@@ -219,11 +423,16 @@ def update_ledger_entry(
     update_dict = update_data.model_dump(exclude_unset=True)
     for field, value in update_dict.items():
         setattr(job, field, value)
+    search_index.index_job(db, job)
     
     db.commit()
     db.refresh(job)
     return job
 
+def _stored_paths(job: Job) -> List[str]:
+    """Every content-store object a job references: audio, archived original, rendition, documents."""
+    return [job.storage_path, job.original_storage_path, job.playback_path] + [doc.storage_path for doc in job.supporting_documents]
+
 @router.delete("/trash/all", status_code=204)
 def empty_trash(
     db: Session = Depends(get_db),
@@ -232,48 +441,106 @@ def empty_trash(
     """
     Permanently delete all jobs in TRASHED status.
     """
-    jobs_to_delete = db.query(Job).filter(
+    jobs_to_delete = db.query(Job).options(selectinload(Job.supporting_documents)).filter(
         Job.user_id == user.id, 
         Job.status == JobStatus.TRASHED.value
     ).all()
     
+    orphaned = []
+    hls_paths = []
+    transcript_paths = [
+        path for job in jobs_to_delete if job.transcript
+        for path in (job.transcript.body_path, job.transcript.docx_path) if path
+    ]
+    stats_service.record_deletion(db, jobs_to_delete)
+    search_index.remove_jobs(db, [job.id for job in jobs_to_delete])
+    transcript_segments.remove_jobs(db, [job.id for job in jobs_to_delete])
     for job in jobs_to_delete:
-        # Delete file from disk
-        storage_service.delete_file(job.storage_path)
-        # Delete supporting documents from disk
-        for doc in job.supporting_documents:
-            storage_service.delete_file(doc.storage_path)
-        # Delete from DB
+        paths = _stored_paths(job)
+        if job.playback_hls_path:
+            hls_paths.append(job.playback_hls_path)
+        # Delete from DB, then drop this job's references to the shared objects
         db.delete(job)
+        db.flush()
+        orphaned += content_store.release(db, *paths)
         
     db.commit()
+    event_bus.jobs_removed(user.id, [job.id for job in jobs_to_delete])
+    # Objects are only removed from storage once nothing references them
+    content_store.purge(db, orphaned)
+    transcript_store.discard(transcript_paths)
+    for hls_path in hls_paths:
+        storage_service.delete_prefix(hls_path.rsplit("/", 1)[0] + "/")
     return
 
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(
+async def get_job(
     job_id: str, 
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async)
 ):
-    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    job = await db.scalar(
+        select(Job).options(selectinload(Job.supporting_documents)).where(Job.id == job_id, Job.user_id == user.id)
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 @router.get("/{job_id}/transcript", response_model=TranscriptResponse)
-def get_transcript(
+async def get_transcript(
     job_id: str, 
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async)
+):
+    job = await db.scalar(
+        select(Job).options(selectinload(Job.transcript).options(*transcript_store.body_options()))
+        .where(Job.id == job_id, Job.user_id == user.id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not job.transcript:
+        raise HTTPException(status_code=404, detail="Transcript not ready")
+
+    text_content, json_metadata = await transcript_store.load_async(db, job.transcript)
+    return TranscriptResponse(id=job.transcript.id, text_content=text_content, json_metadata=json_metadata)
+
+def _segment_response(index: int, start_ms: Optional[int], end_ms: Optional[int], text: str) -> TranscriptSegmentResponse:
+    return TranscriptSegmentResponse(
+        index=index,
+        start=start_ms / 1000 if start_ms is not None else None,
+        end=end_ms / 1000 if end_ms is not None else None,
+        text=text
+    )
+
+@router.get("/{job_id}/segments", response_model=TranscriptSegmentWindow)
+def get_transcript_segments(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=1000),
+    at: Optional[float] = Query(None, ge=0, description="Seek: start the window at the segment playing at this second"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
+    """A bounded window of transcript segments, so the editor never loads the whole body at once."""
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
     if not job.transcript:
         raise HTTPException(status_code=404, detail="Transcript not ready")
-        
-    return job.transcript
+
+    if transcript_store.ensure_segments(db, job.transcript):
+        db.commit()
+    at_ms = int(at * 1000) if at is not None else None
+    total, offset, segments = transcript_segments.window(db, job_id, offset, limit, at_ms)
+    end = offset + len(segments)
+    return TranscriptSegmentWindow(
+        version=job.transcript.version,
+        total=total,
+        offset=offset,
+        next_offset=end if end < total else None,
+        items=[_segment_response(seg.position, seg.start_ms, seg.end_ms, seg.text) for seg in segments]
+    )
 
 @router.delete("/{job_id}", response_model=JobResponse)
 def delete_job(
@@ -289,6 +556,7 @@ def delete_job(
     job.status = JobStatus.TRASHED.value
     db.commit()
     db.refresh(job)
+    event_bus.job_status(user.id, job.id, job.status)
     return job
 
 @router.delete("/{job_id}/permanent", status_code=204)
@@ -301,15 +569,25 @@ def delete_job_permanent(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Delete audio file from disk
-    storage_service.delete_file(job.storage_path)
-    # Delete supporting documents from disk
-    for doc in job.supporting_documents:
-        storage_service.delete_file(doc.storage_path)
+    paths = _stored_paths(job)
+    hls_path = job.playback_hls_path
+    transcript_paths = [
+        path for path in (job.transcript.body_path, job.transcript.docx_path) if path
+    ] if job.transcript else []
+    stats_service.record_deletion(db, [job])
+    search_index.remove_jobs(db, [job.id])
+    transcript_segments.remove_jobs(db, [job.id])
     
-    # Delete from DB
+    # Delete from DB, then release the audio and supporting document objects
     db.delete(job)
+    db.flush()
+    orphaned = content_store.release(db, *paths)
     db.commit()
+    event_bus.jobs_removed(user.id, [job.id])
+    content_store.purge(db, orphaned)
+    transcript_store.discard(transcript_paths)
+    if hls_path:
+        storage_service.delete_prefix(hls_path.rsplit("/", 1)[0] + "/")
     return
 
 @router.post("/{job_id}/restore", response_model=JobResponse)
@@ -329,6 +607,7 @@ def restore_job(
         
     db.commit()
     db.refresh(job)
+    event_bus.job_status(user.id, job.id, job.status)
     return job
 
 @router.post("/{job_id}/email")
@@ -346,13 +625,16 @@ async def email_job(
         raise HTTPException(status_code=400, detail="Transcript not ready")
         
     try:
+        from fastapi_mail import FastMail, MessageSchema, MessageType
+
         # Generate plain text body
-        if job.transcript.json_metadata and "segments" in job.transcript.json_metadata:
-            segments = job.transcript.json_metadata["segments"]
+        text_content, json_metadata = transcript_store.load(job.transcript)
+        if json_metadata and json_metadata.get("segments"):
+            segments = json_metadata["segments"]
             body_text = "\n".join([s['text'] for s in segments])
         else:
             # Fallback
-            body_text = job.transcript.text_content or "No transcript available."
+            body_text = text_content or "No transcript available."
             
         message = MessageSchema(
             subject=f"Transcript: {job.original_filename}",
@@ -361,7 +643,7 @@ async def email_job(
             subtype=MessageType.plain
         )
         
-        fm = FastMail(conf)
+        fm = FastMail(mail_config())
         await fm.send_message(message)
         
         return {"message": "Email sent successfully"}
@@ -372,6 +654,7 @@ async def email_job(
 @router.get("/{job_id}/download")
 def download_job(
     job_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -381,15 +664,66 @@ def download_job(
     
     if not job.transcript:
         raise HTTPException(status_code=400, detail="Transcript not ready")
-        
-    buffer = generate_docx(job)
+
+    # The content hash decides staleness: a matching cached DOCX is fetched, not re-rendered
+    paragraphs, digest = export_service.docx_source(job)
     filename = f"{job.original_filename}.docx"
-    
-    return StreamingResponse(
-        buffer, 
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename={filename}"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    data = export_service.cached_docx(job, digest)
+    if data is None:
+        data, stale = export_service.store_docx(db, job, paragraphs, digest)
+        db.commit()
+        transcript_store.discard(stale)
+    return Response(content=data, media_type=DOCX_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/{job_id}/peaks")
+def get_job_peaks(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Downsampled waveform peaks so the player can render without fetching the audio."""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return peaks_response(request, job.waveform_peaks)
+
+
+@router.get("/{job_id}/playback", response_model=PlaybackSourceResponse)
+def get_job_playback(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Playback source for the player: the low-bitrate rendition when it exists, else the stored audio."""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    hls_url = request.url_for("get_job_hls_playlist", job_id=job.id).path if job.playback_hls_path else None
+    return playback_source(job, request.url_for("stream_audio", job_id=job.id).path, hls_url)
+
+
+@router.get("/{job_id}/hls/index.m3u8")
+def get_job_hls_playlist(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """HLS playlist with signed segment URLs (segments are fetched straight from the bucket)."""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job or not job.playback_hls_path:
+        raise HTTPException(status_code=404, detail="HLS rendition not available")
+    return signed_hls_playlist(job.playback_hls_path)
 
 
 @router.get("/{job_id}/audio")
@@ -399,89 +733,13 @@ def stream_audio(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Stream the original uploaded audio file for browser playback."""
+    """Stream the playback rendition (or the stored audio until one exists) with Range support."""
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Download from cloud storage to temp file
-    try:
-        file_path = storage_service.download_to_temp(job.storage_path)
-    except Exception as e:
-        print(f"Failed to download audio for streaming: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load audio file")
-    
-    # Determine MIME type from extension
-    ext = job.original_filename.rsplit(".", 1)[-1].lower() if "." in job.original_filename else "bin"
-    audio_mime_map = {
-        "mp3": "audio/mpeg",
-        "wav": "audio/wav",
-        "ogg": "audio/ogg",
-        "flac": "audio/flac",
-        "aac": "audio/aac",
-        "m4a": "audio/mp4",
-        "wma": "audio/x-ms-wma",
-        "webm": "audio/webm",
-        "mp4": "video/mp4",
-        "mkv": "video/x-matroska",
-        "avi": "video/x-msvideo",
-        "mov": "video/quicktime",
-    }
-    media_type = audio_mime_map.get(ext, "application/octet-stream")
-    
-    file_size = os.path.getsize(file_path)
-    
-    # Support Range header for seeking
-    range_header = request.headers.get("range")
-    if range_header:
-        # Parse "bytes=start-end"
-        range_spec = range_header.replace("bytes=", "")
-        parts = range_spec.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-        
-        if start >= file_size:
-            raise HTTPException(status_code=416, detail="Range not satisfiable")
-        
-        end = min(end, file_size - 1)
-        content_length = end - start + 1
-        
-        def iter_range():
-            with open(file_path, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk_size = min(8192, remaining)
-                    data = f.read(chunk_size)
-                    if not data:
-                        break
-                    remaining -= len(data)
-                    yield data
-        
-        return Response(
-            content=b"".join(iter_range()),
-            status_code=206,
-            media_type=media_type,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-            }
-        )
-    else:
-        # Full file response
-        def iterfile():
-            with open(file_path, "rb") as f:
-                yield from f
-        
-        return StreamingResponse(
-            iterfile(),
-            media_type=media_type,
-            headers={
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(file_size),
-            }
-        )
+
+    path, _ = playback_object(job)
+    return stream_stored_audio(request, path, audio_media_type(path))
 
 @router.put("/{job_id}/transcript", response_model=TranscriptResponse)
 def update_transcript(
@@ -490,7 +748,11 @@ def update_transcript(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Update transcript text content (from inline editor)."""
+    """
+    Update transcript text content (from inline editor). On a timed transcript
+    the new text is mapped back onto the existing segments, which keep their
+    timings, and saved like a PATCH of the segments it changed.
+    """
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -498,20 +760,120 @@ def update_transcript(
     if not job.transcript:
         raise HTTPException(status_code=404, detail="Transcript not found")
     
-    # Update text content
-    job.transcript.text_content = update_data.text_content
-    
-    # Rebuild segments from updated text if segments existed
-    if job.transcript.json_metadata and "segments" in job.transcript.json_metadata:
-        # Replace all segment text with the full updated text as a single segment
-        job.transcript.json_metadata = {
-            **job.transcript.json_metadata,
-            "segments": [{"text": update_data.text_content, "start": "00:00:00", "end": "--:--:--"}]
-        }
+    _, json_metadata = transcript_store.load(job.transcript)
+    transcript_store.ensure_segments(db, job.transcript)
+    version = transcript_store.bump_version(db, job.transcript, update_data.base_version)
+    if version is None:
+        raise HTTPException(status_code=409, detail="Transcript was changed by another save; reload it first")
+
+    segments = transcript_segments.ordered(db, job.id)
+    if any(segment.start_ms is not None for segment in segments):
+        texts = split_like([segment.text for segment in segments], " ", update_data.text_content)
+        edits = [
+            {"index": segment.position, "text": text}
+            for segment, text in zip(segments, texts) if text != segment.text
+        ]
+        transcript_segments.apply_edits(db, job.id, version, user.id, edits)
+        db.flush()
+        text_content, json_metadata = transcript_store.load(job.transcript)
+        stale = transcript_store.save(db, job.transcript, text_content, json_metadata, rebuild_segments=False)
+    else:
+        # Untimed transcripts are segmented by paragraph, so the save re-segments them;
+        # the replaced paragraphs are kept as this version's delta
+        transcript_segments.record_replacement(db, job.id, version, user.id)
+        text_content = update_data.text_content
+        stale = transcript_store.save(db, job.transcript, text_content, json_metadata)
+    search_index.index_job(db, job, text_content)
     
     db.commit()
-    db.refresh(job.transcript)
-    return job.transcript
+    transcript_store.discard(stale)
+    render_docx_export.delay(job.id)
+    return TranscriptResponse(id=job.transcript.id, text_content=text_content, json_metadata=json_metadata)
+
+@router.patch("/{job_id}/transcript", response_model=TranscriptPatchResponse)
+def patch_transcript(
+    job_id: str,
+    patch: TranscriptPatchRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Apply text edits to individual segments. Only the edited segment rows and a
+    small reverse delta are written; the stored body and search index catch up
+    in refresh_transcript once the edits settle.
+    """
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    transcript_store.ensure_segments(db, job.transcript)
+    version = transcript_store.bump_version(db, job.transcript, patch.base_version)
+    if version is None:
+        raise HTTPException(status_code=409, detail="Transcript was changed by another save; reload it first")
+    try:
+        changed = transcript_segments.apply_edits(
+            db, job.id, version, user.id, [edit.model_dump() for edit in patch.edits]
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+
+    refresh_transcript.apply_async((job.id, version), countdown=settings.TRANSCRIPT_REFRESH_DELAY_SECONDS)
+    return TranscriptPatchResponse(
+        version=version,
+        items=[_segment_response(seg.position, seg.start_ms, seg.end_ms, seg.text) for seg in changed]
+    )
+
+@router.get("/{job_id}/transcript/versions", response_model=List[TranscriptVersionSummary])
+def list_transcript_versions(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return [
+        TranscriptVersionSummary(
+            version=entry.version,
+            user_id=entry.user_id,
+            created_at=entry.created_at,
+            segments_changed=len(entry.delta["ops"]) if "ops" in entry.delta else None
+        )
+        for entry in transcript_segments.history(db, job.id)
+    ]
+
+@router.get("/{job_id}/transcript/versions/{version}", response_model=TranscriptVersionResponse)
+def get_transcript_version(
+    job_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Rebuild an earlier version of the transcript from the current segments and the stored deltas."""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    if not 0 <= version <= job.transcript.version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    if transcript_store.ensure_segments(db, job.transcript):
+        db.commit()
+    segments = transcript_segments.reconstruct(db, job.id, version)
+    timed = any(segment["start_ms"] is not None for segment in segments)
+    return TranscriptVersionResponse(
+        version=version,
+        text_content=(" " if timed else "\n").join(segment["text"] for segment in segments if segment["text"]),
+        segments=[
+            _segment_response(index, segment["start_ms"], segment["end_ms"], segment["text"])
+            for index, segment in enumerate(segments)
+        ]
+    )
 
 
 # =====================================================
@@ -532,19 +894,16 @@ def upload_supporting_document(
         raise HTTPException(status_code=404, detail="Job not found")
     
     try:
-        # Save to storage
-        saved_filename = storage_service.save_file(file.file, file.filename)
-        
-        # Get file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)
+        # Save to storage (size/hash/type measured while streaming, deduplicated by hash)
+        ingested = content_store.store_upload(db, file.file, file.filename, file.content_type)
         
         doc = SupportingDocument(
             job_id=job_id,
             original_filename=file.filename,
-            storage_path=saved_filename,
-            file_size_bytes=file_size,
+            storage_path=ingested.storage_path,
+            file_size_bytes=ingested.size_bytes,
+            mime_type=ingested.mime_type,
+            content_sha256=ingested.sha256,
             description=description
         )
         db.add(doc)
@@ -601,7 +960,7 @@ def download_supporting_document(
         "png": "image/png",
         "txt": "text/plain",
     }
-    media_type = mime_map.get(ext, "application/octet-stream")
+    media_type = doc.mime_type or mime_map.get(ext, "application/octet-stream")
     
     def iterfile():
         with open(file_path, "rb") as f:
@@ -632,11 +991,13 @@ def delete_supporting_document(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Delete file from storage
-    storage_service.delete_file(doc.storage_path)
+    storage_path = doc.storage_path
     
-    # Delete from DB
+    # Delete from DB; the object itself goes only if no other row shares it
     db.delete(doc)
+    db.flush()
+    orphaned = content_store.release(db, storage_path)
     db.commit()
+    content_store.purge(db, orphaned)
     return
 
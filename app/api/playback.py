@@ -0,0 +1,187 @@
+import hashlib
+import os
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import settings
+from app.services.media import PEAKS_PER_SECOND
+from app.services.storage import storage_service
+
+AUDIO_MIME_MAP = {
+    "opus": "audio/ogg",
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "ogg": "audio/ogg",
+    "flac": "audio/flac",
+    "aac": "audio/aac",
+    "m4a": "audio/mp4",
+    "wma": "audio/x-ms-wma",
+    "webm": "audio/webm",
+    "mp4": "video/mp4",
+    "mkv": "video/x-matroska",
+    "avi": "video/x-msvideo",
+    "mov": "video/quicktime",
+}
+
+
+def audio_media_type(storage_path: str, fallback: Optional[str] = None) -> str:
+    """MIME type from the stored object's extension (the rendition/Opus copy, not the upload name)."""
+    ext = storage_path.rsplit(".", 1)[-1].lower() if "." in storage_path else "bin"
+    return AUDIO_MIME_MAP.get(ext, fallback or "application/octet-stream")
+
+
+def playback_object(record) -> Tuple[str, bool]:
+    """Which object to play for a job or queue item: (path, is_rendition)."""
+    if getattr(record, "playback_path", None):
+        return record.playback_path, True
+    return record.storage_path, False
+
+
+def _parse_range(range_header: str, size: int) -> Tuple[int, int]:
+    """Parse a single 'bytes=start-end' / 'bytes=start-' / 'bytes=-suffix' range."""
+    spec = range_header.replace("bytes=", "").split(",")[0].strip()
+    first, _, last = spec.partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Range not satisfiable")
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def stream_stored_audio(request: Request, storage_path: str, media_type: str) -> Response:
+    """
+    Serve an audio object with Range support, reading only the requested
+    bytes from the bucket — seeking into a long recording never pulls the
+    whole file through the API first.
+    """
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=3600"}
+
+    if storage_path.startswith(("http://", "https://", "s3://")):
+        return _stream_downloaded(request, storage_path, media_type, headers)
+
+    try:
+        size = storage_service.object_size(storage_path)
+    except Exception as e:
+        print(f"Failed to stat audio for streaming: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load audio file")
+
+    range_header = request.headers.get("range")
+    if range_header and size:
+        start, end = _parse_range(range_header, size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            storage_service.iter_range(storage_path, start, end),
+            status_code=206, media_type=media_type, headers=headers
+        )
+
+    headers["Content-Length"] = str(size)
+    body = storage_service.iter_range(storage_path, 0, size - 1) if size else iter([b""])
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def _stream_downloaded(request: Request, storage_path: str, media_type: str, headers: dict) -> Response:
+    """External (AP ingest) URLs can't be range-read through the SDK: fetch once, then serve."""
+    try:
+        file_path = storage_service.download_to_temp(storage_path)
+    except Exception as e:
+        print(f"Failed to download audio for streaming: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load audio file")
+
+    size = os.path.getsize(file_path)
+    start, end = 0, size - 1
+    status_code = 200
+    range_header = request.headers.get("range")
+    if range_header and size:
+        start, end = _parse_range(range_header, size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = 206
+    headers["Content-Length"] = str(end - start + 1)
+
+    def iterfile():
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = f.read(min(64 * 1024, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    yield data
+        finally:
+            os.remove(file_path)
+
+    return StreamingResponse(iterfile(), status_code=status_code, media_type=media_type, headers=headers)
+
+
+def playback_source(record, audio_url: str, hls_url: Optional[str]) -> dict:
+    """
+    Where the browser should play from. A signed bucket URL lets <audio> stream
+    and seek with its own Range requests; audio_url (API proxy) is the fallback.
+    """
+    path, is_rendition = playback_object(record)
+    media_type = audio_media_type(path, getattr(record, "mime_type", None))
+    direct_url = None
+    if not path.startswith(("http://", "https://", "s3://")):
+        direct_url = storage_service.signed_url(path, settings.PLAYBACK_URL_TTL_SECONDS, media_type)
+    return {
+        "url": direct_url or audio_url,
+        "direct": direct_url is not None,
+        "media_type": media_type,
+        "is_rendition": is_rendition,
+        "hls_url": hls_url,
+    }
+
+
+def signed_hls_playlist(playlist_path: str) -> Response:
+    """Rewrite a stored VOD playlist so each segment line is a short-lived signed URL."""
+    try:
+        playlist = storage_service.read_text(playlist_path)
+    except Exception as e:
+        print(f"Failed to read HLS playlist {playlist_path}: {e}")
+        raise HTTPException(status_code=404, detail="HLS rendition not available")
+
+    prefix = playlist_path.rsplit("/", 1)[0]
+    lines = []
+    for line in playlist.splitlines():
+        if line and not line.startswith("#"):
+            signed = storage_service.signed_url(f"{prefix}/{line}", settings.PLAYBACK_URL_TTL_SECONDS)
+            if not signed:
+                raise HTTPException(status_code=501, detail="Storage credentials cannot sign segment URLs")
+            line = signed
+        lines.append(line)
+    return Response(
+        content="\n".join(lines) + "\n",
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "private, no-store"}
+    )
+
+
+def peaks_response(request: Request, peaks: Optional[bytes]) -> Response:
+    """
+    Serve a precomputed waveform as raw uint8 peaks (one per 1/PEAKS_PER_SECOND s).
+    Peaks never change for a given recording, so browsers may cache them and
+    revalidate with If-None-Match.
+    """
+    if not peaks:
+        raise HTTPException(status_code=404, detail="Waveform not available yet")
+
+    etag = f'"{hashlib.sha256(peaks).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=86400",
+        "X-Peaks-Per-Second": str(PEAKS_PER_SECOND),
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=peaks, media_type="application/octet-stream", headers=headers)
@@ -1,36 +1,70 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
 from fastapi.responses import StreamingResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import os
+from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
 from app.db.models import AudioQueueItem, AudioQueueStatus, Job, JobStatus, User
-from app.schemas import AudioQueueItemResponse, JobResponse, AudioQueueListResponse
-from app.api.auth import get_current_user
+from app.schemas import AudioQueueItemResponse, JobResponse, AudioQueueListResponse, PlaybackSourceResponse
+from app.api.auth import get_current_user, get_current_user_async
 from app.services.storage import storage_service
-from app.workers.tasks import process_audio
+from app.services.content_store import content_store
+from app.services.stats import stats_service
+from app.services.pagination import keyset_page
+from app.core.cache import count_cache
+from app.services.events import event_bus
+from app.workers.tasks import process_audio, prepare_queue_item_media
+from app.api.playback import peaks_response, playback_object, playback_source, audio_media_type, stream_stored_audio
 
 router = APIRouter()
 
+QUEUE_AVAILABLE_COUNT_KEY = "queue:available"
+
+def invalidate_queue_count():
+    """Call whenever an item enters or leaves AVAILABLE."""
+    count_cache.delete(QUEUE_AVAILABLE_COUNT_KEY)
+
+def _available_count(db: Session) -> int:
+    total = count_cache.get(QUEUE_AVAILABLE_COUNT_KEY)
+    if total is None:
+        total = db.query(func.count(AudioQueueItem.id)).filter(
+            AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value
+        ).scalar()
+        count_cache.set(QUEUE_AVAILABLE_COUNT_KEY, total)
+    return total
+
+def _available_page(db: Session, cursor: Optional[str], skip: int, limit: int, include_total: bool):
+    query = db.query(AudioQueueItem).filter(AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value)
+    if skip and not cursor:
+        items = query.order_by(AudioQueueItem.uploaded_at.desc(), AudioQueueItem.id.desc()).offset(skip).limit(limit).all()
+        next_cursor = None
+    else:
+        items, next_cursor = keyset_page(query, AudioQueueItem.uploaded_at, AudioQueueItem.id, cursor, limit)
+    return items, next_cursor, _available_count(db) if include_total else None
+
 @router.get("/", response_model=AudioQueueListResponse)
-def list_queue_items(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+async def list_queue_items(
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; ignored when cursor is given"),
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = Query(True, description="Include the (cached) count of available items")
 ):
-    query = db.query(AudioQueueItem).filter(AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value)
-    
-    total = query.count()
-    items = query.order_by(AudioQueueItem.uploaded_at.desc()).offset(skip).limit(limit).all()
+    try:
+        items, next_cursor, total = await db.run_sync(_available_page, cursor, skip, limit, include_total)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
     validated_items = [AudioQueueItemResponse.model_validate(item) for item in items]
     
     return AudioQueueListResponse(
         items=validated_items,
-        total=total
+        total=total,
+        next_cursor=next_cursor
     )
 
 @router.get("/{queue_item_id}", response_model=AudioQueueItemResponse)
@@ -55,20 +89,16 @@ def upload_to_queue(
     user: User = Depends(get_current_user)
 ):
     try:
-        saved_filename = storage_service.save_file(file.file, file.filename)
-        
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
-        
-        # In a more advanced implementation, we could probe the file here using FFmpeg
-        # to extract duration and exact mime type before saving to DB.
+        # Size, SHA-256, sniffed MIME type (and WAV duration) come from the upload pass itself
+        ingested = content_store.store_upload(db, file.file, file.filename, file.content_type)
         
         new_item = AudioQueueItem(
             original_filename=file.filename,
-            storage_path=saved_filename,
-            file_size_bytes=file_size,
-            mime_type=file.content_type,
+            storage_path=ingested.storage_path,
+            file_size_bytes=ingested.size_bytes,
+            mime_type=ingested.mime_type,
+            content_sha256=ingested.sha256,
+            duration_seconds=ingested.duration_seconds,
             status=AudioQueueStatus.AVAILABLE.value,
             uploaded_by_id=user.id,
             uploaded_at=datetime.now(timezone.utc)
@@ -76,6 +106,11 @@ def upload_to_queue(
         db.add(new_item)
         db.commit()
         db.refresh(new_item)
+
+        invalidate_queue_count()
+        event_bus.queue_changed("queue.added", new_item.id)
+        # Waveform peaks are computed off the request path
+        prepare_queue_item_media.delay(new_item.id)
         
         return new_item
     except Exception as e:
@@ -83,6 +118,103 @@ def upload_to_queue(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+def _claim_into_job(db: Session, item: AudioQueueItem, user: User) -> dict:
+    """Turn an item already marked CLAIMED for `user` into their job; commits and dispatches it."""
+    # Create Personal Transcription Job
+    new_job = Job(
+        user_id=user.id,
+        original_filename=item.original_filename,
+        storage_path=item.storage_path, # Copied for convenience
+        file_size_bytes=item.file_size_bytes,
+        mime_type=item.mime_type,
+        content_sha256=item.content_sha256,
+        duration_seconds=item.duration_seconds,
+        waveform_peaks=item.waveform_peaks,
+        playback_path=item.playback_path,
+        queue_item_id=item.id,
+        status=JobStatus.QUEUED.value,
+        login_date=datetime.now(timezone.utc)
+    )
+    db.add(new_job)
+    
+    # The job shares the queue item's audio object (and its playback rendition)
+    content_store.acquire(db, item.storage_path)
+    if item.playback_path:
+        content_store.acquire(db, item.playback_path)
+    
+    # Count the upload for the user doing the claiming (as per job creation logic)
+    stats_service.record_upload(db, user.id, duration_seconds=item.duration_seconds)
+    
+    db.commit()
+    db.refresh(new_job)
+    invalidate_queue_count()
+    event_bus.queue_changed("queue.claimed", item.id, job_id=new_job.id)
+    event_bus.job_status(user.id, new_job.id, new_job.status)
+    
+    # Dispatch Celery Task
+    process_audio.delay(new_job.id)
+    
+    return {
+        "queue_item_id": item.id,
+        "job_id": new_job.id,
+        "status": new_job.status
+    }
+
+# A skipped-over row can still lose the conditional UPDATE on databases without
+# row locks (SQLite); retry with the next candidate this many times
+CLAIM_NEXT_ATTEMPTS = 5
+
+def next_available_query(db: Session, min_duration: Optional[int] = None, max_duration: Optional[int] = None,
+                         source: Optional[str] = None):
+    """
+    Oldest matching AVAILABLE item, locked FOR UPDATE SKIP LOCKED: concurrent
+    callers each lock a different row instead of waiting on the same one.
+    """
+    query = db.query(AudioQueueItem).filter(AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value)
+    if min_duration is not None:
+        query = query.filter(AudioQueueItem.duration_seconds >= min_duration)
+    if max_duration is not None:
+        query = query.filter(AudioQueueItem.duration_seconds <= max_duration)
+    if source:
+        query = query.filter(AudioQueueItem.source == source)
+    return query.order_by(AudioQueueItem.uploaded_at, AudioQueueItem.id).limit(1).with_for_update(skip_locked=True)
+
+@router.post("/claim-next", response_model=dict)
+def claim_next_queue_item(
+    min_duration: Optional[int] = Query(None, ge=0, description="Only items at least this long (seconds)"),
+    max_duration: Optional[int] = Query(None, ge=0, description="Only items at most this long (seconds)"),
+    source: Optional[str] = Query(None, description="Only items from this source"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Claim the oldest available item (optionally filtered); every concurrent caller gets a different one."""
+    try:
+        for _ in range(CLAIM_NEXT_ATTEMPTS):
+            item = next_available_query(db, min_duration, max_duration, source).first()
+            if not item:
+                raise HTTPException(status_code=404, detail="No available audio matches")
+
+            claimed = db.query(AudioQueueItem).filter(
+                AudioQueueItem.id == item.id,
+                AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value
+            ).update({
+                AudioQueueItem.status: AudioQueueStatus.CLAIMED.value,
+                AudioQueueItem.claimed_by_id: user.id,
+                AudioQueueItem.claimed_at: datetime.now(timezone.utc)
+            })
+            if claimed:
+                return _claim_into_job(db, item, user)
+            db.rollback()
+        raise HTTPException(status_code=409, detail="The queue is busy, please try again.")
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to claim item: {str(e)}")
+
 @router.post("/{queue_item_id}/claim", response_model=dict)
 def claim_queue_item(
     queue_item_id: str,
@@ -108,31 +240,7 @@ def claim_queue_item(
         item.claimed_by_id = user.id
         item.claimed_at = datetime.now(timezone.utc)
 
-        # Create Personal Transcription Job
-        new_job = Job(
-            user_id=user.id,
-            original_filename=item.original_filename,
-            storage_path=item.storage_path, # Copied for convenience
-            queue_item_id=item.id,
-            status=JobStatus.QUEUED.value,
-            login_date=datetime.now(timezone.utc)
-        )
-        db.add(new_job)
-        
-        # Increment lifetime upload counter for the user doing the claiming (as per job creation logic)
-        user.total_uploads = (user.total_uploads or 0) + 1
-        
-        db.commit()
-        db.refresh(new_job)
-        
-        # Dispatch Celery Task
-        process_audio.delay(new_job.id)
-        
-        return {
-            "queue_item_id": item.id,
-            "job_id": new_job.id,
-            "status": new_job.status
-        }
+        return _claim_into_job(db, item, user)
     except HTTPException:
         db.rollback()
         raise
@@ -142,6 +250,38 @@ def claim_queue_item(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to claim item: {str(e)}")
 
+@router.get("/{queue_item_id}/peaks")
+def get_queue_item_peaks(
+    queue_item_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Downsampled waveform peaks so the player can render without fetching the audio."""
+    item = db.query(AudioQueueItem).filter(
+        AudioQueueItem.id == queue_item_id,
+        AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value
+    ).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Queue item not found")
+    return peaks_response(request, item.waveform_peaks)
+
+@router.get("/{queue_item_id}/playback", response_model=PlaybackSourceResponse)
+def get_queue_item_playback(
+    queue_item_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Playback source for the shared player: the low-bitrate rendition when it exists."""
+    item = db.query(AudioQueueItem).filter(
+        AudioQueueItem.id == queue_item_id,
+        AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value
+    ).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Queue item not found")
+    return playback_source(item, request.url_for("stream_audio", queue_item_id=item.id).path, None)
+
 @router.get("/{queue_item_id}/audio")
 def stream_audio(
     queue_item_id: str,
@@ -149,87 +289,17 @@ def stream_audio(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Stream the original uploaded audio file for browser playback."""
+    """Stream the playback rendition (or the original until one exists) with Range support."""
     item = db.query(AudioQueueItem).filter(
         AudioQueueItem.id == queue_item_id,
         AudioQueueItem.status == AudioQueueStatus.AVAILABLE.value
     ).first()
     if not item:
         raise HTTPException(status_code=404, detail="Queue item not found")
-    
-    try:
-        file_path = storage_service.download_to_temp(item.storage_path)
-    except Exception as e:
-        print(f"Failed to download audio for streaming: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load audio file")
-    
-    ext = item.original_filename.rsplit(".", 1)[-1].lower() if "." in item.original_filename else "bin"
-    audio_mime_map = {
-        "mp3": "audio/mpeg",
-        "wav": "audio/wav",
-        "ogg": "audio/ogg",
-        "flac": "audio/flac",
-        "aac": "audio/aac",
-        "m4a": "audio/mp4",
-        "wma": "audio/x-ms-wma",
-        "webm": "audio/webm",
-        "mp4": "video/mp4",
-        "mkv": "video/x-matroska",
-        "avi": "video/x-msvideo",
-        "mov": "video/quicktime",
-    }
-    media_type = audio_mime_map.get(ext, item.mime_type or "application/octet-stream")
-    
-    file_size = os.path.getsize(file_path)
-    
-    range_header = request.headers.get("range")
-    if range_header:
-        range_spec = range_header.replace("bytes=", "")
-        parts = range_spec.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-        
-        if start >= file_size:
-            raise HTTPException(status_code=416, detail="Range not satisfiable")
-        
-        end = min(end, file_size - 1)
-        content_length = end - start + 1
-        
-        def iter_range():
-            with open(file_path, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk_size = min(8192, remaining)
-                    data = f.read(chunk_size)
-                    if not data:
-                        break
-                    remaining -= len(data)
-                    yield data
-        
-        return Response(
-            content=b"".join(iter_range()),
-            status_code=206,
-            media_type=media_type,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-            }
-        )
-    else:
-        def iterfile():
-            with open(file_path, "rb") as f:
-                yield from f
-        
-        return StreamingResponse(
-            iterfile(),
-            media_type=media_type,
-            headers={
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(file_size),
-            }
-        )
+
+    path, is_rendition = playback_object(item)
+    media_type = audio_media_type(path if is_rendition else item.original_filename, item.mime_type)
+    return stream_stored_audio(request, path, media_type)
 
 @router.get("/{queue_item_id}/download")
 def download_queue_item(
@@ -249,22 +319,7 @@ def download_queue_item(
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to load audio file")
         
-    ext = item.original_filename.rsplit(".", 1)[-1].lower() if "." in item.original_filename else "bin"
-    audio_mime_map = {
-        "mp3": "audio/mpeg",
-        "wav": "audio/wav",
-        "ogg": "audio/ogg",
-        "flac": "audio/flac",
-        "aac": "audio/aac",
-        "m4a": "audio/mp4",
-        "wma": "audio/x-ms-wma",
-        "webm": "audio/webm",
-        "mp4": "video/mp4",
-        "mkv": "video/x-matroska",
-        "avi": "video/x-msvideo",
-        "mov": "video/quicktime",
-    }
-    media_type = audio_mime_map.get(ext, item.mime_type or "application/octet-stream")
+    media_type = audio_media_type(item.original_filename, item.mime_type)
 
     def iterfile():
         with open(file_path, "rb") as f:
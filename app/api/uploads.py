@@ -0,0 +1,233 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Body, Response
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+
+from app.db.base import get_db
+from app.db.models import User, UploadSession, UploadSessionStatus
+from app.schemas import UploadSessionCreate, UploadSessionResponse
+from app.api.auth import get_current_user
+from app.services.storage import storage_service
+from app.services.content_store import content_store
+from app.services.ingest import SNIFF_BYTES, sniff_mime_type, wav_duration_seconds
+from app.core.config import settings
+from app.workers.tasks import adopt_upload, attach_upload_session, announce_upload_session
+from app.api.queue import invalidate_queue_count
+
+router = APIRouter()
+
+# Resumable upload protocol (tus-style):
+#   POST   /uploads/              -> open a session, returns id + chunk_size
+#   GET    /uploads/{id}          -> current offset (resume point after a dropped connection)
+#   PATCH  /uploads/{id}          -> append one chunk at Upload-Offset
+#   POST   /uploads/{id}/finalize -> create the Job / AudioQueueItem (202 PROCESSING while the worker hashes it)
+#   DELETE /uploads/{id}          -> abort
+
+def _get_session(db: Session, upload_id: str, user: User, lock: bool = False) -> UploadSession:
+    query = db.query(UploadSession)
+    if lock:
+        query = query.with_for_update()
+    session = query.filter(UploadSession.id == upload_id, UploadSession.user_id == user.id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+def _session_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=settings.RESUMABLE_SESSION_TTL_HOURS)
+
+def _session_response(session: UploadSession, response: Response) -> UploadSession:
+    response.headers["Upload-Offset"] = str(session.offset)
+    response.headers["Upload-Length"] = str(session.total_size)
+    return session
+
+@router.post("/", response_model=UploadSessionResponse, status_code=201)
+def create_upload_session(
+    payload: UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    # Known content the user already has: the session starts complete and finalize is a
+    # metadata-only operation. Any other declared hash is ignored; the bytes are uploaded
+    # and hashed by the worker after finalize.
+    known = content_store.lookup(db, payload.sha256) if payload.sha256 else None
+    if known and known.size_bytes == payload.size and content_store.referenced_by_user(db, user.id, known.sha256):
+        session = UploadSession(
+            user_id=user.id,
+            target=payload.target.value,
+            original_filename=payload.filename,
+            storage_path=known.storage_path,
+            mime_type=known.mime_type or payload.content_type,
+            content_sha256=known.sha256,
+            total_size=payload.size,
+            offset=payload.size,
+            chunk_size=settings.RESUMABLE_CHUNK_SIZE,
+            backend_upload_id="",
+            parts=[],
+            status=UploadSessionStatus.ACTIVE.value,
+            expires_at=_session_expiry()
+        )
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+        return _session_response(session, response)
+
+    try:
+        storage_path, backend_upload_id = storage_service.begin_multipart(
+            payload.filename, payload.size, payload.content_type
+        )
+    except Exception as e:
+        print(f"Failed to open resumable upload for {payload.filename}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to start upload: {str(e)}")
+
+    session = UploadSession(
+        user_id=user.id,
+        target=payload.target.value,
+        original_filename=payload.filename,
+        storage_path=storage_path,
+        mime_type=payload.content_type,
+        total_size=payload.size,
+        offset=0,
+        chunk_size=settings.RESUMABLE_CHUNK_SIZE,
+        backend_upload_id=backend_upload_id,
+        parts=[],
+        status=UploadSessionStatus.ACTIVE.value,
+        expires_at=_session_expiry()
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return _session_response(session, response)
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    upload_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    return _session_response(_get_session(db, upload_id, user), response)
+
+@router.patch("/{upload_id}", response_model=UploadSessionResponse)
+def upload_chunk(
+    upload_id: str,
+    response: Response,
+    chunk: bytes = Body(..., media_type="application/offset+octet-stream"),
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Append one chunk. Chunks must arrive in order and be exactly chunk_size (except the last)."""
+    session = _get_session(db, upload_id, user, lock=True)
+
+    if session.status != UploadSessionStatus.ACTIVE.value:
+        raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+    if upload_offset != session.offset:
+        raise HTTPException(status_code=409, detail=f"Offset mismatch: server has {session.offset} bytes")
+
+    is_last = session.offset + len(chunk) == session.total_size
+    if not chunk or session.offset + len(chunk) > session.total_size:
+        raise HTTPException(status_code=400, detail="Chunk exceeds declared upload size")
+    if len(chunk) != session.chunk_size and not is_last:
+        raise HTTPException(status_code=400, detail=f"Chunks must be {session.chunk_size} bytes (except the last)")
+
+    offset = session.offset
+    part_number = offset // session.chunk_size + 1
+    storage_path, backend_upload_id, total_size = session.storage_path, session.backend_upload_id, session.total_size
+    parts = session.parts or []
+    changes = {}
+    if offset == 0:
+        head = chunk[:SNIFF_BYTES]
+        changes[UploadSession.mime_type] = sniff_mime_type(head, session.original_filename, session.mime_type)
+        changes[UploadSession.duration_seconds] = wav_duration_seconds(head, total_size)
+    # Release the row lock before the remote write; the offset update below is a compare-and-set
+    db.commit()
+
+    try:
+        etag = storage_service.upload_part(storage_path, backend_upload_id, part_number, chunk, offset, total_size)
+    except Exception as e:
+        print(f"Chunk upload failed for session {upload_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Chunk upload failed: {str(e)}")
+
+    if etag:
+        changes[UploadSession.parts] = parts + [{"PartNumber": part_number, "ETag": etag}]
+    changes[UploadSession.offset] = offset + len(chunk)
+    changes[UploadSession.expires_at] = _session_expiry()
+    # A concurrent retry of the same chunk that got here first wins; this one reports the new offset
+    stored = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.offset == offset,
+        UploadSession.status == UploadSessionStatus.ACTIVE.value
+    ).update(changes, synchronize_session=False)
+    db.commit()
+    session = _get_session(db, upload_id, user)
+    if not stored:
+        if session.status != UploadSessionStatus.ACTIVE.value:
+            raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+        raise HTTPException(status_code=409, detail=f"Offset mismatch: server has {session.offset} bytes")
+    return _session_response(session, response)
+
+@router.post("/{upload_id}/finalize", response_model=UploadSessionResponse)
+def finalize_upload(
+    upload_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    session = _get_session(db, upload_id, user, lock=True)
+
+    # Idempotent: a client retrying finalize after a dropped response gets the same result
+    if session.status == UploadSessionStatus.COMPLETED.value:
+        return _session_response(session, response)
+    if session.status == UploadSessionStatus.PROCESSING.value:
+        response.status_code = 202
+        return _session_response(session, response)
+    if session.status != UploadSessionStatus.ACTIVE.value:
+        raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+    if session.offset != session.total_size:
+        raise HTTPException(status_code=409, detail=f"Upload incomplete: {session.offset}/{session.total_size} bytes")
+
+    if session.content_sha256:
+        # Dedup hit: make sure the shared object still exists, then reference it
+        if not content_store.lookup(db, session.content_sha256):
+            session.status = UploadSessionStatus.ABORTED.value
+            db.commit()
+            raise HTTPException(status_code=409, detail="Stored content is no longer available; upload the file again")
+        content_store.acquire(db, session.storage_path)
+        attach_upload_session(db, session)
+        db.commit()
+        db.refresh(session)
+        if session.queue_item_id:
+            invalidate_queue_count()
+        announce_upload_session(session)
+        return _session_response(session, response)
+
+    try:
+        storage_service.complete_multipart(session.storage_path, session.backend_upload_id, session.parts or [])
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to finalize upload {upload_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to finalize upload: {str(e)}")
+
+    # Hashing streams the whole object back from the bucket, so it (and the cas/
+    # move, and creating the Job / AudioQueueItem) happens in the worker. Poll
+    # GET /uploads/{id} until COMPLETED.
+    session.status = UploadSessionStatus.PROCESSING.value
+    db.commit()
+    db.refresh(session)
+    adopt_upload.delay(session.id)
+    response.status_code = 202
+    return _session_response(session, response)
+
+@router.delete("/{upload_id}", status_code=204)
+def abort_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    session = _get_session(db, upload_id, user, lock=True)
+    if session.status == UploadSessionStatus.ACTIVE.value:
+        if not session.content_sha256:
+            storage_service.abort_multipart(session.storage_path, session.backend_upload_id)
+        session.status = UploadSessionStatus.ABORTED.value
+        db.commit()
+    return
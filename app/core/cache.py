@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Small thread-safe in-process cache: entries expire after ttl_seconds, LRU-evicted past maxsize."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache:
+    """
+    JSON-value cache with an in-process TTLCache in front of an optional Redis.
+    With Redis configured, invalidations reach every API process; the local
+    layer then only keeps entries for local_ttl_seconds. Redis failures fall
+    back to the local layer (and ultimately to the caller's DB lookup).
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, local_ttl_seconds: int, maxsize: int, redis_url: str = ""):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self.local = TTLCache(local_ttl_seconds if redis_url else ttl_seconds, maxsize)
+        self._redis = None
+
+    def _client(self):
+        if self.redis_url and self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or not self.redis_url:
+            return value
+        try:
+            raw = self._client().get(self._key(key))
+        except Exception as e:
+            print(f"Cache {self.namespace}: Redis get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        if self.redis_url:
+            try:
+                self._client().set(self._key(key), json.dumps(value), ex=self.ttl_seconds)
+            except Exception as e:
+                print(f"Cache {self.namespace}: Redis set failed: {e}")
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        if self.redis_url:
+            try:
+                self._client().delete(self._key(key))
+            except Exception as e:
+                print(f"Cache {self.namespace}: Redis delete failed: {e}")
+
+
+# Authenticated users by id (see app.api.auth.get_current_user)
+user_cache = SharedCache(
+    "user",
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    local_ttl_seconds=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    redis_url=settings.USER_CACHE_REDIS_URL,
+)
+
+# Listing totals (e.g. available queue items); invalidated by the endpoints that change them
+count_cache = TTLCache(settings.COUNT_CACHE_TTL_SECONDS)
@@ -26,6 +26,28 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str | None = None
     S3_REGION_NAME: str = "us-east-1"
 
+    # Resumable uploads — chunk size must satisfy S3 (>= 5 MiB) and GCS (multiple of 256 KiB)
+    RESUMABLE_CHUNK_SIZE: int = 8 * 1024 * 1024
+    # Sessions with no chunk for this long are aborted by the worker's beat schedule
+    RESUMABLE_SESSION_TTL_HOURS: int = 24
+
+    # Archival — completed jobs get their original transcoded to speech Opus
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_OPUS_BITRATE: str = "24k"  # Only for jobs without a playback rendition (that copy is archived instead)
+    ARCHIVE_ORIGINAL_POLICY: str = "keep"  # keep | tier (move to cold storage class) | delete
+    ARCHIVE_S3_STORAGE_CLASS: str = "GLACIER_IR"
+    ARCHIVE_GCS_STORAGE_CLASS: str = "COLDLINE"
+
+    # Playback renditions — small Opus/WebM copy (and optional HLS) served instead of the original
+    PLAYBACK_RENDITION_ENABLED: bool = True
+    PLAYBACK_OPUS_BITRATE: str = "32k"
+    PLAYBACK_HLS_ENABLED: bool = False
+    PLAYBACK_HLS_SEGMENT_SECONDS: int = 6
+    PLAYBACK_URL_TTL_SECONDS: int = 3600
+
+    # Admin user list reads the materialized user_job_stats table instead of aggregating jobs
+    ADMIN_USER_STATS_MATERIALIZED: bool = True
+
     # AI (OpenRouter)
     OPENROUTER_API_KEY: str = ""
     OPENROUTER_MODEL: str = "google/gemini-3.6-flash"
@@ -35,8 +57,49 @@ class Settings(BaseSettings):
     # Auth
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 300
     
+    # Authenticated-user cache (get_current_user). Set USER_CACHE_REDIS_URL to share it
+    # (and its invalidations) across API processes; otherwise each process caches locally.
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5
+    USER_CACHE_MAXSIZE: int = 1024
+    USER_CACHE_REDIS_URL: str = ""
+
+    # Cached listing totals (per process; endpoints that change them invalidate immediately)
+    COUNT_CACHE_TTL_SECONDS: int = 15
+
+    # Transcript bodies: payloads above TRANSCRIPT_INLINE_MAX_BYTES are compressed (keeping a
+    # TRANSCRIPT_PREVIEW_CHARS preview inline); compressed payloads of TRANSCRIPT_OBJECT_MIN_BYTES
+    # or more move to object storage. TRANSCRIPT_CODEC "zstd" needs the zstandard package.
+    TRANSCRIPT_INLINE_MAX_BYTES: int = 8192
+    TRANSCRIPT_OBJECT_MIN_BYTES: int = 262144
+    TRANSCRIPT_PREVIEW_CHARS: int = 500
+    TRANSCRIPT_CODEC: str = "gzip"
+    # Segment edits are folded back into the stored body (and search index) this long after
+    # the last edit, so an autosave burst costs one rewrite
+    TRANSCRIPT_REFRESH_DELAY_SECONDS: int = 30
+
+    # ZIP bundles (POST /jobs/export/bundle): above this estimated size they are built by a worker
+    # into exports/bundles/ instead of streamed in the request
+    EXPORT_BUNDLE_SYNC_MAX_BYTES: int = 536870912
+    EXPORT_BUNDLE_URL_TTL_SECONDS: int = 3600
+    # Background bundles (and their status markers) are deleted by the worker's beat schedule
+    # once they are this old
+    EXPORT_BUNDLE_RETENTION_HOURS: int = 24
+
+    # Live queue/job events (Server-Sent Events at /events/stream) through Redis Streams;
+    # empty disables them and the UI keeps polling. Workers publish too, so set it there as well.
+    EVENTS_REDIS_URL: str = ""
+    EVENTS_STREAM_MAXLEN: int = 1000
+    EVENTS_KEEPALIVE_SECONDS: int = 15
+
+    # Transcript search (Postgres text search configuration; "simple" suits mixed-language transcripts)
+    SEARCH_TS_CONFIG: str = "simple"
+    
     # Internal Service Authentication
     PHASE_ONE_INGEST_TOKEN: str = ""
+    # Batch AP ingest: most items per request, and rows per INSERT statement (bind-parameter limits)
+    INGEST_BATCH_MAX_ITEMS: int = 10000
+    INGEST_BATCH_CHUNK_ROWS: int = 1000
 
     # Email (FastAPI-Mail)
     MAIL_USERNAME: str = ""
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 
@@ -32,3 +33,54 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine for the hot read endpoints (asyncpg / aiosqlite). Built on first use so the
+# drivers are only needed by processes that serve those routes (workers never do).
+_async_engine = None
+_async_session_factory = None
+
+
+def async_database_url(url: str):
+    """The sync DATABASE_URL with its async driver: postgresql+asyncpg / sqlite+aiosqlite."""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg takes ssl=<mode> rather than libpq's sslmode
+        if "sslmode" in url.query:
+            query = dict(url.query)
+            query["ssl"] = query.pop("sslmode")
+            url = url.set(query=query)
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        kwargs = {"pool_pre_ping": True}
+        if not _is_sqlite:
+            kwargs.update(pool_size=10, max_overflow=20, pool_recycle=1800)
+        _async_engine = create_async_engine(async_database_url(_db_url), **kwargs)
+    return _async_engine
+
+
+async def get_async_db():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        # No expiry on commit: attributes loaded for the response stay readable without a lazy load
+        _async_session_factory = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    async with _async_session_factory() as db:
+        yield db
+
+
+def dialect_insert(bind):
+    """Return the INSERT construct (with ON CONFLICT support) for the bound dialect."""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
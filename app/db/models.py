@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, BigInteger, JSON, Boolean, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, event, Column, String, Integer, ForeignKey, Text, DateTime, Date, BigInteger, JSON, Boolean, UniqueConstraint, LargeBinary, Index
+from sqlalchemy.orm import relationship, deferred
 import enum
 from app.db.base import Base
 
@@ -19,6 +19,16 @@ class AudioQueueStatus(str, enum.Enum):
     CLAIMED = "CLAIMED"
     REMOVED = "REMOVED"
 
+class UploadSessionStatus(str, enum.Enum):
+    ACTIVE = "ACTIVE"
+    PROCESSING = "PROCESSING"  # All bytes stored; a worker is hashing and filing the object
+    COMPLETED = "COMPLETED"
+    ABORTED = "ABORTED"
+
+class UploadTarget(str, enum.Enum):
+    JOB = "job"
+    QUEUE = "queue"
+
 class ServiceType(str, enum.Enum):
     RECOURS = "Recours"
     OFPRA = "OFPRA"
@@ -45,7 +55,11 @@ class User(Base):
 
 class AudioQueueItem(Base):
     __tablename__ = "audio_queue"
-    __table_args__ = (UniqueConstraint('source', 'source_upload_id', name='uq_source_upload_id'),)
+    __table_args__ = (
+        UniqueConstraint('source', 'source_upload_id', name='uq_source_upload_id'),
+        # Queue listing: status = AVAILABLE ORDER BY uploaded_at DESC, id DESC (keyset)
+        Index('ix_audio_queue_status_uploaded_at_id', 'status', 'uploaded_at', 'id'),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     source = Column(String, nullable=True)
@@ -57,7 +71,10 @@ class AudioQueueItem(Base):
     storage_path = Column(String, nullable=False)
     file_size_bytes = Column(BigInteger, nullable=True)
     mime_type = Column(String, nullable=True)
+    content_sha256 = Column(String(64), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
+    waveform_peaks = deferred(Column(LargeBinary, nullable=True))  # uint8 per 1/PEAKS_PER_SECOND s; loaded only by /peaks
+    playback_path = Column(String, nullable=True)  # Low-bitrate Opus/WebM rendition (content-addressed)
     status = Column(String, default=AudioQueueStatus.AVAILABLE.value, index=True)
     
     uploaded_by_id = Column(String, ForeignKey("users.id"), nullable=True)
@@ -72,6 +89,15 @@ class AudioQueueItem(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Per-user listings, all ORDER BY created_at DESC, id DESC:
+        #   default view (status != TRASHED), keyset cursor pages, daily aggregates
+        Index('ix_jobs_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        #   ?status= filter and the trash (status = TRASHED)
+        Index('ix_jobs_user_id_status_created_at_id', 'user_id', 'status', 'created_at', 'id'),
+        #   ?service_type= filter
+        Index('ix_jobs_user_id_service_type_created_at_id', 'user_id', 'service_type', 'created_at', 'id'),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -82,6 +108,15 @@ class Job(Base):
     
     duration_seconds = Column(Integer, nullable=True)
     file_size_bytes = Column(BigInteger, nullable=True)
+    mime_type = Column(String, nullable=True)
+    content_sha256 = Column(String(64), nullable=True)  # Computed while streaming the upload
+    # Archival: storage_path is repointed to the Opus copy; the original is kept here unless deleted by policy
+    original_storage_path = Column(String, nullable=True)
+    archived_size_bytes = Column(BigInteger, nullable=True)
+    archived_at = Column(DateTime, nullable=True)
+    waveform_peaks = deferred(Column(LargeBinary, nullable=True))  # Precomputed by the worker for the player
+    playback_path = Column(String, nullable=True)  # Low-bitrate Opus/WebM rendition (content-addressed)
+    playback_hls_path = Column(String, nullable=True)  # hls/<job_id>/index.m3u8 when PLAYBACK_HLS_ENABLED
     error_message = Column(Text, nullable=True)
     
     # --- Ledger Entry Fields ---
@@ -112,24 +147,176 @@ class Transcript(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     job_id = Column(String, ForeignKey("jobs.id"), unique=True, nullable=False)
     
-    text_content = Column(Text, nullable=False)
-    json_metadata = Column(JSON, nullable=True) # Timestamps, confidence, etc.
+    # Plain body for short transcripts; a preview when the body is stored compressed
+    # (see app/services/transcript_store.py). Deferred so job.transcript stays cheap.
+    text_content = deferred(Column(Text, nullable=False))
+    json_metadata = deferred(Column(JSON, nullable=True)) # Timestamps, confidence, etc.
+
+    body_encoding = Column(String, nullable=True)  # None = inline plain, else "gzip" / "zstd"
+    body_blob = deferred(Column(LargeBinary, nullable=True))  # Compressed body kept in the row
+    body_path = Column(String, nullable=True)  # transcripts/<job_id>/... when the compressed body is in object storage
+    body_size = Column(Integer, nullable=True)  # Uncompressed payload bytes
+
+    # Bumped by every edit. Segment PATCHes only touch transcript_segments, so the body
+    # lags until refresh_transcript re-saves it; body_version is the version it holds.
+    version = Column(Integer, default=0, nullable=False)
+    body_version = Column(Integer, default=0, nullable=False)
+
+    # Rendered DOCX in object storage and the content hash it was rendered from (app/services/exports.py)
+    docx_path = Column(String, nullable=True)
+    docx_sha256 = Column(String(64), nullable=True)
     
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     job = relationship("Job", back_populates="transcript")
 
+class TranscriptSegment(Base):
+    """
+    One segment of a job's transcript (a timed ASR segment, or a paragraph when the
+    transcriber returned none) so the editor can page through long transcripts.
+    Positions are contiguous from 0; times are milliseconds and may be unknown.
+    """
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        UniqueConstraint("job_id", "position", name="uq_transcript_segments_job_id_position"),
+        Index("ix_transcript_segments_job_id_start_ms", "job_id", "start_ms"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    start_ms = Column(Integer, nullable=True)
+    end_ms = Column(Integer, nullable=True)
+    text = Column(Text, nullable=False)
+
+class TranscriptVersion(Base):
+    """
+    One transcript edit, stored as the reverse delta that turns version `version`
+    back into `version - 1`: per-segment text ops for PATCHes, or the previous
+    segment list for full-text replacements. Older versions are rebuilt on demand.
+    """
+    __tablename__ = "transcript_versions"
+    __table_args__ = (
+        UniqueConstraint("job_id", "version", name="uq_transcript_versions_job_id_version"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    user_id = Column(String, nullable=True)
+    delta = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
 class SupportingDocument(Base):
     __tablename__ = "supporting_documents"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    job_id = Column(String, ForeignKey("jobs.id"), nullable=False)
+    job_id = Column(String, ForeignKey("jobs.id"), nullable=False, index=True)
     
     original_filename = Column(String, nullable=False)
     storage_path = Column(String, nullable=False)
     file_size_bytes = Column(BigInteger, nullable=True)
+    mime_type = Column(String, nullable=True)
+    content_sha256 = Column(String(64), nullable=True)
     description = Column(String, nullable=True)
     
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     job = relationship("Job", back_populates="supporting_documents")
+
+class UploadSession(Base):
+    """A resumable (chunked) upload in progress — finalized into a Job or AudioQueueItem."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    target = Column(String, nullable=False)  # UploadTarget value
+
+    original_filename = Column(String, nullable=False)
+    storage_path = Column(String, nullable=False)
+    mime_type = Column(String, nullable=True)
+    duration_seconds = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True)  # Set at open for a dedup hit, else by the adopt_upload task
+
+    total_size = Column(BigInteger, nullable=False)
+    offset = Column(BigInteger, default=0, nullable=False)  # Bytes durably stored so far
+    chunk_size = Column(Integer, nullable=False)
+    backend_upload_id = Column(Text, nullable=False)  # S3 UploadId or GCS session URI
+    parts = Column(JSON, nullable=True)  # S3 [{PartNumber, ETag}, ...]
+
+    status = Column(String, default=UploadSessionStatus.ACTIVE.value)
+    job_id = Column(String, ForeignKey("jobs.id"), nullable=True)
+    queue_item_id = Column(String, ForeignKey("audio_queue.id"), nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime, nullable=True)  # Pushed back by every chunk; ACTIVE past this is aborted
+
+    __table_args__ = (
+        Index('ix_upload_sessions_status_expires_at', 'status', 'expires_at'),
+    )
+
+class StoredObject(Base):
+    """
+    One content-addressed object in the bucket, shared by every Job,
+    AudioQueueItem and SupportingDocument row whose storage_path points at it.
+    """
+    __tablename__ = "stored_objects"
+
+    sha256 = Column(String(64), primary_key=True)
+    storage_path = Column(String, unique=True, nullable=False)
+    size_bytes = Column(BigInteger, nullable=True)
+    mime_type = Column(String, nullable=True)
+    ref_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class DailyJobStat(Base):
+    """
+    Per-user per-day rollup behind /jobs/stats/daily, bumped when a job is
+    created and when it completes (completions count on the job's upload day).
+    Like the lifetime counters on User it is never decremented on delete.
+    """
+    __tablename__ = "daily_job_stats"
+
+    user_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    uploaded = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+
+
+class UserJobStat(Base):
+    """
+    Materialized per-user totals for the admin user list: the count and summed
+    duration of the user's existing jobs, adjusted on create/complete/delete.
+    """
+    __tablename__ = "user_job_stats"
+
+    user_id = Column(String, primary_key=True)
+    job_count = Column(Integer, default=0, nullable=False)
+    duration_seconds = Column(BigInteger, default=0, nullable=False)
+
+
+# Full-text search index over transcripts and ledger fields (see app/services/search.py).
+# The storage differs per dialect, so it is plain DDL attached to the metadata rather
+# than a mapped table: a weighted tsvector with a GIN index on Postgres, an FTS5
+# virtual table on SQLite (local runs and tests).
+JOB_SEARCH_TABLE = "job_search"
+
+for _statement in (
+    "CREATE TABLE IF NOT EXISTS job_search ("
+    "job_id VARCHAR PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE, "
+    "user_id VARCHAR NOT NULL, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_job_search_document ON job_search USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_job_search_user_id ON job_search (user_id)",
+):
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5("
+    "job_id UNINDEXED, user_id UNINDEXED, ledger, transcript, "
+    "tokenize='unicode61 remove_diacritics 2')"
+).execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "before_drop", DDL("DROP TABLE IF EXISTS job_search"))
@@ -1,5 +1,7 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from dotenv import load_dotenv
 import os
 
@@ -9,65 +11,37 @@ load_dotenv()
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from app.core.config import settings
-from app.api import jobs, auth, admin, queue, internal
-from app.db.base import Base, engine
-# Import models to register them with Base.metadata before create_all
-from app.db import models
+from app.api import jobs, auth, admin, queue, internal, uploads, events
+from app.db.base import engine
+from app.services.storage import storage_service
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Ensure DB is connected
-    import time
-    from sqlalchemy import text
-    
-    retries = 5
-    for i in range(retries):
-        try:
-            print(f"Checking database connection (Attempt {i+1}/{retries})...")
-            # Create tables (also verifies connection)
-            Base.metadata.create_all(bind=engine)
-            
-            # Auto-migrate missing columns (for existing databases)
-            with engine.connect() as conn:
-                try:
-                    conn.execute(text("SELECT total_uploads FROM users LIMIT 1"))
-                except Exception:
-                    conn.rollback()  # Clear aborted transaction in Postgres
-                    print("Auto-migrating: Adding missing columns to users table...")
-                    conn.execute(text("ALTER TABLE users ADD COLUMN total_uploads INTEGER DEFAULT 0"))
-                    conn.execute(text("ALTER TABLE users ADD COLUMN total_completed INTEGER DEFAULT 0"))
-                    conn.commit()
-                
-                try:
-                    conn.execute(text("SELECT description FROM supporting_documents LIMIT 1"))
-                except Exception:
-                    conn.rollback()
-                    print("Auto-migrating: Adding description column to supporting_documents table...")
-                    conn.execute(text("ALTER TABLE supporting_documents ADD COLUMN description TEXT"))
-                    conn.commit()
-            
-            # Simple query to verify
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            print("Database connected successfully!")
-            break
-        except Exception as e:
-            if i == retries - 1:
-                print(f"Database connection failed after {retries} attempts: {e}")
-                raise e
-            print(f"Database connection failed, retrying in 2s... Error: {e}")
-            time.sleep(2)
 
-    # Startup: Run admin initialization
+def database_ready() -> bool:
     try:
-        from init_admin import init_admin
-        print("Running startup admin seeding...")
-        init_admin()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
     except Exception as e:
-        print(f"Startup admin seeding failed (Non-critical): {e}")
+        print(f"Database not ready: {e}")
+        return False
+
+
+def warm_up():
+    """Open the first database connection and the storage client before traffic needs them."""
+    started = time.perf_counter()
+    checks = {"database": database_ready(), "storage": storage_service.ready()}
+    print(f"Warm-up finished in {time.perf_counter() - started:.2f}s: {checks}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup does no blocking work: the schema is Alembic's job and admins are
+    # seeded by init_admin.py, both in the release step (see Procfile/Dockerfile).
+    # Connections warm up in the background; /ready reports when they are up.
+    asyncio.get_running_loop().run_in_executor(None, warm_up)
     yield
-    # Shutdown logic (if any)
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -85,7 +59,9 @@ app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 app.include_router(queue.router, prefix="/queue", tags=["Queue"])
+app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
 app.include_router(internal.router, prefix="/api/internal", tags=["Internal"])
+app.include_router(events.router, prefix="/events", tags=["Events"])
 
 @app.get("/", response_class=HTMLResponse)
 def read_root():
@@ -95,3 +71,12 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "TunAIde Phase One"}
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """Readiness probe: 503 until the database and object storage are reachable (/health is liveness)."""
+    checks = {"database": database_ready(), "storage": storage_service.ready()}
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "starting", "checks": checks}
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, Any, List
-from app.db.models import JobStatus, AudioQueueStatus
+from app.db.models import JobStatus, AudioQueueStatus, UploadSessionStatus, UploadTarget
 
 # --- Job Schemas ---
 
@@ -15,6 +15,7 @@ class SupportingDocumentResponse(BaseModel):
     id: str
     original_filename: str
     file_size_bytes: Optional[int] = None
+    mime_type: Optional[str] = None
     description: Optional[str] = None
     created_at: datetime
     
@@ -25,6 +26,8 @@ class JobResponse(JobBase):
     status: JobStatus
     storage_path: Optional[str] = None
     duration_seconds: Optional[int] = None
+    file_size_bytes: Optional[int] = None
+    mime_type: Optional[str] = None
     created_at: datetime
     error_message: Optional[str] = None
     
@@ -42,6 +45,49 @@ class JobResponse(JobBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class JobSummaryResponse(BaseModel):
+    """GET /jobs/?view=summary — list rows without documents or error text."""
+    id: str
+    original_filename: str
+    status: JobStatus
+    duration_seconds: Optional[int] = None
+    created_at: datetime
+    client_name: Optional[str] = None
+    client_surname: Optional[str] = None
+    service_type: Optional[str] = None
+    login_date: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class JobSearchHit(BaseModel):
+    """One ranked /jobs/search match; highlight is HTML-escaped with <mark> around the terms."""
+    job_id: str
+    original_filename: str
+    status: JobStatus
+    created_at: datetime
+    client_name: Optional[str] = None
+    client_surname: Optional[str] = None
+    service_type: Optional[str] = None
+    rank: float
+    highlight: Optional[str] = None
+
+class JobSearchResponse(BaseModel):
+    items: List[JobSearchHit]
+    has_more: bool
+    next_offset: Optional[int] = None
+
+class ExportBundleRequest(BaseModel):
+    """POST /jobs/export/bundle — background None picks it from the estimated size."""
+    job_ids: List[str] = Field(..., min_length=1, max_length=500)
+    include_originals: bool = False
+    background: Optional[bool] = None
+
+class ExportBundleStatus(BaseModel):
+    bundle_id: str
+    status: str  # "pending" | "ready" | "failed"
+    error: Optional[str] = None
+    download_url: Optional[str] = None  # Signed bucket URL when the backend can sign
+
 class LedgerEntryUpdate(BaseModel):
     """Schema for PATCH /jobs/{job_id} — all fields optional."""
     client_name: Optional[str] = None
@@ -65,6 +111,52 @@ class TranscriptResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class TranscriptSegmentResponse(BaseModel):
+    index: int
+    start: Optional[float] = None  # seconds; None when the transcriber gave no timing
+    end: Optional[float] = None
+    text: str
+
+class TranscriptSegmentWindow(BaseModel):
+    """GET /jobs/{id}/segments — one window of segments, by index or by timestamp."""
+    version: int
+    total: int
+    offset: int
+    next_offset: Optional[int] = None
+    items: List[TranscriptSegmentResponse]
+
+class TextOp(BaseModel):
+    """Replace characters [start, end) of a segment's text with `text`."""
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+    text: str = ""
+
+class TranscriptSegmentEdit(BaseModel):
+    """Either the segment's new text, or ops against its current text."""
+    index: int = Field(..., ge=0)
+    text: Optional[str] = None
+    ops: Optional[List[TextOp]] = None
+
+class TranscriptPatchRequest(BaseModel):
+    """PATCH /jobs/{id}/transcript — rejected with 409 unless base_version is current."""
+    base_version: int
+    edits: List[TranscriptSegmentEdit] = Field(..., min_length=1)
+
+class TranscriptPatchResponse(BaseModel):
+    version: int
+    items: List[TranscriptSegmentResponse]
+
+class TranscriptVersionSummary(BaseModel):
+    version: int
+    user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    segments_changed: Optional[int] = None  # None for a full-text replacement
+
+class TranscriptVersionResponse(BaseModel):
+    version: int
+    text_content: str
+    segments: List[TranscriptSegmentResponse]
+
 # --- Audio Queue Schemas ---
 
 class AudioQueueItemBase(BaseModel):
@@ -92,4 +184,36 @@ class AudioQueueItemResponse(AudioQueueItemBase):
 
 class AudioQueueListResponse(BaseModel):
     items: List[AudioQueueItemResponse]
-    total: int
+    total: Optional[int] = None  # Cached count of available items (omitted with include_total=false)
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; null on the last page
+
+class PlaybackSourceResponse(BaseModel):
+    """Where the player should load audio from (GET /jobs/{id}/playback, /queue/{id}/playback)."""
+    url: str
+    direct: bool  # True: signed bucket URL, <audio> streams and seeks without touching the API
+    media_type: str
+    is_rendition: bool
+    hls_url: Optional[str] = None
+
+# --- Resumable Upload Schemas ---
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)
+    target: UploadTarget = UploadTarget.JOB
+    content_type: Optional[str] = None
+    # Optional client-computed SHA-256: known content skips the byte transfer entirely
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    target: UploadTarget
+    original_filename: str
+    total_size: int
+    offset: int
+    chunk_size: int
+    status: UploadSessionStatus
+    job_id: Optional[str] = None
+    queue_item_id: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
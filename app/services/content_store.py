@@ -0,0 +1,150 @@
+import hashlib
+from typing import BinaryIO, List, Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.db.base import dialect_insert
+from app.db.models import StoredObject, Job, AudioQueueItem, SupportingDocument
+from app.services.ingest import IngestResult
+from app.services.storage import storage_service
+
+
+def content_key(sha256: str, filename: str) -> str:
+    ext = filename.split('.')[-1].lower() if '.' in filename else "bin"
+    return f"cas/{sha256[:2]}/{sha256}.{ext}"
+
+
+class ContentStore:
+    """
+    Content-addressed layer over StorageService.
+
+    Objects live under cas/<sha256> keys with a reference count in
+    stored_objects; identical uploads share one object and deletes only
+    remove it from the bucket when the last referencing row goes away.
+    Reference changes happen inside the caller's transaction, and bucket
+    deletes are deferred until after commit via purge().
+    """
+
+    def store_upload(self, db: Session, file_obj: BinaryIO, filename: str, content_type: Optional[str] = None) -> IngestResult:
+        """Stream an upload, then dedup it by hash. Takes one reference on the returned storage_path."""
+        ingested = storage_service.ingest_file(file_obj, filename, content_type)
+        ingested.storage_path = self.adopt(
+            db, ingested.storage_path, ingested.sha256, filename, ingested.size_bytes, ingested.mime_type
+        )
+        return ingested
+
+    def adopt(self, db: Session, staging_path: str, sha256: str, filename: str, size_bytes: Optional[int] = None, mime_type: Optional[str] = None) -> str:
+        """
+        Move an uploaded object to its content-addressed key, or drop it when the
+        content is already stored. Takes one reference; returns the storage_path.
+        """
+        existing = db.query(StoredObject).filter(StoredObject.sha256 == sha256).first()
+        if existing:
+            # Known content: drop the staging copy, the row just points at the shared object
+            storage_service.delete_file(staging_path)
+            storage_path = existing.storage_path
+        else:
+            storage_path = content_key(sha256, filename)
+            storage_service.copy_object(staging_path, storage_path)
+            storage_service.delete_file(staging_path)
+
+        self.register(db, sha256, storage_path, size_bytes, mime_type)
+        return storage_path
+
+    def hash_object(self, storage_path: str) -> str:
+        """SHA-256 of a stored object, streamed back from the bucket."""
+        digest = hashlib.sha256()
+        for chunk in storage_service.iter_object(storage_path):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def register(self, db: Session, sha256: str, storage_path: str, size_bytes: Optional[int] = None, mime_type: Optional[str] = None):
+        """Upsert the object row and take one reference (safe against concurrent first uploads)."""
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(StoredObject).values(
+            sha256=sha256,
+            storage_path=storage_path,
+            size_bytes=size_bytes,
+            mime_type=mime_type,
+            ref_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StoredObject.sha256],
+            set_={"ref_count": StoredObject.ref_count + 1}
+        )
+        db.execute(stmt)
+
+    def lookup(self, db: Session, sha256: str) -> Optional[StoredObject]:
+        return db.query(StoredObject).filter(StoredObject.sha256 == sha256).first()
+
+    def referenced_by_user(self, db: Session, user_id: str, sha256: str) -> bool:
+        """
+        Whether the user already holds this content through one of their own rows.
+        A hash alone proves nothing (storage paths, and so hashes, are visible to
+        clients), so dedup without re-uploading is limited to content the user has.
+        """
+        owned = (
+            db.query(Job.id).filter(Job.user_id == user_id, Job.content_sha256 == sha256),
+            db.query(AudioQueueItem.id).filter(
+                AudioQueueItem.content_sha256 == sha256,
+                or_(AudioQueueItem.uploaded_by_id == user_id, AudioQueueItem.claimed_by_id == user_id)
+            ),
+            db.query(SupportingDocument.id).join(Job, SupportingDocument.job_id == Job.id).filter(
+                Job.user_id == user_id, SupportingDocument.content_sha256 == sha256
+            ),
+        )
+        return any(query.first() is not None for query in owned)
+
+    def acquire(self, db: Session, storage_path: str):
+        """Take another reference on an existing object (e.g. a claimed queue item's audio)."""
+        db.query(StoredObject).filter(StoredObject.storage_path == storage_path).update(
+            {StoredObject.ref_count: StoredObject.ref_count + 1}, synchronize_session=False
+        )
+
+    def release(self, db: Session, *storage_paths: Optional[str]) -> List[str]:
+        """
+        Drop one reference per path. Returns the paths that became orphaned;
+        pass them to purge() after the transaction commits.
+        Call after the referencing rows have been deleted and flushed.
+        """
+        orphaned = []
+        for path in storage_paths:
+            if not path:
+                continue
+            obj = db.query(StoredObject).with_for_update().filter(StoredObject.storage_path == path).first()
+            if obj:
+                obj.ref_count = (obj.ref_count or 0) - 1
+                if obj.ref_count <= 0:
+                    db.delete(obj)
+                    orphaned.append(path)
+            elif self._legacy_reference_count(db, path) == 0:
+                # Pre-CAS object (uuid key or AP ingest key): count referencing rows instead
+                orphaned.append(path)
+        return orphaned
+
+    def reference_count(self, db: Session, storage_path: str) -> int:
+        """References held on an object (for a pre-CAS object: the rows pointing at it)."""
+        obj = db.query(StoredObject).filter(StoredObject.storage_path == storage_path).first()
+        if obj:
+            return obj.ref_count or 0
+        return self._legacy_reference_count(db, storage_path)
+
+    def purge(self, db: Session, storage_paths: List[str]):
+        """Delete orphaned objects from the bucket unless new content re-registered them meanwhile."""
+        for path in storage_paths:
+            if db.query(StoredObject).filter(StoredObject.storage_path == path).first():
+                continue
+            storage_service.delete_file(path)
+
+    def _legacy_reference_count(self, db: Session, storage_path: str) -> int:
+        columns = (
+            Job.storage_path, Job.original_storage_path, Job.playback_path,
+            AudioQueueItem.storage_path, AudioQueueItem.playback_path,
+            SupportingDocument.storage_path
+        )
+        return sum(
+            db.query(func.count()).filter(column == storage_path).scalar() or 0
+            for column in columns
+        )
+
+content_store = ContentStore()
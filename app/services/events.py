@@ -0,0 +1,128 @@
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Queue events go to everyone; job events only to the job's owner
+QUEUE_STREAM = "events:queue"
+SSE_RETRY_MS = 3000
+
+
+def user_stream(user_id: str) -> str:
+    return f"events:user:{user_id}"
+
+
+def _id_key(entry_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def format_event(event_type: str, data: str, cursor: Optional[str] = None) -> str:
+    """One SSE message; `data` is already JSON."""
+    lines = [f"id: {cursor}"] if cursor else []
+    lines += [f"event: {event_type}", f"data: {data}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class EventBus:
+    """
+    Live queue/job events for the UI, carried by Redis Streams (EVENTS_REDIS_URL).
+
+    The API and workers append with publish(); every SSE connection reads the
+    queue stream plus its user's stream with a blocking XREAD. Streams rather
+    than plain pub/sub so a reconnecting client resumes from its Last-Event-ID
+    (the SSE id is "<queue entry id>,<user entry id>"). Streams are capped at
+    EVENTS_STREAM_MAXLEN entries; a client that falls further behind gets a
+    "resync" event and reloads its lists. Publishing is best effort: without
+    Redis, or when it is down, the UI falls back to polling.
+    """
+
+    def __init__(self, redis_url: str = ""):
+        self.redis_url = redis_url
+        self._redis = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.redis_url)
+
+    def _client(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _async_client(self):
+        import redis.asyncio
+        return redis.asyncio.Redis.from_url(self.redis_url, decode_responses=True)
+
+    def publish(self, stream: str, event_type: str, **data):
+        if not self.enabled:
+            return
+        try:
+            self._client().xadd(
+                stream,
+                {"type": event_type, "data": json.dumps(data, default=str)},
+                maxlen=settings.EVENTS_STREAM_MAXLEN,
+                approximate=True
+            )
+        except Exception as e:
+            print(f"EventBus: publish {event_type} failed: {e}")
+
+    def queue_changed(self, event_type: str, queue_item_id: str, **data):
+        """queue.added / queue.claimed (nothing takes items off the queue any other way)"""
+        self.publish(QUEUE_STREAM, event_type, queue_item_id=queue_item_id, **data)
+
+    def job_status(self, user_id: str, job_id: str, status: str, **data):
+        self.publish(user_stream(user_id), "job.status", job_id=job_id, status=status, **data)
+
+    def jobs_removed(self, user_id: str, job_ids: List[str]):
+        if job_ids:
+            self.publish(user_stream(user_id), "job.removed", job_ids=job_ids)
+
+    async def stream(self, user_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """SSE messages for one connection, forever; keep-alive comments while idle."""
+        client = self._async_client()
+        keys = [QUEUE_STREAM, user_stream(user_id)]
+        try:
+            positions = self._parse_cursor(last_event_id)
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            if positions is None:
+                # New connection: only events from now on
+                positions = [await self._last_id(client, key) for key in keys]
+            elif any([await self._trimmed_past(client, key, position) for key, position in zip(keys, positions)]):
+                yield format_event("resync", "{}", ",".join(positions))
+
+            while True:
+                response = await client.xread(
+                    dict(zip(keys, positions)), count=100, block=settings.EVENTS_KEEPALIVE_SECONDS * 1000
+                )
+                if not response:
+                    yield ": keep-alive\n\n"
+                    continue
+                for key, entries in response:
+                    index = keys.index(key)
+                    for entry_id, fields in entries:
+                        positions[index] = entry_id
+                        yield format_event(fields.get("type", "message"), fields.get("data", "{}"), ",".join(positions))
+        finally:
+            await client.aclose()
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[List[str]]:
+        try:
+            positions = (cursor or "").split(",")
+            if len(positions) == 2 and all(_id_key(position) for position in positions):
+                return positions
+        except ValueError:
+            pass
+        return None
+
+    async def _last_id(self, client, key: str) -> str:
+        last = await client.xrevrange(key, count=1)
+        return last[0][0] if last else "0-0"
+
+    async def _trimmed_past(self, client, key: str, position: str) -> bool:
+        """True when entries after `position` may have been trimmed away."""
+        first = await client.xrange(key, count=1)
+        return bool(first) and _id_key(first[0][0]) > _id_key(position) and position != "0-0"
+
+event_bus = EventBus(settings.EVENTS_REDIS_URL)
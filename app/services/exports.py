@@ -0,0 +1,420 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.models import Job, SupportingDocument
+from app.services.storage import storage_service
+from app.services.transcript_store import transcript_store
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Part of the content hash: bump when render_docx output changes so cached files are rebuilt
+DOCX_LAYOUT_VERSION = 1
+
+
+def docx_paragraphs(text: str, metadata: Optional[dict]) -> List[str]:
+    """One paragraph per segment, or per non-empty line when there are no segments."""
+    segments = (metadata or {}).get("segments") or []
+    if segments:
+        return [seg.get("text", "") for seg in segments]
+    return [line for line in (text or "").split("\n") if line.strip()]
+
+
+def content_hash(title: str, paragraphs: List[str]) -> str:
+    payload = json.dumps([DOCX_LAYOUT_VERSION, title, paragraphs], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_docx(title: str, paragraphs: List[str]) -> bytes:
+    from docx import Document  # python-docx is slow to import; only renders need it
+    document = Document()
+    document.add_heading(title, 0)
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class ExportService:
+    """
+    Rendered DOCX transcripts cached in object storage under
+    exports/docx/<job_id>/<content hash>.docx. The hash covers exactly what
+    the document shows, so a cached file is current iff its hash matches the
+    transcript's; it doubles as the download's ETag.
+    """
+
+    def docx_source(self, job: Job) -> Tuple[List[str], str]:
+        """(paragraphs, content hash) for the job's current transcript."""
+        text, metadata = transcript_store.load(job.transcript)
+        paragraphs = docx_paragraphs(text, metadata)
+        return paragraphs, content_hash(job.original_filename, paragraphs)
+
+    def cached_docx(self, job: Job, digest: str) -> Optional[bytes]:
+        transcript = job.transcript
+        if transcript.docx_sha256 != digest or not transcript.docx_path:
+            return None
+        try:
+            return storage_service.read_bytes(transcript.docx_path)
+        except Exception as e:
+            print(f"Cached DOCX {transcript.docx_path} unreadable, re-rendering: {e}")
+            return None
+
+    def store_docx(self, db: Session, job: Job, paragraphs: List[str], digest: str) -> Tuple[bytes, List[str]]:
+        """
+        Render and upload the document, pointing the transcript at it. Returns
+        (docx bytes, superseded object keys to discard after commit).
+        """
+        data = render_docx(job.original_filename, paragraphs)
+        transcript = job.transcript
+        key = f"exports/docx/{job.id}/{digest}.docx"
+        try:
+            storage_service.upload_bytes(key, data, DOCX_MEDIA_TYPE)
+        except Exception as e:
+            # Still serve this download; the next one retries the upload
+            print(f"Could not cache DOCX for job {job.id}: {e}")
+            return data, []
+        stale = [transcript.docx_path] if transcript.docx_path and transcript.docx_path != key else []
+        transcript.docx_path = key
+        transcript.docx_sha256 = digest
+        return data, stale
+
+    def refresh_docx(self, db: Session, job: Job) -> List[str]:
+        """Pre-render after completion or an edit; no-op when the cached file is current."""
+        paragraphs, digest = self.docx_source(job)
+        if job.transcript.docx_sha256 == digest and job.transcript.docx_path:
+            return []
+        return self.store_docx(db, job, paragraphs, digest)[1]
+
+    def bundle_key(self, user_id: str, bundle_id: str) -> str:
+        return f"exports/bundles/{user_id}/{bundle_id}.zip"
+
+    def bundle_status_key(self, user_id: str, bundle_id: str) -> str:
+        return f"exports/bundles/{user_id}/{bundle_id}.json"
+
+    def set_bundle_status(self, user_id: str, bundle_id: str, status: str, error: Optional[str] = None):
+        """Status marker next to the ZIP: "pending" at dispatch, then "ready" or "failed" from the worker."""
+        marker = {"status": status, "error": error}
+        storage_service.upload_bytes(
+            self.bundle_status_key(user_id, bundle_id), json.dumps(marker).encode("utf-8"), "application/json"
+        )
+
+    def bundle_status(self, user_id: str, bundle_id: str) -> Optional[dict]:
+        """The marker written by set_bundle_status, or None for an unknown (or expired) bundle."""
+        try:
+            return json.loads(storage_service.read_bytes(self.bundle_status_key(user_id, bundle_id)))
+        except Exception:
+            return None
+
+    def purge_bundles(self, max_age: timedelta) -> int:
+        """Delete bundle ZIPs and their markers older than max_age; returns how many objects went."""
+        cutoff = datetime.now(timezone.utc) - max_age
+        expired = [key for key, modified in storage_service.list_objects("exports/bundles/") if modified < cutoff]
+        for key in expired:
+            storage_service.delete_file(key)
+        return len(expired)
+
+    def bundle_size(self, db: Session, job_ids: List[str], include_originals: bool = False) -> int:
+        """Approximate archive size (stored files only; transcripts are small) for picking sync vs background."""
+        total = db.query(func.coalesce(func.sum(SupportingDocument.file_size_bytes), 0)).filter(
+            SupportingDocument.job_id.in_(job_ids)
+        ).scalar() or 0
+        if include_originals:
+            total += db.query(func.coalesce(func.sum(Job.file_size_bytes), 0)).filter(Job.id.in_(job_ids)).scalar() or 0
+        return int(total)
+
+    def bundle(self, db: Session, job_ids: List[str], include_originals: bool = False) -> Iterator[bytes]:
+        """
+        ZIP of the jobs' transcripts (DOCX), supporting documents and, optionally,
+        original recordings: one folder per job. Built while it is sent: stored
+        files are piped from the bucket chunk by chunk, so memory stays at a
+        chunk per member and nothing touches disk. Jobs are loaded one at a
+        time through `db`, which may be reopened after the request ends.
+        """
+        archive = ZipStream()
+        folders = set()
+        for job_id in job_ids:
+            job = db.query(Job).options(selectinload(Job.supporting_documents)).filter(Job.id == job_id).first()
+            if job is None:
+                continue
+            folder = _unique_name(folders, _safe_name(os.path.splitext(job.original_filename)[0]) or job.id)
+
+            if job.transcript:
+                paragraphs, digest = self.docx_source(job)
+                docx = self.cached_docx(job, digest) or render_docx(job.original_filename, paragraphs)
+                yield from archive.add(f"{folder}/transcript.docx", [docx])
+
+            names = set()
+            if include_originals:
+                path = job.original_storage_path or job.storage_path
+                # After archival without a kept original, this is the Opus copy
+                extension = os.path.splitext(path)[1] if path == job.storage_path else ""
+                stem, original_extension = os.path.splitext(_safe_name(job.original_filename))
+                name = _unique_name(names, stem + (extension or original_extension))
+                yield from self._add_object(archive, f"{folder}/{name}", path, job.file_size_bytes, compress=False)
+
+            for document in job.supporting_documents:
+                name = _unique_name(names, _safe_name(document.original_filename) or document.id)
+                yield from self._add_object(archive, f"{folder}/documents/{name}", document.storage_path, document.file_size_bytes)
+            db.expunge_all()
+        yield archive.close()
+
+    def _add_object(self, archive: "ZipStream", name: str, path: str, size: Optional[int], compress: bool = True) -> Iterator[bytes]:
+        # Open the object before starting the member, so a missing file becomes a note rather than a broken archive
+        chunks = storage_service.iter_object(path)
+        try:
+            first = next(chunks, b"")
+        except Exception as e:
+            print(f"Export bundle: cannot read {path}: {e}")
+            yield from archive.add(f"{name}.missing.txt", [f"{os.path.basename(name)} could not be read from storage.\n".encode("utf-8")])
+            return
+        large = size is None or size >= zipfile.ZIP64_LIMIT
+        yield from archive.add(name, _prepend(first, chunks), compress=compress, large=large)
+
+export_service = ExportService()
+
+
+def _safe_name(name: Optional[str]) -> str:
+    """A single path component: no separators, control characters or dot-only names."""
+    name = re.sub(r'[\x00-\x1f/\\:*?"<>|]+', "_", name or "").strip().strip(".")
+    return name[:150]
+
+
+def _unique_name(used: set, name: str) -> str:
+    candidate, counter = name, 2
+    stem, extension = os.path.splitext(name)
+    while candidate.lower() in used:
+        candidate = f"{stem} ({counter}){extension}"
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _prepend(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    if first:
+        yield first
+    yield from rest
+
+
+# =====================================================
+# Streaming writers (ledger export, ZIP bundles)
+# =====================================================
+
+# Ledger columns in export order
+LEDGER_COLUMNS = (
+    "id", "original_filename", "status", "service_type", "client_name", "client_surname",
+    "date_of_birth", "phone_number", "payment", "duration_seconds", "login_date", "created_at", "completed_at"
+)
+# Rows per chunk handed to the response (and per server-side cursor fetch)
+EXPORT_BATCH_ROWS = 500
+
+
+def _batches(rows: Iterable[Sequence[Any]]) -> Iterator[List[Sequence[Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+# Spreadsheet apps evaluate a CSV cell starting with one of these as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    """_iso, and user-entered text that would open as a formula is quoted with a leading '."""
+    value = _iso(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """UTF-8 CSV with a BOM (so spreadsheet apps detect the encoding), one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    for batch in _batches(rows):
+        writer.writerows([[_csv_cell(value) for value in row] for row in batch])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    for batch in _batches(rows):
+        yield "".join(
+            json.dumps(dict(zip(header, map(_iso, row))), ensure_ascii=False) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable target: zipfile falls back to data descriptors and we drain what it wrote."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Builds a ZIP archive while it is being sent: each member is fed from an
+    iterator of chunks and the compressed bytes are yielded straight away, so
+    nothing is buffered beyond the current chunk.
+    """
+
+    def __init__(self):
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name: str, chunks: Iterable[bytes], compress: bool = True, large: bool = False) -> Iterator[bytes]:
+        """Yield archive bytes for one member. `large` allows members over 4 GiB (ZIP64)."""
+        info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with self._zip.open(info, "w", force_zip64=large) as member:
+            for chunk in chunks:
+                member.write(chunk)
+                data = self._sink.drain()
+                if data:
+                    yield data
+        yield self._sink.drain()
+
+    def close(self) -> bytes:
+        """The central directory; the final chunk of the archive."""
+        self._zip.close()
+        return self._sink.drain()
+
+
+# Characters XML 1.0 cannot carry, even escaped
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Ledger" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Style 1: dates (yyyy-mm-dd hh:mm), style 2: bold header
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref: str, value: Any, style: int = 0) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value.replace(tzinfo=None) - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial:.6f}</v></c>'
+    text = escape(_XML_INVALID.sub("", str(value)))
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_sheet(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    letters = [_column_letter(i) for i in range(len(header))]
+    header_cells = "".join(_xlsx_cell(f"{letters[i]}1", name, style=2) for i, name in enumerate(header))
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetData><row r="1">{header_cells}</row>'
+    ).encode("utf-8")
+    row_number = 1
+    for batch in _batches(rows):
+        parts = []
+        for row in batch:
+            row_number += 1
+            cells = "".join(_xlsx_cell(f"{letters[i]}{row_number}", value) for i, value in enumerate(row))
+            parts.append(f'<row r="{row_number}">{cells}</row>')
+        yield "".join(parts).encode("utf-8")
+    yield b"</sheetData></worksheet>"
+
+
+def stream_xlsx(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """A single-sheet workbook written row batch by row batch (inline strings, no shared-string table)."""
+    archive = ZipStream()
+    for name, xml in _XLSX_STATIC.items():
+        yield from archive.add(name, [xml.encode("utf-8")])
+    yield from archive.add("xl/worksheets/sheet1.xml", _xlsx_sheet(header, rows))
+    yield archive.close()
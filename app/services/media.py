@@ -0,0 +1,118 @@
+import os
+import subprocess
+from array import array
+
+# Waveform resolution: one uint8 peak per 100 ms (36 KB for an hour of audio)
+PEAKS_PER_SECOND = 10
+_PEAKS_SAMPLE_RATE = 8000
+
+
+def get_audio_duration_ffprobe(file_path: str) -> float:
+    """Use ffprobe to get audio duration in seconds. Returns 0 on failure."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return float(result.stdout.strip())
+    except Exception as e:
+        print(f"ffprobe duration failed: {e}")
+    return 0.0
+
+
+def transcode_to_opus(input_path: str, output_path: str, bitrate: str = "24k"):
+    """
+    Speech-optimized Opus in an Ogg container: mono, VOIP tuning, no video.
+    Raises subprocess.CalledProcessError / FileNotFoundError on failure.
+    """
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", input_path, "-vn", "-ac", "1",
+         "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+         "-f", "ogg", output_path],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def transcode_playback_rendition(input_path: str, output_path: str, bitrate: str = "32k"):
+    """
+    Browser playback copy: mono Opus in WebM (plays in every current browser's
+    <audio>, seekable via the Cues index written at the end of the file).
+    """
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", input_path, "-vn", "-ac", "1",
+         "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+         "-f", "webm", output_path],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def segment_hls(input_path: str, output_dir: str, segment_seconds: int = 6, bitrate: str = "48k") -> str:
+    """
+    VOD HLS ladder with a single low-bitrate AAC rendition (AAC rather than
+    Opus so Safari's native player accepts the MPEG-TS segments).
+    Returns the playlist path; segments are written next to it.
+    """
+    playlist = os.path.join(output_dir, "index.m3u8")
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", input_path, "-vn", "-ac", "1",
+         "-c:a", "aac", "-b:a", bitrate,
+         "-f", "hls", "-hls_time", str(segment_seconds), "-hls_playlist_type", "vod",
+         "-hls_segment_filename", os.path.join(output_dir, "seg_%05d.ts"), playlist],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    return playlist
+
+
+def durations_match(original: float, transcoded: float) -> bool:
+    """A transcode is accepted when it plays for as long as the source (1s or 1% slack)."""
+    if original <= 0 or transcoded <= 0:
+        return False
+    return abs(original - transcoded) <= max(1.0, original * 0.01)
+
+
+def compute_peaks(input_path: str, peaks_per_second: int = PEAKS_PER_SECOND) -> bytes:
+    """
+    Decode to 8 kHz mono PCM through an ffmpeg pipe and keep one max-amplitude
+    byte (0-255) per 1/peaks_per_second window. Memory stays at one window.
+    """
+    samples_per_peak = _PEAKS_SAMPLE_RATE // peaks_per_second
+    window_bytes = samples_per_peak * 2
+    process = subprocess.Popen(
+        ["ffmpeg", "-v", "quiet", "-i", input_path, "-vn", "-ac", "1",
+         "-ar", str(_PEAKS_SAMPLE_RATE), "-f", "s16le", "-"],
+        stdout=subprocess.PIPE
+    )
+    peaks = bytearray()
+    pending = b""
+    try:
+        while True:
+            data = process.stdout.read(window_bytes * 64)
+            if not data:
+                break
+            pending += data
+            usable = len(pending) - len(pending) % window_bytes
+            for start in range(0, usable, window_bytes):
+                peaks.append(_window_peak(pending[start:start + window_bytes]))
+            pending = pending[usable:]
+        if len(pending) >= 2:
+            peaks.append(_window_peak(pending[:len(pending) - len(pending) % 2]))
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg peak extraction failed with exit code {returncode}")
+    return bytes(peaks)
+
+
+def _window_peak(pcm: bytes) -> int:
+    samples = array("h", pcm)
+    amplitude = max(max(samples), -min(samples))
+    return min(255, amplitude * 255 // 32767)
@@ -0,0 +1,162 @@
+import html
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, undefer
+
+from app.core.config import settings
+from app.db.models import Job, JobStatus, Transcript
+from app.services.transcript_store import transcript_store
+
+# Ledger fields folded into the index; they outrank transcript words
+LEDGER_FIELDS = ("client_name", "client_surname", "service_type", "phone_number", "payment", "original_filename")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SNIPPET_CHARS = 160
+
+
+def _fold(value: str) -> str:
+    """Lowercase and strip accents one character at a time, so offsets map back to the original."""
+    folded = []
+    for char in value:
+        base = unicodedata.normalize("NFKD", char)[:1] or char
+        folded.append((base.lower() or base)[:1])
+    return "".join(folded)
+
+
+def query_terms(q: str) -> List[str]:
+    return [term for term in _TOKEN_RE.findall(_fold(q)) if term]
+
+
+def highlight(value: str, terms: Iterable[str], width: int = _SNIPPET_CHARS) -> Optional[str]:
+    """
+    HTML-escaped snippet of `value` around the first matching term, with every
+    term occurrence wrapped in <mark>. Returns None when nothing matches.
+    """
+    terms = sorted({t for t in terms if t}, key=len, reverse=True)
+    if not value or not terms:
+        return None
+    folded = _fold(value)
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b")
+    first = pattern.search(folded)
+    if not first:
+        return None
+
+    start = max(0, first.start() - width // 3)
+    end = min(len(value), start + width)
+    # Snap the window to word boundaries
+    if start > 0:
+        space = value.find(" ", start)
+        start = space + 1 if 0 <= space < first.start() else start
+    if end < len(value):
+        space = value.rfind(" ", first.end(), end)
+        end = space if space > 0 else end
+
+    parts = ["…"] if start > 0 else []
+    cursor = start
+    for match in pattern.finditer(folded, start, end):
+        parts.append(html.escape(value[cursor:match.start()]))
+        parts.append("<mark>" + html.escape(value[match.start():match.end()]) + "</mark>")
+        cursor = match.end()
+    parts.append(html.escape(value[cursor:end]))
+    if end < len(value):
+        parts.append("…")
+    return "".join(parts)
+
+
+def ledger_text(job: Job) -> str:
+    return " ".join(str(getattr(job, field)) for field in LEDGER_FIELDS if getattr(job, field))
+
+
+class SearchIndex:
+    """
+    Full-text index over transcripts and ledger fields, one row per job in
+    job_search (created alongside the models, see app/db/models.py).
+
+    Postgres stores a weighted tsvector (ledger 'A', transcript 'B') behind a
+    GIN index and ranks with ts_rank_cd; SQLite uses an FTS5 table ranked by
+    bm25. Rows are written in the caller's transaction, so the index commits
+    together with the transcript or ledger change that produced it.
+    """
+
+    def index_job(self, db: Session, job: Job, transcript_text: Optional[str] = None):
+        if transcript_text is None:
+            transcript_text = transcript_store.load_text(job.transcript) if job.transcript else ""
+        params = {
+            "job_id": job.id,
+            "user_id": job.user_id,
+            "ledger": ledger_text(job),
+            "transcript": transcript_text or "",
+        }
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text(
+                "INSERT INTO job_search (job_id, user_id, document) VALUES (:job_id, :user_id, "
+                "setweight(to_tsvector(CAST(:cfg AS regconfig), :ledger), 'A') || "
+                "setweight(to_tsvector(CAST(:cfg AS regconfig), :transcript), 'B')) "
+                "ON CONFLICT (job_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document"
+            ), {**params, "cfg": settings.SEARCH_TS_CONFIG})
+        else:
+            db.execute(text("DELETE FROM job_search WHERE job_id = :job_id"), params)
+            db.execute(text(
+                "INSERT INTO job_search (job_id, user_id, ledger, transcript) "
+                "VALUES (:job_id, :user_id, :ledger, :transcript)"
+            ), params)
+
+    def remove_jobs(self, db: Session, job_ids: List[str]):
+        for job_id in job_ids:
+            db.execute(text("DELETE FROM job_search WHERE job_id = :job_id"), {"job_id": job_id})
+
+    def search(self, db: Session, user_id: str, q: str, limit: int = 20, offset: int = 0) -> Tuple[List[Tuple[Job, float, Optional[str]]], bool]:
+        """
+        Ranked matches for the user's non-trashed jobs. Returns ([(job, rank,
+        highlight)], has_more); one extra row is fetched to detect further pages.
+        """
+        terms = query_terms(q)
+        if not terms:
+            return [], False
+        params = {"user_id": user_id, "trashed": JobStatus.TRASHED.value, "limit": limit + 1, "offset": offset}
+
+        if db.get_bind().dialect.name == "postgresql":
+            statement = text(
+                "SELECT s.job_id, ts_rank_cd(s.document, query) AS rank "
+                "FROM job_search s JOIN jobs j ON j.id = s.job_id, "
+                "websearch_to_tsquery(CAST(:cfg AS regconfig), :q) query "
+                "WHERE s.user_id = :user_id AND j.status != :trashed AND s.document @@ query "
+                "ORDER BY rank DESC, j.created_at DESC, j.id LIMIT :limit OFFSET :offset"
+            )
+            params.update(cfg=settings.SEARCH_TS_CONFIG, q=q)
+        else:
+            # Every term must match; bm25 is lower-is-better, ledger hits weigh 4x
+            statement = text(
+                "SELECT s.job_id, -bm25(job_search, 0.0, 0.0, 4.0, 1.0) AS rank "
+                "FROM job_search s JOIN jobs j ON j.id = s.job_id "
+                "WHERE job_search MATCH :q AND s.user_id = :user_id AND j.status != :trashed "
+                "ORDER BY rank DESC, j.created_at DESC, j.id LIMIT :limit OFFSET :offset"
+            )
+            params["q"] = " ".join('"%s"' % term for term in terms)
+
+        rows = db.execute(statement, params).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return [], has_more
+
+        ids = [row[0] for row in rows]
+        jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(ids)).all()}
+        transcripts = db.query(Transcript).options(
+            undefer(Transcript.text_content), undefer(Transcript.body_blob)
+        ).filter(Transcript.job_id.in_(ids)).all()
+        texts = {t.job_id: transcript_store.load_text(t) for t in transcripts}
+
+        hits = []
+        for job_id, rank in rows:
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            snippet = highlight(texts.get(job_id) or "", terms) or highlight(ledger_text(job), terms)
+            hits.append((job, float(rank or 0), snippet))
+        return hits, has_more
+
+search_index = SearchIndex()
@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.base import dialect_insert
+from app.db.models import DailyJobStat, Job, User, UserJobStat
+
+
+def _utc_day(value: Optional[datetime]) -> date:
+    return (value or datetime.now(timezone.utc)).date()
+
+
+class StatsService:
+    """
+    Job counters kept up to date at write time so the dashboard never scans jobs:
+    lifetime totals on User and the per-day DailyJobStat rollup. All increments
+    are single UPDATE/UPSERT statements inside the caller's transaction.
+    """
+
+    def record_upload(self, db: Session, user_id: str, created_at: Optional[datetime] = None, duration_seconds: Optional[int] = None):
+        db.query(User).filter(User.id == user_id).update(
+            {User.total_uploads: func.coalesce(User.total_uploads, 0) + 1}, synchronize_session=False
+        )
+        self._bump_day(db, user_id, _utc_day(created_at), uploaded=1)
+        self._bump_user(db, user_id, jobs=1, duration=duration_seconds or 0)
+
+    def record_completion(self, db: Session, user_id: str, created_at: Optional[datetime] = None, duration_delta: int = 0, first: bool = True):
+        """
+        duration_delta: the job's final duration minus whatever it carried before processing.
+        first: False when a job that already completed once was reprocessed; it is not counted again.
+        """
+        if first:
+            db.query(User).filter(User.id == user_id).update(
+                {User.total_completed: func.coalesce(User.total_completed, 0) + 1}, synchronize_session=False
+            )
+            self._bump_day(db, user_id, _utc_day(created_at), completed=1)
+        if duration_delta:
+            self._bump_user(db, user_id, duration=duration_delta)
+
+    def record_deletion(self, db: Session, jobs: List[Job]):
+        """Jobs being permanently deleted leave the admin totals (lifetime counters are kept)."""
+        for job in jobs:
+            if job.user_id:
+                self._bump_user(db, job.user_id, jobs=-1, duration=-(job.duration_seconds or 0))
+
+    def _bump_user(self, db: Session, user_id: str, jobs: int = 0, duration: int = 0):
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(UserJobStat).values(user_id=user_id, job_count=jobs, duration_seconds=duration)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserJobStat.user_id],
+            set_={
+                "job_count": UserJobStat.job_count + jobs,
+                "duration_seconds": UserJobStat.duration_seconds + duration,
+            }
+        )
+        db.execute(stmt)
+
+    def user_totals(self, db: Session, materialized: bool = True):
+        """
+        (username, last_login, is_admin, job_count, duration_seconds) for every
+        login user in one query: a join on user_job_stats, or a LEFT JOIN +
+        GROUP BY over jobs when materialized is False.
+        """
+        if materialized:
+            return db.query(
+                User.username, User.last_login, User.is_admin,
+                func.coalesce(UserJobStat.job_count, 0),
+                func.coalesce(UserJobStat.duration_seconds, 0)
+            ).outerjoin(UserJobStat, UserJobStat.user_id == User.id).filter(
+                User.username != None
+            ).all()
+
+        return db.query(
+            User.username, User.last_login, User.is_admin,
+            func.count(Job.id),
+            func.coalesce(func.sum(Job.duration_seconds), 0)
+        ).outerjoin(Job, Job.user_id == User.id).filter(
+            User.username != None
+        ).group_by(User.id, User.username, User.last_login, User.is_admin).all()
+
+    def rebuild_user_totals(self, db: Session) -> int:
+        """Recompute user_job_stats from jobs in one grouped pass (repairs any drift)."""
+        rows = db.query(
+            Job.user_id, func.count(Job.id), func.coalesce(func.sum(Job.duration_seconds), 0)
+        ).filter(Job.user_id != None).group_by(Job.user_id).all()
+        db.query(UserJobStat).delete(synchronize_session=False)
+        db.bulk_insert_mappings(UserJobStat, [
+            {"user_id": user_id, "job_count": count, "duration_seconds": duration}
+            for user_id, count, duration in rows
+        ])
+        return len(rows)
+
+    def _bump_day(self, db: Session, user_id: str, day: date, uploaded: int = 0, completed: int = 0):
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(DailyJobStat).values(user_id=user_id, day=day, uploaded=uploaded, completed=completed)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyJobStat.user_id, DailyJobStat.day],
+            set_={
+                "uploaded": DailyJobStat.uploaded + uploaded,
+                "completed": DailyJobStat.completed + completed,
+            }
+        )
+        db.execute(stmt)
+
+    def daily_counts(self, db: Session, user_id: str, start: date, end: date) -> List[dict]:
+        """Rollup rows for start..end inclusive, one entry per day (zeros filled in)."""
+        rows = db.query(DailyJobStat.day, DailyJobStat.uploaded, DailyJobStat.completed).filter(
+            DailyJobStat.user_id == user_id,
+            DailyJobStat.day >= start,
+            DailyJobStat.day <= end
+        ).all()
+        return self._fill_days(start, end, {row.day: (row.uploaded, row.completed) for row in rows})
+
+    def _fill_days(self, start: date, end: date, counts: dict) -> List[dict]:
+        days = []
+        current = start
+        while current <= end:
+            uploaded, completed = counts.get(current, (0, 0))
+            days.append({
+                "date": current.strftime("%Y-%m-%d"),
+                "label": current.strftime("%a"),
+                "uploaded": uploaded,
+                "completed": completed
+            })
+            current += timedelta(days=1)
+        return days
+
+stats_service = StatsService()
@@ -1,50 +1,117 @@
+import io
 import os
+import threading
 import uuid
-from typing import BinaryIO
-from google.cloud import storage
-from google.oauth2 import service_account
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
 import json
-import boto3
-from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.services.ingest import IngestReader, IngestResult
+
+class _ChunkReader(io.RawIOBase):
+    """File-like view of an iterator of byte chunks (for SDK uploads that expect read())."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Fill the whole buffer across chunks: a short read makes s3transfer treat
+        # the stream as small and fall back to one PutObject of everything
+        filled = 0
+        while filled < len(buffer):
+            if not self._pending:
+                self._pending = next(self._chunks, b"")
+                if not self._pending:
+                    break
+            size = min(len(buffer) - filled, len(self._pending))
+            buffer[filled:filled + size] = self._pending[:size]
+            self._pending = self._pending[size:]
+            filled += size
+        return filled
+
+class StorageNotConfiguredError(RuntimeError, AttributeError):
+    """
+    No backend could be connected. Also an AttributeError, so getattr() with a
+    default and hasattr() on an unconfigured service answer "not set" instead
+    of raising (monkeypatch.setattr relies on that).
+    """
 
 class StorageService:
+    """
+    Object storage (S3-compatible or GCS). The client is created on first use,
+    or by ready() from the startup warm-up, rather than when the module is
+    imported: importing the app stays free of network calls.
+    """
+
+    # Set by _connect(); reading any of them before that connects
+    _CONNECTED_ATTRIBUTES = {"mode", "bucket", "bucket_name", "client", "s3_client", "s3_bucket_name"}
+
     def __init__(self):
-        self.mode = None
-        self.bucket = None
-        self.s3_client = None
-        
-        # S3 / Railway Object Storage Check (priority)
-        if settings.S3_ACCESS_KEY_ID and settings.S3_SECRET_ACCESS_KEY:
-            try:
-                self._init_s3()
-                self.mode = "S3"
-                print(f"StorageService initialized in S3 mode. Bucket: {settings.S3_BUCKET_NAME}")
-            except Exception as e:
-                print(f"Failed to initialize S3, checking GCS... Error: {e}")
-                self._check_gcs()
-        else:
-             self._check_gcs()
+        self._connect_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name not in StorageService._CONNECTED_ATTRIBUTES:
+            raise AttributeError(name)
+        self._connect()
+        return object.__getattribute__(self, name)
+
+    def _connect(self):
+        with self._connect_lock:
+            if "mode" in self.__dict__:
+                return
+            self.bucket = None
+            self.s3_client = None
+            mode = None
+
+            # S3 / Railway Object Storage Check (priority)
+            if settings.S3_ACCESS_KEY_ID and settings.S3_SECRET_ACCESS_KEY:
+                try:
+                    self._init_s3()
+                    mode = "S3"
+                    print(f"StorageService initialized in S3 mode. Bucket: {settings.S3_BUCKET_NAME}")
+                except Exception as e:
+                    print(f"Failed to initialize S3, checking GCS... Error: {e}")
+                    mode = self._check_gcs()
+            else:
+                mode = self._check_gcs()
+
+            if mode is None:
+                # Not cached: the next use tries again
+                raise StorageNotConfiguredError(
+                    "StorageService: No remote storage configured! "
+                    "Set S3_ACCESS_KEY_ID/S3_SECRET_ACCESS_KEY (Railway Object Storage) "
+                    "or GCP_CREDENTIALS_JSON (GCS). Local storage is disabled."
+                )
+            self.mode = mode
+
+    def ready(self) -> bool:
+        """Connect now if not yet connected; False when storage is unavailable (readiness probe)."""
+        try:
+            self._connect()
+            return True
+        except Exception as e:
+            print(f"StorageService not ready: {e}")
+            return False
 
-        if self.mode is None:
-            raise RuntimeError(
-                "StorageService: No remote storage configured! "
-                "Set S3_ACCESS_KEY_ID/S3_SECRET_ACCESS_KEY (Railway Object Storage) "
-                "or GCP_CREDENTIALS_JSON (GCS). Local storage is disabled."
-            )
-              
     def _check_gcs(self):
         # GCS Check
         self.bucket_name = settings.GCP_BUCKET_NAME
         if self.bucket_name and (settings.GCP_CREDENTIALS_JSON or os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or settings.GCP_PROJECT != "test-project"):
             try:
                 self._init_gcs()
-                self.mode = "GCS"
                 print(f"StorageService initialized in GCS mode. Bucket: {self.bucket_name}")
+                return "GCS"
             except Exception as e:
                 print(f"Failed to initialize GCS: {e}")
+        return None
         
     def _init_s3(self):
+        # SDKs are imported for the configured backend only (boto3 and google-cloud-storage are both slow to import)
+        import boto3
         self.s3_bucket_name = settings.S3_BUCKET_NAME
         self.s3_client = boto3.client(
             's3',
@@ -57,6 +124,8 @@ class StorageService:
         self.s3_client.head_bucket(Bucket=self.s3_bucket_name)
 
     def _init_gcs(self):
+        from google.cloud import storage
+        from google.oauth2 import service_account
         credentials = None
         
         if settings.GCP_CREDENTIALS_JSON:
@@ -74,19 +143,246 @@ class StorageService:
         self.bucket = self.client.bucket(self.bucket_name)
 
     def save_file(self, file_obj: BinaryIO, filename: str) -> str:
+        return self.ingest_file(file_obj, filename).storage_path
+
+    def ingest_file(self, file_obj: BinaryIO, filename: str, content_type: Optional[str] = None) -> IngestResult:
+        """
+        Stream an upload to the bucket, computing size, SHA-256 and MIME type
+        from the same bytes the SDK sends — the file is never read twice.
+        """
         ext = filename.split('.')[-1] if '.' in filename else "bin"
         unique_name = f"{uuid.uuid4()}.{ext}"
 
+        file_obj.seek(0)
+        reader = IngestReader(file_obj)
+
         if self.mode == "S3":
-            file_obj.seek(0)
-            self.s3_client.upload_fileobj(file_obj, self.s3_bucket_name, unique_name)
-            return unique_name
-            
+            self.s3_client.upload_fileobj(reader, self.s3_bucket_name, unique_name)
+
+        elif self.mode == "GCS":
+            blob = self.bucket.blob(unique_name)
+            blob.upload_from_file(reader)
+
+        return reader.result(unique_name, filename, content_type)
+
+    def copy_object(self, src_path: str, dst_path: str):
+        """Server-side copy inside the bucket (no bytes pass through the API)."""
+        if self.mode == "S3":
+            self.s3_client.copy({"Bucket": self.s3_bucket_name, "Key": src_path}, self.s3_bucket_name, dst_path)
+        elif self.mode == "GCS":
+            self.bucket.copy_blob(self.bucket.blob(src_path), self.bucket, dst_path)
+
+    def upload_local_file(self, local_path: str, key: str, content_type: Optional[str] = None):
+        """Upload a worker-generated file to an exact key (e.g. HLS segments that reference each other by name)."""
+        if self.mode == "S3":
+            extra = {"ContentType": content_type} if content_type else None
+            self.s3_client.upload_file(local_path, self.s3_bucket_name, key, ExtraArgs=extra)
+        elif self.mode == "GCS":
+            self.bucket.blob(key).upload_from_filename(local_path, content_type=content_type)
+
+    def object_size(self, relative_path: str) -> int:
+        if self.mode == "S3":
+            return self.s3_client.head_object(Bucket=self.s3_bucket_name, Key=relative_path)["ContentLength"]
+        elif self.mode == "GCS":
+            blob = self.bucket.get_blob(relative_path)
+            if blob is None:
+                raise FileNotFoundError(relative_path)
+            return blob.size
+        raise RuntimeError("StorageService: no backend configured")
+
+    def iter_range(self, relative_path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """Yield bytes start..end (inclusive) straight from the bucket with ranged GETs."""
+        if self.mode == "S3":
+            body = self.s3_client.get_object(
+                Bucket=self.s3_bucket_name, Key=relative_path, Range=f"bytes={start}-{end}"
+            )["Body"]
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+        elif self.mode == "GCS":
+            blob = self.bucket.blob(relative_path)
+            position = start
+            while position <= end:
+                window_end = min(end, position + chunk_size - 1)
+                yield blob.download_as_bytes(start=position, end=window_end)
+                position = window_end + 1
+
+    def iter_object(self, relative_path: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield a whole object in chunks, never holding more than one in memory."""
+        if self.mode == "S3":
+            body = self.s3_client.get_object(Bucket=self.s3_bucket_name, Key=relative_path)["Body"]
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+        elif self.mode == "GCS":
+            with self.bucket.blob(relative_path).open("rb", chunk_size=chunk_size) as reader:
+                while True:
+                    chunk = reader.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            raise RuntimeError("StorageService: no backend configured")
+
+    def upload_stream(self, key: str, chunks: Iterable[bytes], content_type: Optional[str] = None):
+        """Write an object of unknown length from an iterator (multipart/resumable, nothing staged on disk)."""
+        if self.mode == "S3":
+            extra = {"ContentType": content_type} if content_type else None
+            self.s3_client.upload_fileobj(_ChunkReader(chunks), self.s3_bucket_name, key, ExtraArgs=extra)
+        elif self.mode == "GCS":
+            with self.bucket.blob(key).open("wb", content_type=content_type) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+
+    def upload_bytes(self, key: str, data: bytes, content_type: Optional[str] = None):
+        """Write a small in-memory object to an exact key."""
+        if self.mode == "S3":
+            extra = {"ContentType": content_type} if content_type else {}
+            self.s3_client.put_object(Bucket=self.s3_bucket_name, Key=key, Body=data, **extra)
+        elif self.mode == "GCS":
+            self.bucket.blob(key).upload_from_string(data, content_type=content_type)
+
+    def read_bytes(self, relative_path: str) -> bytes:
+        if self.mode == "S3":
+            body = self.s3_client.get_object(Bucket=self.s3_bucket_name, Key=relative_path)["Body"]
+            try:
+                return body.read()
+            finally:
+                body.close()
+        elif self.mode == "GCS":
+            return self.bucket.blob(relative_path).download_as_bytes()
+        raise RuntimeError("StorageService: no backend configured")
+
+    def read_text(self, relative_path: str) -> str:
+        return self.read_bytes(relative_path).decode("utf-8")
+
+    def signed_url(self, relative_path: str, expires_seconds: int, content_type: Optional[str] = None) -> Optional[str]:
+        """Time-limited direct-download URL, or None when the credentials cannot sign."""
+        try:
+            if self.mode == "S3":
+                params = {"Bucket": self.s3_bucket_name, "Key": relative_path}
+                if content_type:
+                    params["ResponseContentType"] = content_type
+                return self.s3_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_seconds)
+            elif self.mode == "GCS":
+                from datetime import timedelta
+                return self.bucket.blob(relative_path).generate_signed_url(
+                    version="v4", expiration=timedelta(seconds=expires_seconds), method="GET",
+                    response_type=content_type
+                )
+        except Exception as e:
+            print(f"Could not sign URL for {relative_path} in {self.mode}: {e}")
+        return None
+
+    def list_objects(self, prefix: str) -> Iterator[Tuple[str, datetime]]:
+        """(key, last modified) for every object under a prefix."""
+        if self.mode == "S3":
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.s3_bucket_name, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    yield obj["Key"], obj["LastModified"]
+        elif self.mode == "GCS":
+            for blob in self.client.list_blobs(self.bucket_name, prefix=prefix):
+                yield blob.name, blob.updated
+
+    def delete_prefix(self, prefix: str):
+        try:
+            if self.mode == "S3":
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                for page in paginator.paginate(Bucket=self.s3_bucket_name, Prefix=prefix):
+                    keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+                    if keys:
+                        self.s3_client.delete_objects(Bucket=self.s3_bucket_name, Delete={"Objects": keys})
+            elif self.mode == "GCS":
+                for blob in self.client.list_blobs(self.bucket_name, prefix=prefix):
+                    blob.delete()
+        except Exception as e:
+            print(f"Error deleting prefix {prefix} in {self.mode}: {e}")
+
+    def set_storage_class(self, relative_path: str, archival: bool = True):
+        """Move an object to the configured cold storage class (instant-retrieval tiers only)."""
+        try:
+            if self.mode == "S3":
+                self.s3_client.copy(
+                    {"Bucket": self.s3_bucket_name, "Key": relative_path},
+                    self.s3_bucket_name,
+                    relative_path,
+                    ExtraArgs={
+                        "StorageClass": settings.ARCHIVE_S3_STORAGE_CLASS if archival else "STANDARD",
+                        "MetadataDirective": "COPY"
+                    }
+                )
+            elif self.mode == "GCS":
+                blob = self.bucket.blob(relative_path)
+                blob.update_storage_class(settings.ARCHIVE_GCS_STORAGE_CLASS if archival else "STANDARD")
+        except Exception as e:
+            print(f"Error changing storage class of {relative_path} in {self.mode}: {e}")
+
+    def begin_multipart(self, filename: str, total_size: int, content_type: Optional[str] = None):
+        """
+        Open a backend-native resumable upload for a new object.
+        Returns (storage_path, upload_id) — an S3 UploadId or a GCS session URI.
+        """
+        ext = filename.split('.')[-1] if '.' in filename else "bin"
+        unique_name = f"{uuid.uuid4()}.{ext}"
+
+        if self.mode == "S3":
+            extra = {"ContentType": content_type} if content_type else {}
+            response = self.s3_client.create_multipart_upload(Bucket=self.s3_bucket_name, Key=unique_name, **extra)
+            return unique_name, response["UploadId"]
+
         elif self.mode == "GCS":
             blob = self.bucket.blob(unique_name)
-            file_obj.seek(0)
-            blob.upload_from_file(file_obj)
-            return unique_name
+            session_url = blob.create_resumable_upload_session(content_type=content_type, size=total_size)
+            return unique_name, session_url
+
+    def upload_part(self, relative_path: str, upload_id: str, part_number: int, data: bytes, offset: int, total_size: int) -> Optional[str]:
+        """Send one chunk of a resumable upload. Returns the part ETag on S3 (None on GCS)."""
+        if self.mode == "S3":
+            response = self.s3_client.upload_part(
+                Bucket=self.s3_bucket_name,
+                Key=relative_path,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data
+            )
+            return response["ETag"]
+
+        elif self.mode == "GCS":
+            import requests
+            end = offset + len(data) - 1
+            response = requests.put(
+                upload_id,
+                data=data,
+                headers={"Content-Range": f"bytes {offset}-{end}/{total_size}"},
+                timeout=300
+            )
+            # 308 = chunk accepted, more expected; 200/201 = object finalized
+            if response.status_code not in (200, 201, 308):
+                raise RuntimeError(f"StorageService: GCS chunk upload failed ({response.status_code}): {response.text}")
+            return None
+
+    def complete_multipart(self, relative_path: str, upload_id: str, parts: list):
+        if self.mode == "S3":
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=relative_path,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        # GCS finalizes the object itself when the last byte arrives
+
+    def abort_multipart(self, relative_path: str, upload_id: str):
+        try:
+            if self.mode == "S3":
+                self.s3_client.abort_multipart_upload(Bucket=self.s3_bucket_name, Key=relative_path, UploadId=upload_id)
+            elif self.mode == "GCS":
+                import requests
+                requests.delete(upload_id, timeout=30)
+        except Exception as e:
+            print(f"Error aborting multipart upload {relative_path} in {self.mode}: {e}")
 
     def get_full_path(self, relative_path: str) -> str:
         # Remote paths are just their keys/names
@@ -127,6 +423,7 @@ class StorageService:
         if self.mode == "S3":
             # Just in case there is a leading slash causing a 404 on AWS/Minio
             s3_key = relative_path.lstrip('/')
+            from botocore.exceptions import ClientError
             try:
                 self.s3_client.download_file(self.s3_bucket_name, s3_key, tmp.name)
                 return tmp.name
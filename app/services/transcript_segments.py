@@ -0,0 +1,217 @@
+import difflib
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models import TranscriptSegment, TranscriptVersion
+
+
+def time_to_ms(value: Any) -> Optional[int]:
+    """Float seconds or 'HH:MM:SS'/'MM:SS' to milliseconds; None when unknown (e.g. '--:--:--')."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value * 1000))
+    if isinstance(value, str):
+        try:
+            return int(round(float(value) * 1000))
+        except ValueError:
+            pass
+        parts = value.strip().split(":")
+        try:
+            seconds = 0.0
+            for part in parts:
+                seconds = seconds * 60 + float(part)
+            return int(round(seconds * 1000)) if len(parts) in (2, 3) else None
+        except ValueError:
+            return None
+    return None
+
+
+def segment_rows(text: str, metadata: Optional[dict]) -> List[dict]:
+    """The transcriber's segments, or one untimed segment per paragraph when it returned none."""
+    segments = (metadata or {}).get("segments") or []
+    if segments:
+        return [
+            {"start_ms": time_to_ms(seg.get("start")), "end_ms": time_to_ms(seg.get("end")), "text": seg.get("text", "")}
+            for seg in segments
+        ]
+    return [{"start_ms": None, "end_ms": None, "text": line} for line in (text or "").split("\n") if line.strip()]
+
+
+def apply_ops(text: str, ops: List[dict]) -> str:
+    """Apply non-overlapping {start, end, text} replacements (offsets into `text`). Raises ValueError."""
+    result = text
+    previous_start = len(text)
+    for op in sorted(ops, key=lambda o: o["start"], reverse=True):
+        start, end = op["start"], op["end"]
+        if not 0 <= start <= end <= previous_start:
+            raise ValueError(f"Edit range {start}-{end} is out of bounds or overlaps another edit")
+        result = result[:start] + op.get("text", "") + result[end:]
+        previous_start = start
+    return result
+
+
+def reverse_op(old: str, new: str) -> dict:
+    """The single replacement that turns `new` back into `old` (common prefix/suffix trimmed)."""
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return {"start": prefix, "end": len(new) - suffix, "text": old[prefix:len(old) - suffix]}
+
+
+def split_like(old_texts: List[str], separator: str, new_text: str) -> List[str]:
+    """
+    Cut a full-text edit back into the existing segments (same count, so their
+    timings still apply). The texts are diffed word by word: boundaries in
+    unchanged stretches move with the text, and a change that spans a boundary
+    goes to the segment it starts in.
+    """
+    old_text = separator.join(old_texts)
+    old_words = re.findall(r"\s+|\S+", old_text)
+    new_words = re.findall(r"\s+|\S+", new_text)
+    old_starts = list(accumulate((len(word) for word in old_words), initial=0))
+    new_starts = list(accumulate((len(word) for word in new_words), initial=0))
+    opcodes = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False).get_opcodes()
+
+    def new_offset(old_offset: int) -> int:
+        word = bisect_right(old_starts, old_offset) - 1
+        for tag, i1, i2, j1, j2 in opcodes:
+            if i1 <= word < i2:
+                if tag == "equal":
+                    return new_starts[j1 + word - i1] + old_offset - old_starts[word]
+                # A change starting right at this offset belongs after it, one running through it before it
+                return new_starts[j1] if old_offset == old_starts[i1] else new_starts[j2]
+        return len(new_text)
+
+    pieces = []
+    start = 0
+    offset = 0
+    for index, old in enumerate(old_texts):
+        offset += len(old)
+        end = new_offset(offset) if index < len(old_texts) - 1 else len(new_text)
+        piece = new_text[start:end]
+        pieces.append(piece if piece == old else piece.strip())
+        offset += len(separator)
+        start = max(end, new_offset(offset))
+    return pieces
+
+
+def segment_dict(segment: TranscriptSegment) -> dict:
+    return {"start_ms": segment.start_ms, "end_ms": segment.end_ms, "text": segment.text}
+
+
+class TranscriptSegments:
+    """Indexed per-segment copy of a transcript behind GET /jobs/{id}/segments."""
+
+    def replace(self, db: Session, job_id: str, text: str, metadata: Optional[dict]):
+        db.query(TranscriptSegment).filter(TranscriptSegment.job_id == job_id).delete(synchronize_session=False)
+        rows = segment_rows(text, metadata)
+        if rows:
+            db.bulk_insert_mappings(TranscriptSegment, [
+                {"job_id": job_id, "position": position, **row} for position, row in enumerate(rows)
+            ])
+
+    def exist(self, db: Session, job_id: str) -> bool:
+        return db.query(TranscriptSegment.id).filter(TranscriptSegment.job_id == job_id).first() is not None
+
+    def ordered(self, db: Session, job_id: str) -> List[TranscriptSegment]:
+        return db.query(TranscriptSegment).filter(
+            TranscriptSegment.job_id == job_id
+        ).order_by(TranscriptSegment.position).all()
+
+    def remove_jobs(self, db: Session, job_ids: List[str]):
+        if job_ids:
+            db.query(TranscriptSegment).filter(TranscriptSegment.job_id.in_(job_ids)).delete(synchronize_session=False)
+            db.query(TranscriptVersion).filter(TranscriptVersion.job_id.in_(job_ids)).delete(synchronize_session=False)
+
+    def apply_edits(self, db: Session, job_id: str, version: int, user_id: Optional[str], edits: List[dict]) -> List[TranscriptSegment]:
+        """
+        Apply per-segment edits as `version`, touching only the edited rows, and
+        record their reverse ops. Returns the changed segments. Raises ValueError.
+        """
+        indexes = [edit["index"] for edit in edits]
+        if len(set(indexes)) != len(indexes):
+            raise ValueError("Each segment may be edited once per request")
+        rows = {
+            segment.position: segment
+            for segment in db.query(TranscriptSegment).filter(
+                TranscriptSegment.job_id == job_id,
+                TranscriptSegment.position.in_(indexes)
+            )
+        }
+
+        changed = []
+        delta = []
+        for edit in edits:
+            segment = rows.get(edit["index"])
+            if segment is None:
+                raise ValueError(f"Segment {edit['index']} does not exist")
+            if edit.get("text") is not None:
+                new_text = edit["text"]
+            elif edit.get("ops") is not None:
+                new_text = apply_ops(segment.text, edit["ops"])
+            else:
+                raise ValueError(f"Edit for segment {edit['index']} needs text or ops")
+            if new_text == segment.text:
+                continue
+            delta.append({"index": segment.position, **reverse_op(segment.text, new_text)})
+            segment.text = new_text
+            changed.append(segment)
+
+        db.add(TranscriptVersion(job_id=job_id, version=version, user_id=user_id, delta={"ops": delta}))
+        return changed
+
+    def record_replacement(self, db: Session, job_id: str, version: int, user_id: Optional[str]):
+        """Snapshot the segments a full-text save is about to replace, as `version`'s reverse delta."""
+        previous = [segment_dict(segment) for segment in self.ordered(db, job_id)]
+        db.add(TranscriptVersion(job_id=job_id, version=version, user_id=user_id, delta={"segments": previous}))
+
+    def history(self, db: Session, job_id: str) -> List[TranscriptVersion]:
+        return db.query(TranscriptVersion).filter(
+            TranscriptVersion.job_id == job_id
+        ).order_by(TranscriptVersion.version.desc()).all()
+
+    def reconstruct(self, db: Session, job_id: str, version: int) -> List[Dict[str, Any]]:
+        """Segments as they were at `version`, walking reverse deltas back from the current rows."""
+        segments = [segment_dict(segment) for segment in self.ordered(db, job_id)]
+        deltas = db.query(TranscriptVersion).filter(
+            TranscriptVersion.job_id == job_id,
+            TranscriptVersion.version > version
+        ).order_by(TranscriptVersion.version.desc()).all()
+        for entry in deltas:
+            if "segments" in entry.delta:
+                segments = [dict(segment) for segment in entry.delta["segments"]]
+                continue
+            for op in entry.delta["ops"]:
+                segment = segments[op["index"]]
+                segment["text"] = apply_ops(segment["text"], [op])
+        return segments
+
+    def window(self, db: Session, job_id: str, offset: int, limit: int, at_ms: Optional[int] = None) -> Tuple[int, int, List[TranscriptSegment]]:
+        """
+        (total, offset, segments) for up to `limit` segments from `offset`, or
+        from the segment playing at `at_ms` when seeking by time.
+        """
+        total = db.query(func.count(TranscriptSegment.id)).filter(TranscriptSegment.job_id == job_id).scalar() or 0
+        if at_ms is not None:
+            position = db.query(func.max(TranscriptSegment.position)).filter(
+                TranscriptSegment.job_id == job_id,
+                TranscriptSegment.start_ms <= at_ms
+            ).scalar()
+            offset = position or 0
+        segments = db.query(TranscriptSegment).filter(
+            TranscriptSegment.job_id == job_id,
+            TranscriptSegment.position >= offset
+        ).order_by(TranscriptSegment.position).limit(limit).all()
+        return total, offset, segments
+
+transcript_segments = TranscriptSegments()
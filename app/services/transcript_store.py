@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, object_session, undefer
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.db.models import Transcript
+from app.services.storage import storage_service
+from app.services.transcript_segments import transcript_segments
+
+_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+def _compress(payload: bytes) -> Tuple[str, bytes]:
+    if settings.TRANSCRIPT_CODEC == "zstd":
+        try:
+            import zstandard
+            return "zstd", zstandard.ZstdCompressor(level=10).compress(payload)
+        except ImportError:
+            print("TRANSCRIPT_CODEC=zstd but zstandard is not installed; using gzip")
+    return "gzip", gzip.compress(payload, compresslevel=6)
+
+
+def _decompress(encoding: str, blob: bytes) -> bytes:
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if encoding == "gzip":
+        return gzip.decompress(blob)
+    raise ValueError(f"Unknown transcript encoding: {encoding}")
+
+
+def preview(text: str) -> str:
+    limit = settings.TRANSCRIPT_PREVIEW_CHARS
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit] + "…"
+
+
+class TranscriptStore:
+    """
+    Where a transcript's full text and metadata (segments) live.
+
+    Short bodies stay inline in text_content/json_metadata as before. Larger
+    ones are compressed into body_blob, and very large compressed bodies go
+    to object storage under transcripts/<job_id>/; in both cases text_content
+    keeps a short preview and json_metadata the metadata minus segments.
+    Callers that need the full body go through load()/load_text().
+
+    Segment PATCHes only update transcript_segments; until the body is
+    re-saved (body_version catches up with version) load() assembles the
+    text from the segment rows instead.
+    """
+
+    def save(self, db: Session, transcript: Transcript, text: str, metadata: Optional[dict], rebuild_segments: bool = True) -> List[str]:
+        """
+        Store a body on the (possibly new) row and, unless it was assembled
+        from them, rebuild its segment rows. Returns object keys the previous
+        version used; delete them with discard() after commit.
+        """
+        if rebuild_segments:
+            transcript_segments.replace(db, transcript.job_id, text, metadata)
+        transcript.version = transcript.version or 0
+        transcript.body_version = transcript.version
+        payload = json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False).encode("utf-8")
+        stale = [transcript.body_path] if transcript.body_path else []
+        transcript.body_size = len(payload)
+
+        if len(payload) <= settings.TRANSCRIPT_INLINE_MAX_BYTES:
+            transcript.text_content = text
+            transcript.json_metadata = metadata
+            transcript.body_encoding = None
+            transcript.body_blob = None
+            transcript.body_path = None
+            return stale
+
+        encoding, blob = _compress(payload)
+        transcript.text_content = preview(text)
+        transcript.json_metadata = {k: v for k, v in (metadata or {}).items() if k != "segments"}
+        transcript.body_encoding = encoding
+
+        if len(blob) >= settings.TRANSCRIPT_OBJECT_MIN_BYTES:
+            digest = hashlib.sha256(blob).hexdigest()[:16]
+            key = f"transcripts/{transcript.job_id}/{digest}.json.{_EXTENSIONS[encoding]}"
+            if key != transcript.body_path:
+                storage_service.upload_bytes(key, blob, "application/octet-stream")
+            transcript.body_path = key
+            transcript.body_blob = None
+            return [path for path in stale if path != key]
+
+        transcript.body_blob = blob
+        transcript.body_path = None
+        return stale
+
+    def load(self, transcript: Transcript) -> Tuple[str, Optional[Any]]:
+        """Full (text, metadata), fetching and decompressing the body when it is offloaded."""
+        if self.is_stale(transcript):
+            return self._assemble(transcript)
+        if not transcript.body_encoding:
+            return transcript.text_content or "", transcript.json_metadata
+        payload = json.loads(_decompress(transcript.body_encoding, self._blob(transcript)))
+        return payload.get("text") or "", payload.get("metadata")
+
+    def body_options(self):
+        """Loader options that fetch the deferred body columns with the row (required by load_async)."""
+        return [undefer(Transcript.text_content), undefer(Transcript.json_metadata), undefer(Transcript.body_blob)]
+
+    async def load_async(self, db, transcript: Transcript) -> Tuple[str, Optional[Any]]:
+        """load() for async routes (db is an AsyncSession): no lazy loads on the event loop."""
+        if self.is_stale(transcript):
+            return await db.run_sync(lambda session: self._assemble(transcript))
+        if transcript.body_path:
+            # Offloaded body: the storage SDKs block, so fetch it on the threadpool.
+            # Imported here: workers use this module too and never need FastAPI.
+            from fastapi.concurrency import run_in_threadpool
+            return await run_in_threadpool(self.load, transcript)
+        return self.load(transcript)
+
+    def load_text(self, transcript: Transcript) -> str:
+        if not transcript.body_encoding and not self.is_stale(transcript):
+            return transcript.text_content or ""
+        return self.load(transcript)[0]
+
+    def is_stale(self, transcript: Transcript) -> bool:
+        return (transcript.body_version or 0) != (transcript.version or 0)
+
+    def bump_version(self, db: Session, transcript: Transcript, base_version: Optional[int] = None) -> Optional[int]:
+        """
+        Claim the next version number; with base_version, only if it is still
+        current (optimistic lock for concurrent editors). Returns the new
+        version, or None on conflict.
+        """
+        query = db.query(Transcript).filter(Transcript.id == transcript.id)
+        if base_version is not None:
+            query = query.filter(Transcript.version == base_version)
+        if not query.update({Transcript.version: Transcript.version + 1}, synchronize_session=False):
+            return None
+        if base_version is not None:
+            new_version = base_version + 1
+        else:
+            new_version = db.query(Transcript.version).filter(Transcript.id == transcript.id).scalar()
+        set_committed_value(transcript, "version", new_version)
+        return new_version
+
+    def ensure_segments(self, db: Session, transcript: Transcript) -> bool:
+        """Build segment rows for transcripts stored before they existed. Returns True if it wrote any."""
+        if transcript_segments.exist(db, transcript.job_id):
+            return False
+        text, metadata = self.load(transcript)
+        transcript_segments.replace(db, transcript.job_id, text, metadata)
+        return True
+
+    def discard(self, paths: List[str]):
+        for path in paths:
+            storage_service.delete_file(path)
+
+    def _assemble(self, transcript: Transcript) -> Tuple[str, Optional[Any]]:
+        segments = transcript_segments.ordered(object_session(transcript), transcript.job_id)
+        metadata = {k: v for k, v in (transcript.json_metadata or {}).items() if k != "segments"}
+        if any(segment.start_ms is not None for segment in segments):
+            metadata["segments"] = [
+                {
+                    "text": segment.text,
+                    "start": segment.start_ms / 1000 if segment.start_ms is not None else None,
+                    "end": segment.end_ms / 1000 if segment.end_ms is not None else None
+                }
+                for segment in segments
+            ]
+            # A full-text save can leave a timed segment empty (its words were deleted)
+            return " ".join(segment.text for segment in segments if segment.text), metadata
+        metadata["segments"] = []
+        return "\n".join(segment.text for segment in segments), metadata
+
+    def _blob(self, transcript: Transcript) -> bytes:
+        if transcript.body_path:
+            return storage_service.read_bytes(transcript.body_path)
+        return transcript.body_blob
+
+transcript_store = TranscriptStore()
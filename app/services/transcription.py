@@ -1,4 +1,3 @@
-import requests
 import base64
 import os
 import json
@@ -98,6 +97,7 @@ class TranscriptionService:
                     ]
                 }
 
+            import requests
             response = requests.post(
                 endpoint,
                 headers={
@@ -12,7 +12,8 @@ const App = {
         lifetimeStats: null,
         dailyStats: null,
         popupQueue: [],
-        sharedQueueItems: []
+        sharedQueueItems: [],
+        searchQuery: ''
     },
 
     // Audio player state (not persisted)
@@ -35,12 +36,9 @@ const App = {
         if (App.state.token) {
             await App.loadJobs();
             await App.loadSharedQueue();
-            setInterval(() => {
-                App.loadJobs();
-                if(App.state.view === 'shared-queue') {
-                    App.loadSharedQueue();
-                }
-            }, 5000);
+            // Live updates over SSE; polling only while the stream is unavailable
+            App.setPolling(true);
+            App.connectEvents();
         }
 
         document.addEventListener('click', (e) => {
@@ -51,6 +49,98 @@ const App = {
         });
     },
 
+    pollLists: () => {
+        App.loadJobs();
+        if (App.state.view === 'shared-queue') {
+            App.loadSharedQueue();
+        }
+    },
+
+    setPolling: (enabled) => {
+        if (enabled && !App._pollTimer) {
+            App._pollTimer = setInterval(App.pollLists, 5000);
+        } else if (!enabled && App._pollTimer) {
+            clearInterval(App._pollTimer);
+            App._pollTimer = null;
+        }
+    },
+
+    // Server-Sent Events read through fetch (EventSource cannot send the Authorization header).
+    // Reconnects with Last-Event-ID so missed events are replayed.
+    connectEvents: async () => {
+        if (!App.state.token) return;
+        const headers = { 'Accept': 'text/event-stream' };
+        if (App._lastEventId) headers['Last-Event-ID'] = App._lastEventId;
+        try {
+            const res = await App.authFetch(`${App.API_URL}/events/stream`, { headers });
+            if (res.status === 401) { App.logout(); return; }
+            if (res.status === 503) return; // Not configured on this server: keep polling
+            if (!res.ok || !res.body) throw new Error(`Event stream failed (${res.status})`);
+
+            App.setPolling(false);
+            const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value.replace(/\r\n/g, '\n');
+                let end;
+                while ((end = buffer.indexOf('\n\n')) >= 0) {
+                    App.handleServerEvent(buffer.slice(0, end));
+                    buffer = buffer.slice(end + 2);
+                }
+            }
+        } catch (e) {
+            console.warn('Live updates interrupted', e);
+        }
+        App.setPolling(true);
+        setTimeout(App.connectEvents, App._eventRetryMs || 3000);
+    },
+
+    handleServerEvent: (block) => {
+        let type = 'message';
+        let data = '';
+        for (const line of block.split('\n')) {
+            if (!line || line.startsWith(':')) continue;
+            const colon = line.indexOf(':');
+            const field = colon < 0 ? line : line.slice(0, colon);
+            const value = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '');
+            if (field === 'event') type = value;
+            else if (field === 'data') data += (data ? '\n' : '') + value;
+            else if (field === 'id') App._lastEventId = value;
+            else if (field === 'retry') App._eventRetryMs = parseInt(value, 10) || App._eventRetryMs;
+        }
+        if (!data) return;
+
+        const payload = JSON.parse(data);
+        if (type.startsWith('queue.')) {
+            if (App.state.view === 'shared-queue') App.scheduleRefresh('queue');
+        } else if (type === 'job.status') {
+            const job = (App.state.jobs || []).find(j => j.id === payload.job_id);
+            if (job && payload.status !== 'COMPLETED') {
+                // Simple transitions update in place; completion reloads (new ledger fields, popup)
+                job.status = payload.status;
+                App.renderJobsList();
+            } else {
+                App.scheduleRefresh('jobs');
+            }
+        } else if (type === 'job.removed' || type === 'resync') {
+            App.scheduleRefresh('jobs');
+            if (type === 'resync' && App.state.view === 'shared-queue') App.scheduleRefresh('queue');
+        }
+    },
+
+    // Coalesce bursts of events into one reload per list
+    scheduleRefresh: (list) => {
+        App._refreshTimers = App._refreshTimers || {};
+        if (App._refreshTimers[list]) return;
+        App._refreshTimers[list] = setTimeout(() => {
+            App._refreshTimers[list] = null;
+            if (list === 'queue') App.loadSharedQueue();
+            else App.loadJobs();
+        }, 300);
+    },
+
     render: () => {
         const root = document.getElementById('app');
 
@@ -284,6 +374,37 @@ const App = {
         ).join('');
     },
 
+    searchTranscripts: async (query, offset = 0) => {
+        const panel = document.getElementById('searchResults');
+        if (!panel) return;
+        query = (query || '').trim();
+        App.state.searchQuery = query;
+        if (!query) {
+            panel.classList.add('hidden');
+            panel.innerHTML = '';
+            return;
+        }
+        try {
+            const params = new URLSearchParams({ q: query, offset: offset, limit: 20 });
+            const res = await App.authFetch(`${App.API_URL}/jobs/search?${params}`);
+            if (!res.ok) return;
+            const results = await res.json();
+            // Ignore responses for a query the user has since replaced
+            if (App.state.searchQuery !== query) return;
+            const html = Components.SearchResults(results, offset);
+            if (offset === 0) {
+                panel.innerHTML = html;
+            } else {
+                // Replace the "More results" button with the next page
+                panel.lastElementChild.remove();
+                panel.insertAdjacentHTML('beforeend', html);
+            }
+            panel.classList.remove('hidden');
+        } catch (e) {
+            console.error('Search failed:', e);
+        }
+    },
+
     loadLifetimeStats: async () => {
         if (!App.state.token) return;
         try {
@@ -358,6 +479,77 @@ const App = {
         container.innerHTML = `<div class="activity-chart-bars">${barsHtml}</div>`;
     },
 
+    // Resumable (chunked) upload for large recordings. Session ids are kept in
+    // localStorage so a dropped connection or page reload only re-sends missing bytes.
+    resumableUpload: async (file, target, onProgress) => {
+        const resumeKey = `upload:${target}:${file.name}:${file.size}:${file.lastModified}`;
+        let session = null;
+
+        const savedId = localStorage.getItem(resumeKey);
+        if (savedId) {
+            const res = await App.authFetch(`${App.API_URL}/uploads/${savedId}`);
+            if (res.ok) session = await res.json();
+            if (session && session.status === 'ABORTED') session = null;
+        }
+
+        if (!session) {
+            const res = await App.authFetch(`${App.API_URL}/uploads/`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ filename: file.name, size: file.size, target, content_type: file.type || null })
+            });
+            if (!res.ok) throw new Error("Failed to start upload");
+            session = await res.json();
+            localStorage.setItem(resumeKey, session.id);
+        }
+
+        let offset = session.offset;
+        let failures = 0;
+        while (session.status === 'ACTIVE' && offset < file.size) {
+            const chunk = file.slice(offset, offset + session.chunk_size);
+            try {
+                const res = await App.authFetch(`${App.API_URL}/uploads/${session.id}`, {
+                    method: 'PATCH',
+                    headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream' },
+                    body: chunk
+                });
+                if (res.status === 409) {
+                    // Server is ahead/behind us — ask where to resume
+                    const statusRes = await App.authFetch(`${App.API_URL}/uploads/${session.id}`);
+                    session = await statusRes.json();
+                    offset = session.offset;
+                    continue;
+                }
+                if (!res.ok) throw new Error(`Chunk upload failed (${res.status})`);
+                session = await res.json();
+                offset = session.offset;
+                failures = 0;
+                if (onProgress) onProgress(offset / file.size);
+            } catch (err) {
+                failures += 1;
+                if (failures > 5) throw err;
+                await new Promise(r => setTimeout(r, 1000 * 2 ** failures));
+            }
+        }
+
+        const finalizeRes = await App.authFetch(`${App.API_URL}/uploads/${session.id}/finalize`, { method: 'POST' });
+        if (!finalizeRes.ok) throw new Error("Failed to finalize upload");
+        session = await finalizeRes.json();
+
+        // 202 PROCESSING: the server is hashing the file; the job/queue item appears when it is done
+        while (session.status === 'PROCESSING') {
+            await new Promise(r => setTimeout(r, 1000));
+            const statusRes = await App.authFetch(`${App.API_URL}/uploads/${session.id}`);
+            if (!statusRes.ok) throw new Error("Failed to finalize upload");
+            session = await statusRes.json();
+        }
+        if (session.status !== 'COMPLETED') throw new Error("Failed to finalize upload");
+        localStorage.removeItem(resumeKey);
+        return session;
+    },
+
+    RESUMABLE_THRESHOLD: 8 * 1024 * 1024,
+
     handleUpload: async (input) => {
         const file = input.files[0];
         if (!file) return;
@@ -370,16 +562,23 @@ const App = {
         }
 
         try {
-            const formData = new FormData();
-            formData.append('file', file);
+            let uploadData;
+            if (file.size > App.RESUMABLE_THRESHOLD) {
+                uploadData = await App.resumableUpload(file, 'job', (pct) => {
+                    if (uploadText) uploadText.textContent = `Uploading ${file.name}... ${Math.round(pct * 100)}%`;
+                });
+            } else {
+                const formData = new FormData();
+                formData.append('file', file);
 
-            const uploadRes = await App.authFetch(`${App.API_URL}/jobs/upload`, {
-                method: 'POST',
-                body: formData
-            });
+                const uploadRes = await App.authFetch(`${App.API_URL}/jobs/upload`, {
+                    method: 'POST',
+                    body: formData
+                });
 
-            if (!uploadRes.ok) throw new Error("Upload failed");
-            const uploadData = await uploadRes.json();
+                if (!uploadRes.ok) throw new Error("Upload failed");
+                uploadData = await uploadRes.json();
+            }
 
             if (uploadText) uploadText.textContent = "Queuing transcription job...";
 
@@ -412,15 +611,21 @@ const App = {
         }
 
         try {
-            const formData = new FormData();
-            formData.append('file', file);
+            if (file.size > App.RESUMABLE_THRESHOLD) {
+                await App.resumableUpload(file, 'queue', (pct) => {
+                    if (uploadText) uploadText.textContent = `Uploading ${file.name} to shared queue... ${Math.round(pct * 100)}%`;
+                });
+            } else {
+                const formData = new FormData();
+                formData.append('file', file);
 
-            const uploadRes = await App.authFetch(`${App.API_URL}/queue/upload`, {
-                method: 'POST',
-                body: formData
-            });
+                const uploadRes = await App.authFetch(`${App.API_URL}/queue/upload`, {
+                    method: 'POST',
+                    body: formData
+                });
 
-            if (!uploadRes.ok) throw new Error("Upload failed");
+                if (!uploadRes.ok) throw new Error("Upload failed");
+            }
             
             await App.loadSharedQueue();
 
@@ -455,6 +660,26 @@ const App = {
         }
     },
 
+    claimNextSharedQueueItem: async () => {
+        try {
+            const res = await App.authFetch(`${App.API_URL}/queue/claim-next`, {
+                method: 'POST'
+            });
+
+            if (!res.ok) {
+                const err = await res.json();
+                throw new Error(err.detail || "Claim failed");
+            }
+
+            alert("Successfully claimed! It is now processing in your dashboard.");
+            App.navigateTo('dashboard');
+        } catch (err) {
+            console.error(err);
+            alert("Failed to claim: " + err.message);
+            App.loadSharedQueue();
+        }
+    },
+
     toggleActions: (e, jobId) => {
         e.stopPropagation();
         if (App.state.activeActionMenu === jobId) {
@@ -575,22 +800,106 @@ const App = {
     openTranscript: async (jobId) => {
         const job = App.state.jobs.find(j => j.id === jobId);
         if (job) App.state.currentJob = job;
+        App.state.transcriptWindow = null;
         App.navigateTo('transcript');
         try {
-            const res = await App.authFetch(`${App.API_URL}/jobs/${jobId}/transcript`);
-            if (res.ok) {
-                const data = await res.json();
-                if (App.state.currentJob) {
-                    App.state.currentJob.text_content = data.text_content;
-                    App.state.currentJob.json_metadata = data.json_metadata;
-                    App.renderTranscript();
-                }
-            }
+            await App.loadSegmentWindow({ offset: 0 });
         } catch (e) {
             console.error("Failed to load transcript text", e);
         }
     },
 
+    // Transcripts are fetched a window of segments at a time (GET /jobs/{id}/segments),
+    // so a long hearing never arrives in one response or one DOM insert.
+    SEGMENT_WINDOW: 200,
+    _segmentsLoading: false,
+
+    fetchSegments: async (params) => {
+        const jobId = App.state.currentJob.id;
+        const query = new URLSearchParams({ limit: App.SEGMENT_WINDOW, ...params });
+        const res = await App.authFetch(`${App.API_URL}/jobs/${jobId}/segments?${query}`);
+        if (!res.ok) throw new Error(`Segments request failed (${res.status})`);
+        return res.json();
+    },
+
+    loadSegmentWindow: async (params) => {
+        if (!App.state.currentJob) return;
+        const data = await App.fetchSegments(params);
+        App.state.transcriptWindow = {
+            version: data.version,
+            items: data.items,
+            start: data.offset,
+            nextOffset: data.next_offset,
+            total: data.total
+        };
+        App.renderTranscript();
+    },
+
+    loadMoreSegments: async (earlier = false) => {
+        const win = App.state.transcriptWindow;
+        if (!win || App._segmentsLoading) return;
+        if (earlier ? win.start === 0 : win.nextOffset === null) return;
+
+        App._segmentsLoading = true;
+        try {
+            const offset = earlier ? Math.max(0, win.start - App.SEGMENT_WINDOW) : win.nextOffset;
+            const data = await App.fetchSegments({ offset, limit: earlier ? win.start - offset : App.SEGMENT_WINDOW });
+            if (App.state.transcriptWindow !== win) return;
+            if (earlier) {
+                win.items = data.items.concat(win.items);
+                win.start = data.offset;
+            } else {
+                win.items = win.items.concat(data.items);
+                win.nextOffset = data.next_offset;
+            }
+            App.renderTranscript();
+        } catch (e) {
+            console.error("Failed to load more transcript", e);
+        } finally {
+            App._segmentsLoading = false;
+        }
+    },
+
+    // Editing saves the whole text, so the editor needs every segment first
+    loadAllSegments: async () => {
+        let win = App.state.transcriptWindow;
+        while (win && (win.start > 0 || win.nextOffset !== null)) {
+            if (App._segmentsLoading) {
+                // A scroll-triggered fetch is in flight; let it land first
+                await new Promise(resolve => setTimeout(resolve, 50));
+            } else {
+                const loaded = win.items.length;
+                await App.loadMoreSegments(win.start > 0);
+                if (App.state.transcriptWindow === win && win.items.length === loaded) {
+                    throw new Error('Could not load the full transcript');
+                }
+            }
+            win = App.state.transcriptWindow;
+        }
+    },
+
+    // Scroll the transcript to the segment playing at `seconds`, fetching its window if needed
+    seekTranscript: async (seconds) => {
+        const win = App.state.transcriptWindow;
+        if (!win || App.state.isEditing || !win.items.some(seg => seg.start !== null)) return;
+
+        const loaded = win.items.filter(seg => seg.start !== null && seg.start <= seconds).pop();
+        const last = win.items[win.items.length - 1];
+        const inWindow = loaded && (win.start === 0 || win.items[0].start <= seconds)
+            && (win.nextOffset === null || (last.end !== null ? last.end : last.start) >= seconds);
+        if (!inWindow) {
+            try {
+                await App.loadSegmentWindow({ at: seconds });
+            } catch (e) {
+                console.error("Transcript seek failed", e);
+                return;
+            }
+        }
+        const target = App.state.transcriptWindow.items.filter(seg => seg.start !== null && seg.start <= seconds).pop();
+        const el = target && document.querySelector(`#transcriptContent [data-index="${target.index}"]`);
+        if (el) el.scrollIntoView({ block: 'center' });
+    },
+
     renderTranscript: () => {
         const titleEl = document.getElementById('transcriptTitle');
         const contentEl = document.getElementById('transcriptContent');
@@ -598,14 +907,14 @@ const App = {
         if (titleEl) titleEl.textContent = App.state.currentJob.original_filename;
 
         const statusEl = document.getElementById('transcriptMetaStatus');
+        const win = App.state.transcriptWindow;
 
-        if (contentEl) {
-            const job = App.state.currentJob;
-            const hasSegments = job.json_metadata && job.json_metadata.segments && job.json_metadata.segments.length > 0;
+        if (contentEl && win) {
+            const timed = win.items.some(seg => seg.start !== null);
 
             // Update Debug Status Badge
             if (statusEl) {
-                if (hasSegments) {
+                if (timed) {
                     statusEl.textContent = "✓ Metadata";
                     statusEl.className = "text-xs text-green-600 font-medium px-2 border-r border-slate-200";
                 } else {
@@ -616,24 +925,36 @@ const App = {
 
             let htmlContent = '';
 
-            // 1. If we have structured segments, render the appropriate version
-            if (hasSegments) {
-                // VERSION B: Plain Text (Clean)
-                const cleanText = job.json_metadata.segments.map(seg => seg.text).join(' ');
-                htmlContent = `<div class="leading-relaxed text-slate-800">${cleanText}</div>`;
+            // 1. Timed segments read as one flowing text
+            if (timed) {
+                const spans = win.items.map(seg => `<span data-index="${seg.index}">${seg.text}</span>`).join(' ');
+                htmlContent = `<div class="leading-relaxed text-slate-800">${spans}</div>`;
             }
-            // 2. Fallback if no metadata (Old files or Parse Error)
+            // 2. Untimed segments are the transcript's paragraphs
             else {
-                const text = job.text_content || "";
-                const paragraphs = text.split('\n').filter(p => p.trim() !== '');
-
-                htmlContent = paragraphs.map(p => `<p class="mb-4">${p}</p>`).join('');
+                htmlContent = win.items.map(seg => `<p class="mb-4" data-index="${seg.index}">${seg.text}</p>`).join('');
             }
 
+            if (win.start > 0) {
+                htmlContent = `<button contenteditable="false" onclick="App.loadMoreSegments(true)" class="segment-window-more">Show earlier text</button>` + htmlContent;
+            }
             contentEl.innerHTML = htmlContent;
+            App._watchTranscriptScroll();
         }
     },
 
+    _watchTranscriptScroll: () => {
+        const container = document.getElementById('transcriptContainer');
+        if (!container || container.dataset.windowed) return;
+        container.dataset.windowed = 'true';
+        container.addEventListener('scroll', () => {
+            // Fetch the next window before the reader reaches the end of the loaded text
+            if (container.scrollTop + container.clientHeight >= container.scrollHeight - 800) {
+                App.loadMoreSegments();
+            }
+        });
+    },
+
     toggleDownloadModal: (show = true) => {
         const modal = document.getElementById('downloadModal');
         if (modal) {
@@ -672,6 +993,29 @@ const App = {
         }
     },
 
+    exportLedger: async (format = 'csv') => {
+        try {
+            const res = await App.authFetch(`${App.API_URL}/jobs/export?format=${encodeURIComponent(format)}`);
+            if (!res.ok) {
+                const err = await res.json();
+                alert("Export failed: " + (err.detail || "Unknown error"));
+                return;
+            }
+            const blob = await res.blob();
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `ledger.${format}`;
+            document.body.appendChild(a);
+            a.click();
+            a.remove();
+            window.URL.revokeObjectURL(url);
+        } catch (e) {
+            console.error("Export error", e);
+            alert("Export failed");
+        }
+    },
+
     toggleEmailModal: (show = true) => {
         const modal = document.getElementById('emailModal');
         if (modal) {
@@ -942,16 +1286,14 @@ const App = {
 
         // Fetch audio with auth and create blob URL
         const jobId = App.state.currentJob.id;
+        // Waveform + duration come from the small peaks endpoint, not the audio itself
+        App.loadWaveform(`${App.API_URL}/jobs/${jobId}/peaks`, durationEl);
         try {
-            const res = await App.authFetch(`${App.API_URL}/jobs/${jobId}/audio`);
-            if (res.ok) {
-                const blob = await res.blob();
-                const blobUrl = URL.createObjectURL(blob);
-                audio.src = blobUrl;
-                // Store for cleanup
-                App._audioBlobUrl = blobUrl;
+            const src = await App.resolvePlaybackSource(`${App.API_URL}/jobs/${jobId}`);
+            if (src) {
+                audio.src = src;
             } else {
-                console.error('Failed to load audio:', res.status);
+                console.error('Failed to load audio');
             }
         } catch (e) {
             console.error('Failed to fetch audio:', e);
@@ -967,9 +1309,13 @@ const App = {
                 const pct = (audio.currentTime / audio.duration) * 100 || 0;
                 if (seekBar) seekBar.value = pct;
                 if (currentTimeEl) currentTimeEl.textContent = App._formatTime(audio.currentTime);
+                App._drawWaveform(audio.currentTime / audio.duration || 0);
             }
         });
 
+        // Keep the transcript on the part being played after a seek
+        audio.addEventListener('seeked', () => App.seekTranscript(audio.currentTime));
+
         // Metadata loaded
         audio.addEventListener('loadedmetadata', () => {
             if (durationEl) durationEl.textContent = App._formatTime(audio.duration);
@@ -1025,6 +1371,87 @@ const App = {
         App.initDragPlayer();
     },
 
+    // Prefer a signed URL to the low-bitrate rendition: <audio> then streams and
+    // seeks with its own Range requests. Fall back to a blob of the proxied audio.
+    resolvePlaybackSource: async (baseUrl) => {
+        let audioUrl = `${baseUrl}/audio`;
+        try {
+            const res = await App.authFetch(`${baseUrl}/playback`);
+            if (res.ok) {
+                const source = await res.json();
+                if (source.direct) return source.url;
+                audioUrl = `${App.API_URL}${source.url}`;
+            }
+        } catch (e) {
+            console.error('Failed to resolve playback source:', e);
+        }
+        const res = await App.authFetch(audioUrl);
+        if (!res.ok) return null;
+        const blobUrl = URL.createObjectURL(await res.blob());
+        // Store for cleanup
+        App._audioBlobUrl = blobUrl;
+        return blobUrl;
+    },
+
+    loadWaveform: async (url, durationEl) => {
+        const canvas = document.getElementById('audioWaveform');
+        App._waveformPeaks = null;
+        if (!canvas) return;
+        canvas.classList.add('hidden');
+        try {
+            const res = await App.authFetch(url);
+            if (!res.ok) return;  // 404 until the worker has computed peaks
+            const peaksPerSecond = parseInt(res.headers.get('X-Peaks-Per-Second') || '10', 10);
+            App._waveformPeaks = new Uint8Array(await res.arrayBuffer());
+            if (durationEl && App._waveformPeaks.length) {
+                durationEl.textContent = App._formatTime(App._waveformPeaks.length / peaksPerSecond);
+            }
+            canvas.classList.remove('hidden');
+            App._drawWaveform(0);
+        } catch (e) {
+            console.error('Failed to load waveform:', e);
+        }
+    },
+
+    _drawWaveform: (progress) => {
+        const canvas = document.getElementById('audioWaveform');
+        const peaks = App._waveformPeaks;
+        if (!canvas || !peaks || !peaks.length) return;
+
+        const width = canvas.clientWidth;
+        const height = canvas.clientHeight;
+        const ratio = window.devicePixelRatio || 1;
+        if (canvas.width !== width * ratio) {
+            canvas.width = width * ratio;
+            canvas.height = height * ratio;
+        }
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.clearRect(0, 0, width, height);
+
+        // One 2px bar per 3px column, each showing the loudest peak in its slice
+        const columns = Math.max(1, Math.floor(width / 3));
+        const perColumn = peaks.length / columns;
+        const playedColumns = Math.floor(progress * columns);
+        for (let c = 0; c < columns; c++) {
+            let peak = 0;
+            const end = Math.min(peaks.length, Math.ceil((c + 1) * perColumn));
+            for (let i = Math.floor(c * perColumn); i < end; i++) {
+                if (peaks[i] > peak) peak = peaks[i];
+            }
+            const barHeight = Math.max(1, (peak / 255) * height);
+            ctx.fillStyle = c < playedColumns ? '#0066FF' : '#BCCCDC';
+            ctx.fillRect(c * 3, (height - barHeight) / 2, 2, barHeight);
+        }
+    },
+
+    seekFromWaveform: (event) => {
+        const canvas = event.currentTarget;
+        const rect = canvas.getBoundingClientRect();
+        const pct = ((event.clientX - rect.left) / rect.width) * 100;
+        App.seekTo(Math.min(100, Math.max(0, pct)));
+    },
+
     initDragPlayer: () => {
         const slab = document.getElementById('audioPlayerSlab');
         const handle = document.getElementById('audioDragHandle');
@@ -1198,7 +1625,7 @@ const App = {
     // Text Editing
     // =====================================================
 
-    toggleEditMode: () => {
+    toggleEditMode: async () => {
         const contentEl = document.getElementById('transcriptContent');
         const btnText = document.getElementById('editBtnText');
         const btnEl = document.getElementById('editToggleBtn');
@@ -1219,7 +1646,16 @@ const App = {
             if (btnIcon) btnIcon.innerHTML = '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"></path>';
             App.state.isEditing = false;
         } else {
-            // Enter edit mode
+            // Enter edit mode (with the whole transcript loaded, since saving sends all of it)
+            App.state.isEditing = true;
+            try {
+                await App.loadAllSegments();
+            } catch (e) {
+                App.state.isEditing = false;
+                alert(e.message);
+                return;
+            }
+            contentEl.querySelectorAll('.segment-window-more').forEach(el => el.remove());
             contentEl.setAttribute('contenteditable', 'true');
             contentEl.classList.add('editing-active');
             contentEl.focus();
@@ -1229,30 +1665,76 @@ const App = {
                 btnEl.classList.add('bg-green-50', 'text-green-700', 'border-green-300');
             }
             if (btnIcon) btnIcon.innerHTML = '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path>';
-            App.state.isEditing = true;
         }
     },
 
+    // One {index, ops} edit per changed segment, or null when the edited DOM no longer
+    // maps onto the loaded segments (e.g. paragraphs merged) and the full text must be sent
+    _segmentEdits: (contentEl) => {
+        const win = App.state.transcriptWindow;
+        if (!win) return null;
+        const nodes = Array.from(contentEl.querySelectorAll('[data-index]'));
+        if (nodes.length !== win.items.length) return null;
+        const squash = (text) => text.replace(/\s+/g, '');
+        if (squash(contentEl.innerText) !== squash(nodes.map(node => node.innerText).join(''))) return null;
+
+        const edits = [];
+        for (let i = 0; i < nodes.length; i++) {
+            const segment = win.items[i];
+            if (Number(nodes[i].dataset.index) !== segment.index) return null;
+            const before = segment.text;
+            const after = nodes[i].innerText.replace(/\n+$/, '');
+            // Rendering collapses whitespace, so only count changes to the visible text
+            if (after.replace(/\s+/g, ' ').trim() === before.replace(/\s+/g, ' ').trim()) continue;
+            // Send only the changed span: trim the common prefix and suffix
+            let prefix = 0;
+            while (prefix < before.length && prefix < after.length && before[prefix] === after[prefix]) prefix++;
+            let suffix = 0;
+            while (suffix < before.length - prefix && suffix < after.length - prefix
+                && before[before.length - 1 - suffix] === after[after.length - 1 - suffix]) suffix++;
+            edits.push({
+                index: segment.index,
+                ops: [{ start: prefix, end: before.length - suffix, text: after.slice(prefix, after.length - suffix) }]
+            });
+        }
+        return edits;
+    },
+
     saveTranscriptEdit: async () => {
         const contentEl = document.getElementById('transcriptContent');
-        if (!contentEl || !App.state.currentJob) return;
+        const win = App.state.transcriptWindow;
+        if (!contentEl || !App.state.currentJob || !win) return;
 
-        const editedText = contentEl.innerText.trim();
         const jobId = App.state.currentJob.id;
+        const edits = App._segmentEdits(contentEl);
+        if (edits && edits.length === 0) return;
 
         try {
-            const res = await App.authFetch(`${App.API_URL}/jobs/${jobId}/transcript`, {
-                method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text_content: editedText })
-            });
+            const res = edits
+                ? await App.authFetch(`${App.API_URL}/jobs/${jobId}/transcript`, {
+                    method: 'PATCH',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ base_version: win.version, edits })
+                })
+                : await App.authFetch(`${App.API_URL}/jobs/${jobId}/transcript`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ text_content: contentEl.innerText.trim(), base_version: win.version })
+                });
 
-            if (res.ok) {
+            if (res.ok && edits) {
                 const data = await res.json();
-                // Update local state
-                App.state.currentJob.text_content = data.text_content;
-                App.state.currentJob.json_metadata = data.json_metadata;
+                const byIndex = new Map(data.items.map(seg => [seg.index, seg]));
+                win.items = win.items.map(seg => byIndex.get(seg.index) || seg);
+                win.version = data.version;
+                console.log('Transcript saved successfully');
+            } else if (res.ok) {
+                // Segments were updated from the new text; reload the first window
+                await App.loadSegmentWindow({ offset: 0 });
                 console.log('Transcript saved successfully');
+            } else if (res.status === 409) {
+                alert('This transcript was changed elsewhere. It will be reloaded; please reapply your edit.');
+                await App.loadSegmentWindow({ offset: 0 });
             } else {
                 const err = await res.json();
                 alert('Failed to save: ' + (err.detail || 'Unknown error'));
@@ -1280,11 +1762,9 @@ const App = {
         }
 
         try {
-            const res = await App.authFetch(`${App.API_URL}/queue/${queueItemId}/audio`);
-            if (res.ok) {
-                const blob = await res.blob();
-                const blobUrl = URL.createObjectURL(blob);
-                App._sharedAudio = new Audio(blobUrl);
+            const src = await App.resolvePlaybackSource(`${App.API_URL}/queue/${queueItemId}`);
+            if (src) {
+                App._sharedAudio = new Audio(src);
                 App._currentPlayingSharedId = queueItemId;
                 App._sharedAudio.play();
                 
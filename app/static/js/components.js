@@ -327,10 +327,15 @@ const Components = {
                 <!-- Header -->
                 <div class="flex justify-between items-center mb-8">
                     <h2 class="text-2xl font-semibold text-slate-900">Shared Audio Queue</h2>
-                    <button onclick="document.getElementById('sharedFileInput').click()" class="bg-blue-600 text-white px-4 py-2 rounded-md text-sm font-medium hover:bg-blue-700 transition shadow-sm flex items-center gap-2">
-                        <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-8l-4-4m0 0L8 8m4-4v12"></path></svg>
-                        Upload to Shared Queue
-                    </button>
+                    <div class="flex items-center gap-2">
+                        <button onclick="App.claimNextSharedQueueItem()" class="bg-blue-50 text-blue-600 border border-blue-200 px-4 py-2 rounded-md text-sm font-medium hover:bg-blue-100 transition shadow-sm">
+                            Claim Next
+                        </button>
+                        <button onclick="document.getElementById('sharedFileInput').click()" class="bg-blue-600 text-white px-4 py-2 rounded-md text-sm font-medium hover:bg-blue-700 transition shadow-sm flex items-center gap-2">
+                            <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-8l-4-4m0 0L8 8m4-4v12"></path></svg>
+                            Upload to Shared Queue
+                        </button>
+                    </div>
                     <input type="file" id="sharedFileInput" class="hidden" accept="audio/*,video/*" onchange="App.handleSharedQueueUpload(this)">
                 </div>
 
@@ -444,6 +449,14 @@ const Components = {
 
                 </div>
 
+                ${view === 'trash' ? '' : `
+                <!-- Transcript Search -->
+                <div class="mb-6">
+                    <input type="search" id="searchInput" placeholder="Search transcripts and ledger..." onkeydown="if (event.key === 'Enter') App.searchTranscripts(this.value)" oninput="if (!this.value) App.searchTranscripts('')" class="w-full px-4 py-2 border border-slate-200 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-blue-500 bg-white shadow-sm">
+                    <div id="searchResults" class="hidden mt-3 bg-white rounded-lg shadow-sm border border-slate-200 divide-y divide-slate-100"></div>
+                </div>
+                `}
+
                 <!-- File List -->
                 <div class="bg-white rounded-lg shadow-sm border border-slate-200 overflow-visible min-h-[300px]">
                     <table class="w-full text-left border-collapse">
@@ -473,6 +486,25 @@ const Components = {
         </div>
     `},
 
+    SearchResults: (results, offset) => {
+        if (results.items.length === 0 && offset === 0) {
+            return `<p class="px-4 py-3 text-sm text-slate-500">No matching transcripts.</p>`;
+        }
+        const rows = results.items.map(hit => `
+            <div class="px-4 py-3 hover:bg-slate-50 cursor-pointer" onclick="${hit.status === 'COMPLETED' ? `App.openTranscript('${hit.job_id}')` : ''}">
+                <div class="flex justify-between text-sm">
+                    <span class="font-medium text-slate-900">${hit.original_filename}</span>
+                    <span class="text-xs text-slate-400">${new Date(hit.created_at).toLocaleDateString()}</span>
+                </div>
+                <p class="search-highlight text-sm text-slate-600 mt-1">${hit.highlight || ''}</p>
+            </div>
+        `).join('');
+        const more = results.has_more
+            ? `<button onclick="App.searchTranscripts(App.state.searchQuery, ${results.next_offset})" class="w-full px-4 py-2 text-sm text-blue-600 hover:bg-slate-50">More results</button>`
+            : '';
+        return rows + more;
+    },
+
     TranscriptView: () => `
         <div class="pl-64 h-screen flex flex-col bg-slate-50">
             <!-- Toolbar -->
@@ -527,6 +559,10 @@ const Components = {
                 
                 <audio id="audioElement" preload="auto"></audio>
 
+                <!-- Waveform (precomputed peaks, drawn before the audio arrives) -->
+                <canvas id="audioWaveform" class="audio-waveform hidden" height="36"
+                        onclick="App.seekFromWaveform(event)"></canvas>
+
                 <!-- Top Row: Progress Bar -->
                 <div class="audio-progress-row">
                     <span id="audioCurrentTime" class="audio-time-label">0:00</span>
@@ -735,6 +771,14 @@ const Components = {
             <div class="max-w-[95%] mx-auto p-8">
                 <div class="flex justify-between items-center mb-8">
                     <h2 class="text-2xl font-semibold text-slate-900">Ledger</h2>
+                    <div class="flex items-center gap-2">
+                        <select id="ledgerExportFormat" class="px-3 py-2 border border-slate-200 rounded-md text-sm bg-white shadow-sm">
+                            <option value="csv">CSV</option>
+                            <option value="xlsx">Excel (.xlsx)</option>
+                            <option value="ndjson">NDJSON</option>
+                        </select>
+                        <button onclick="App.exportLedger(document.getElementById('ledgerExportFormat').value)" class="px-4 py-2 bg-blue-600 text-white rounded-md text-sm font-medium hover:bg-blue-700 shadow-sm transition">Export</button>
+                    </div>
                 </div>
                 <div class="bg-white rounded-xl shadow-sm border border-slate-200 overflow-hidden">
                     <div class="overflow-x-auto">
@@ -18,4 +18,9 @@ celery_app.conf.update(
     enable_utc=True,
     broker_connection_retry_on_startup=True,
     worker_concurrency=4,
+    # Run with `worker -B` (or a separate `celery beat`) for these
+    beat_schedule={
+        "purge-export-bundles": {"task": "app.workers.tasks.purge_export_bundles", "schedule": 3600.0},
+        "expire-upload-sessions": {"task": "app.workers.tasks.expire_upload_sessions", "schedule": 3600.0},
+    },
 )
@@ -1,13 +1,27 @@
 import os
 import subprocess
 import json
+from datetime import datetime, timedelta, timezone
 
 from app.workers.celery_app import celery_app
 from app.db.base import SessionLocal
-from app.db.models import Job, JobStatus, Transcript, User
+from app.db.models import (
+    Job, JobStatus, Transcript, AudioQueueItem, AudioQueueStatus,
+    UploadSession, UploadSessionStatus, UploadTarget
+)
 from app.core.config import settings
 from app.services.transcription import transcription_service
 from app.services.storage import storage_service
+from app.services.content_store import content_store
+from app.services.stats import stats_service
+from app.services.search import search_index
+from app.services.transcript_store import transcript_store
+from app.services.exports import export_service
+from app.services.events import event_bus
+from app.services.media import (
+    get_audio_duration_ffprobe, transcode_to_opus, durations_match, compute_peaks,
+    transcode_playback_rendition, segment_hls
+)
 
 import wave
 import contextlib
@@ -36,20 +50,6 @@ def parse_time_value(val):
     return 0.0
 
 
-def get_audio_duration_ffprobe(file_path: str) -> float:
-    """Use ffprobe to get audio duration in seconds. Returns 0 on failure."""
-    try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
-             "-of", "default=noprint_wrappers=1:nokey=1", file_path],
-            capture_output=True, text=True, timeout=30
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return float(result.stdout.strip())
-    except Exception as e:
-        print(f"ffprobe duration failed: {e}")
-    return 0.0
-
 @celery_app.task(name="app.workers.tasks.process_audio", bind=True)
 def process_audio(self, job_id: str):
     process_audio_file(job_id, task_id=self.request.id)
@@ -61,6 +61,8 @@ def process_audio_file(job_id: str, task_id: str = None):
     if not job:
         print(f"Job {job_id} not found.")
         return
+    # Transcripts are only written on completion: one already there means this is a reprocess
+    completed_before = db.query(Transcript.id).filter(Transcript.job_id == job_id).first() is not None
 
     original_input_path = None  # Track the original downloaded file
     normalized_path = None       # Track the normalized mp3 file
@@ -74,6 +76,7 @@ def process_audio_file(job_id: str, task_id: str = None):
         if task_id:
             job.celery_task_id = task_id
         db.commit()
+        event_bus.job_status(job.user_id, job.id, job.status)
 
         # 2. Get Local Path (Download if GCS/S3, Get Path if Local)
         try:
@@ -83,6 +86,17 @@ def process_audio_file(job_id: str, task_id: str = None):
             raise FileNotFoundError(f"Failed to retrieve file: {e}")
 
         print(f"Processing file: {input_path}")
+
+        # Waveform peaks and playback renditions (claimed queue items already carry them)
+        if job.waveform_peaks is None:
+            job.waveform_peaks = compute_waveform_peaks(input_path)
+            db.commit()
+        if settings.PLAYBACK_RENDITION_ENABLED and not job.playback_path:
+            job.playback_path = build_playback_rendition(db, input_path, job.original_filename)
+            db.commit()
+        if settings.PLAYBACK_HLS_ENABLED and not job.playback_hls_path:
+            job.playback_hls_path = build_hls_rendition(input_path, f"hls/{job.id}")
+            db.commit()
         
         # 3. Normalization (Ensure standard MP3 for Gemini)
         print("Normalizing audio with ffmpeg...")
@@ -109,6 +123,7 @@ def process_audio_file(job_id: str, task_id: str = None):
         print("Transcribing...")
         job.status = JobStatus.TRANSCRIBING.value
         db.commit()
+        event_bus.job_status(job.user_id, job.id, job.status)
 
         # Pass input_path directly
         transcription_result = transcription_service.transcribe_audio(input_path)
@@ -122,11 +137,8 @@ def process_audio_file(job_id: str, task_id: str = None):
                 print(f"Duration from ffprobe: {probe_duration}s")
         
         # 6. Save Transcript
-        new_transcript = Transcript(
-            job_id=job_id,
-            text_content=transcription_result["text"],
-            json_metadata=transcription_result["metadata"]
-        )
+        new_transcript = Transcript(job_id=job_id)
+        transcript_store.save(db, new_transcript, transcription_result["text"], transcription_result["metadata"])
         db.add(new_transcript)
         
         # 7. Auto-extract ledger fields from transcript text
@@ -162,16 +174,28 @@ def process_audio_file(job_id: str, task_id: str = None):
         job.status = JobStatus.COMPLETED.value
         job.completed_at = datetime.now(timezone.utc)
         # Use duration from metadata (calculated in service or from segments)
+        previous_duration = job.duration_seconds or 0
         raw_duration = transcription_result["metadata"].get("duration", 0)
         job.duration_seconds = int(parse_time_value(raw_duration)) if raw_duration else 0
         
-        # 9. Increment lifetime completed counter
-        user = db.query(User).filter(User.id == job.user_id).first()
-        if user:
-            user.total_completed = (user.total_completed or 0) + 1
+        # 9. Increment lifetime completed counter and the job's daily rollup row (first completion only)
+        if job.user_id:
+            stats_service.record_completion(
+                db, job.user_id, job.created_at, job.duration_seconds - previous_duration, first=not completed_before
+            )
+
+        # 10. Index transcript and extracted ledger fields for /jobs/search
+        search_index.index_job(db, job, transcription_result["text"])
             
         db.commit()
         print(f"Job {job_id} Completed Successfully.")
+        event_bus.job_status(job.user_id, job.id, job.status)
+
+        # 11. Pre-render the DOCX download, then archive the original as compact Opus
+        # (separate tasks so playback/transcript aren't delayed)
+        render_docx_export.delay(job_id)
+        if settings.ARCHIVE_ENABLED:
+            archive_original.delay(job_id)
 
     except Exception as e:
         print(f"Job {job_id} Failed: {e}")
@@ -180,6 +204,7 @@ def process_audio_file(job_id: str, task_id: str = None):
         job.completed_at = datetime.now(timezone.utc)
         job.error_message = str(e)
         db.commit()
+        event_bus.job_status(job.user_id, job.id, job.status)
         raise  # Re-raise so Celery marks task as failed instead of succeeded
         
     finally:
@@ -198,4 +223,385 @@ def process_audio_file(job_id: str, task_id: str = None):
                 print(f"Cleaned up normalized file: {normalized_path}")
             except Exception as cleanup_err:
                 print(f"Warning: Failed to cleanup normalized file {normalized_path}: {cleanup_err}")
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def compute_waveform_peaks(local_path: str):
+    """Best-effort peaks extraction; a missing waveform never fails the job."""
+    try:
+        peaks = compute_peaks(local_path)
+        print(f"Computed {len(peaks)} waveform peaks")
+        return peaks or None
+    except Exception as e:
+        print(f"Waveform peaks extraction failed: {e}")
+        return None
+
+
+def build_playback_rendition(db, local_path: str, original_filename: str):
+    """
+    Best-effort low-bitrate Opus/WebM copy for browser playback, stored
+    content-addressed (one reference taken for the caller's row).
+    Returns its storage path, or None to keep serving the stored audio.
+    """
+    rendition_path = f"{local_path}.playback.webm"
+    try:
+        transcode_playback_rendition(local_path, rendition_path, settings.PLAYBACK_OPUS_BITRATE)
+        base_name = original_filename.rsplit(".", 1)[0] if "." in original_filename else original_filename
+        with open(rendition_path, "rb") as f:
+            stored = content_store.store_upload(db, f, f"{base_name}.webm", "audio/webm")
+        print(f"Playback rendition: {os.path.getsize(local_path)} B -> {stored.size_bytes} B")
+        return stored.storage_path
+    except Exception as e:
+        print(f"Playback rendition failed: {e}")
+        return None
+    finally:
+        if os.path.exists(rendition_path):
+            os.remove(rendition_path)
+
+
+def build_hls_rendition(local_path: str, prefix: str):
+    """Best-effort VOD HLS segments under <prefix>/. Returns the playlist key or None."""
+    import shutil
+    import tempfile
+    output_dir = tempfile.mkdtemp(prefix="hls-")
+    try:
+        segment_hls(local_path, output_dir, settings.PLAYBACK_HLS_SEGMENT_SECONDS)
+        for name in sorted(os.listdir(output_dir)):
+            content_type = "application/vnd.apple.mpegurl" if name.endswith(".m3u8") else "video/mp2t"
+            storage_service.upload_local_file(os.path.join(output_dir, name), f"{prefix}/{name}", content_type)
+        return f"{prefix}/index.m3u8"
+    except Exception as e:
+        print(f"HLS segmentation failed: {e}")
+        storage_service.delete_prefix(f"{prefix}/")
+        return None
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+@celery_app.task(name="app.workers.tasks.prepare_queue_item_media")
+def prepare_queue_item_media(queue_item_id: str):
+    prepare_queue_item_media_file(queue_item_id)
+
+def prepare_queue_item_media_file(queue_item_id: str):
+    """Compute waveform peaks, the playback rendition and (when ingest could not) duration for a shared queue item."""
+    db = SessionLocal()
+    local_path = None
+    try:
+        item = db.query(AudioQueueItem).filter(AudioQueueItem.id == queue_item_id).first()
+        if not item:
+            print(f"Queue item {queue_item_id} not found.")
+            return
+        needs_rendition = settings.PLAYBACK_RENDITION_ENABLED and not item.playback_path
+        if item.waveform_peaks is not None and item.duration_seconds and not needs_rendition:
+            return
+
+        local_path = storage_service.download_to_temp(item.storage_path)
+        if item.waveform_peaks is None:
+            item.waveform_peaks = compute_waveform_peaks(local_path)
+        if needs_rendition:
+            item.playback_path = build_playback_rendition(db, local_path, item.original_filename)
+        if not item.duration_seconds:
+            duration = get_audio_duration_ffprobe(local_path)
+            if duration > 0:
+                item.duration_seconds = int(duration)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Preparing media for queue item {queue_item_id} failed: {e}")
+    finally:
+        if local_path and os.path.exists(local_path):
+            try:
+                os.remove(local_path)
+            except Exception as cleanup_err:
+                print(f"Warning: Failed to cleanup temp file {local_path}: {cleanup_err}")
+        db.close()
+
+
+def attach_upload_session(db, session: UploadSession):
+    """Create the Job / AudioQueueItem for a fully stored upload session and mark it COMPLETED (caller commits)."""
+    now = datetime.now(timezone.utc)
+    if session.target == UploadTarget.QUEUE.value:
+        item = AudioQueueItem(
+            original_filename=session.original_filename,
+            storage_path=session.storage_path,
+            file_size_bytes=session.total_size,
+            mime_type=session.mime_type,
+            content_sha256=session.content_sha256,
+            duration_seconds=session.duration_seconds,
+            status=AudioQueueStatus.AVAILABLE.value,
+            uploaded_by_id=session.user_id,
+            uploaded_at=now
+        )
+        db.add(item)
+        db.flush()
+        session.queue_item_id = item.id
+    else:
+        job = Job(
+            user_id=session.user_id,
+            original_filename=session.original_filename,
+            storage_path=session.storage_path,
+            file_size_bytes=session.total_size,
+            mime_type=session.mime_type,
+            content_sha256=session.content_sha256,
+            duration_seconds=session.duration_seconds,
+            status=JobStatus.UPLOADED.value,
+            login_date=now
+        )
+        db.add(job)
+        db.flush()
+        session.job_id = job.id
+        stats_service.record_upload(db, session.user_id, now, session.duration_seconds)
+    session.status = UploadSessionStatus.COMPLETED.value
+
+def announce_upload_session(session: UploadSession):
+    """Events and follow-up work for a committed attach_upload_session."""
+    if session.queue_item_id:
+        event_bus.queue_changed("queue.added", session.queue_item_id)
+        prepare_queue_item_media.delay(session.queue_item_id)
+    elif session.job_id:
+        event_bus.job_status(session.user_id, session.job_id, JobStatus.UPLOADED.value)
+
+@celery_app.task(name="app.workers.tasks.adopt_upload")
+def adopt_upload(upload_id: str):
+    adopt_upload_file(upload_id)
+
+def adopt_upload_file(upload_id: str):
+    """
+    Second half of a resumable upload's finalize: hash the assembled object,
+    move it under cas/ and create its Job / AudioQueueItem. Runs here rather
+    than in the request because hashing streams the whole object back from
+    the bucket.
+    """
+    db = SessionLocal()
+    try:
+        session = db.query(UploadSession).filter(
+            UploadSession.id == upload_id,
+            UploadSession.status == UploadSessionStatus.PROCESSING.value
+        ).first()
+        if not session:
+            print(f"Upload session {upload_id} is not awaiting adoption.")
+            return
+
+        sha256 = content_store.hash_object(session.storage_path)
+        session.storage_path = content_store.adopt(
+            db, session.storage_path, sha256, session.original_filename, session.total_size, session.mime_type
+        )
+        session.content_sha256 = sha256
+        attach_upload_session(db, session)
+        db.commit()
+        # The API's cached queue count is per process; it catches up within its TTL
+        announce_upload_session(session)
+    except Exception as e:
+        db.rollback()
+        print(f"Adopting upload {upload_id} failed: {e}")
+        session = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+        if session and session.status == UploadSessionStatus.PROCESSING.value:
+            session.status = UploadSessionStatus.ABORTED.value
+            db.commit()
+            storage_service.delete_file(session.storage_path)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.workers.tasks.expire_upload_sessions")
+def expire_upload_sessions():
+    """Abort resumable uploads that stopped receiving chunks, releasing the backend's multipart/resumable upload."""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        stale = db.query(
+            UploadSession.id, UploadSession.storage_path, UploadSession.backend_upload_id, UploadSession.content_sha256
+        ).filter(
+            UploadSession.status == UploadSessionStatus.ACTIVE.value,
+            UploadSession.expires_at < now
+        ).all()
+        expired = 0
+        for upload_id, storage_path, backend_upload_id, content_sha256 in stale:
+            # Claim it first: a chunk that lands meanwhile pushed expires_at back and keeps the session
+            claimed = db.query(UploadSession).filter(
+                UploadSession.id == upload_id,
+                UploadSession.status == UploadSessionStatus.ACTIVE.value,
+                UploadSession.expires_at < now
+            ).update({UploadSession.status: UploadSessionStatus.ABORTED.value}, synchronize_session=False)
+            db.commit()
+            expired += claimed
+            # Dedup-hit sessions never opened a backend upload
+            if claimed and not content_sha256:
+                storage_service.abort_multipart(storage_path, backend_upload_id)
+        if expired:
+            print(f"Expired {expired} stale upload sessions")
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.workers.tasks.refresh_transcript")
+def refresh_transcript(job_id: str, version: int):
+    refresh_transcript_file(job_id, version)
+
+def refresh_transcript_file(job_id: str, version: int):
+    """
+    Fold segment PATCHes into the stored body and the search index. Scheduled
+    after each edit; only the run for the latest version does the rewrite.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job or not job.transcript:
+            return
+        transcript = job.transcript
+        if transcript.version != version or not transcript_store.is_stale(transcript):
+            return
+        text, metadata = transcript_store.load(transcript)
+        stale = transcript_store.save(db, transcript, text, metadata, rebuild_segments=False)
+        search_index.index_job(db, job, text)
+        stale += export_service.refresh_docx(db, job)
+        db.commit()
+        transcript_store.discard(stale)
+        print(f"Transcript {job_id} body refreshed at version {version}")
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.render_docx_export")
+def render_docx_export(job_id: str):
+    render_docx_export_file(job_id)
+
+def render_docx_export_file(job_id: str):
+    """Render the job's DOCX into object storage unless the cached one already matches the transcript."""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job or not job.transcript:
+            return
+        stale = export_service.refresh_docx(db, job)
+        db.commit()
+        transcript_store.discard(stale)
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.build_export_bundle")
+def build_export_bundle(user_id: str, bundle_id: str, job_ids: list, include_originals: bool = False):
+    build_export_bundle_file(user_id, bundle_id, job_ids, include_originals)
+
+def build_export_bundle_file(user_id: str, bundle_id: str, job_ids: list, include_originals: bool = False):
+    """
+    Stream a large ZIP bundle straight into the bucket; the object appears once
+    the upload completes and the status marker then flips to ready (or failed).
+    """
+    db = SessionLocal()
+    try:
+        storage_service.upload_stream(
+            export_service.bundle_key(user_id, bundle_id),
+            export_service.bundle(db, job_ids, include_originals),
+            "application/zip"
+        )
+        export_service.set_bundle_status(user_id, bundle_id, "ready")
+        print(f"Export bundle {bundle_id} ready ({len(job_ids)} jobs)")
+    except Exception as e:
+        print(f"Export bundle {bundle_id} failed: {e}")
+        export_service.set_bundle_status(user_id, bundle_id, "failed", "The export could not be built")
+    finally:
+        db.close()
+
+@celery_app.task(name="app.workers.tasks.purge_export_bundles")
+def purge_export_bundles():
+    removed = export_service.purge_bundles(timedelta(hours=settings.EXPORT_BUNDLE_RETENTION_HOURS))
+    if removed:
+        print(f"Purged {removed} expired export bundle objects")
+
+@celery_app.task(name="app.workers.tasks.archive_original")
+def archive_original(job_id: str):
+    archive_original_file(job_id)
+
+def archive_original_file(job_id: str):
+    """
+    Post-completion archival: swap the original for compact speech Opus,
+    verify it, repoint storage_path and apply ARCHIVE_ORIGINAL_POLICY
+    (keep / tier / delete) to the original object.
+
+    The playback rendition is already that Opus copy (WebM rather than Ogg),
+    so when the job has one it is archived as is and only jobs without a
+    rendition pay for a second transcode.
+    """
+    db = SessionLocal()
+    original_path = None
+    opus_path = None
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job or job.status != JobStatus.COMPLETED.value or job.archived_at:
+            return
+        if job.storage_path.lower().endswith((".opus", ".ogg")) or job.mime_type == "audio/ogg" \
+                or job.storage_path == job.playback_path:
+            print(f"Archive {job_id}: original is already Opus, skipping.")
+            return
+
+        original_path = storage_service.download_to_temp(job.storage_path)
+        original_size = job.file_size_bytes or os.path.getsize(original_path)
+
+        if job.playback_path:
+            opus_path = storage_service.download_to_temp(job.playback_path)
+            archived_mime = "audio/webm"
+        else:
+            opus_path = f"{original_path}.opus"
+            transcode_to_opus(original_path, opus_path, settings.ARCHIVE_OPUS_BITRATE)
+            archived_mime = "audio/ogg"
+
+        # Verify: same playable length and actually smaller
+        original_duration = get_audio_duration_ffprobe(original_path)
+        opus_duration = get_audio_duration_ffprobe(opus_path)
+        if not durations_match(original_duration, opus_duration):
+            raise RuntimeError(f"duration mismatch ({original_duration}s original vs {opus_duration}s opus)")
+        archived_size = os.path.getsize(opus_path)
+        if archived_size >= original_size:
+            print(f"Archive {job_id}: Opus ({archived_size} B) is not smaller than original ({original_size} B), keeping original.")
+            return
+
+        if job.playback_path:
+            content_store.acquire(db, job.playback_path)
+            archived_path = job.playback_path
+        else:
+            base_name = job.original_filename.rsplit(".", 1)[0] if "." in job.original_filename else job.original_filename
+            with open(opus_path, "rb") as f:
+                archived_path = content_store.store_upload(db, f, f"{base_name}.opus", archived_mime).storage_path
+
+        old_path = job.storage_path
+        job.storage_path = archived_path
+        job.mime_type = archived_mime
+        job.archived_size_bytes = archived_size
+        job.archived_at = datetime.now(timezone.utc)
+
+        orphaned = []
+        policy = settings.ARCHIVE_ORIGINAL_POLICY
+        if policy == "delete":
+            db.flush()
+            orphaned = content_store.release(db, old_path)
+        else:
+            # The job keeps its reference to the original through original_storage_path
+            job.original_storage_path = old_path
+
+        db.commit()
+        content_store.purge(db, orphaned)
+
+        if policy == "tier":
+            # Content-addressed: other jobs or queue items may still play this object
+            if content_store.reference_count(db, old_path) == 1:
+                storage_service.set_storage_class(old_path, archival=True)
+            else:
+                print(f"Archive {job_id}: original {old_path} is shared, leaving its storage class alone.")
+
+        saved = original_size - archived_size
+        print(
+            f"Archive {job_id}: {original_size} B -> {archived_size} B "
+            f"({saved} B / {round(100 * saved / original_size, 1)}% less egress per playback, original {policy})"
+        )
+    except Exception as e:
+        db.rollback()
+        # Archival is best-effort: the job stays COMPLETED on its original
+        print(f"Archive {job_id} failed: {e}")
+    finally:
+        for path in (original_path, opus_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception as cleanup_err:
+                    print(f"Warning: Failed to cleanup temp file {path}: {cleanup_err}")
+        db.close()
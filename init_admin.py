@@ -7,11 +7,7 @@ from dotenv import load_dotenv
 
 def init_admin():
     load_dotenv()
-    # Create tables if they don't exist (CRITICAL for first run on synchronous scripts)
-    from app.db.base import Base, engine
-    # Import models to ensure they are registered
-    from app.db import models
-    Base.metadata.create_all(bind=engine)
+    # Tables come from `alembic upgrade head`, which the release step runs first
 
     db = SessionLocal()
     
@@ -56,6 +52,13 @@ def init_admin():
             user.is_admin = True
         
     db.commit()
+
+    # Drop cached sessions of updated admins (effective across processes when the cache is Redis-backed)
+    from app.core.cache import user_cache
+    for admin_data in admin_users:
+        user = db.query(User).filter(User.username == admin_data["username"]).first()
+        if user:
+            user_cache.delete(user.id)
     print("Admin initialization complete.")
     db.close()
 
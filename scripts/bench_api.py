@@ -0,0 +1,130 @@
+"""
+Benchmark: requests/second and latency percentiles of the hot read endpoints
+(job list, job detail, transcript, queue list) on one or more running APIs.
+
+To compare the async DB layer with the previous sync stack, serve both
+against the same database with the same uvicorn settings and pass both URLs:
+
+    git worktree add ../TunAI-sync <commit before the async change>
+    (cd ../TunAI-sync && uvicorn app.main:app --port 8001 --workers 1)
+    uvicorn app.main:app --port 8000 --workers 1
+    python scripts/bench_api.py --username admin --password ... \\
+        http://localhost:8001 http://localhost:8000
+
+The user should own at least one job with a transcript. Each target gets a
+warm-up pass, then every endpoint is hit by --concurrency clients for
+--requests requests. Needs httpx (pip install httpx).
+
+Usage:
+    cd TunAI
+    python scripts/bench_api.py [--token T | --username U --password P] URL [URL ...]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def hot_paths(client: httpx.AsyncClient):
+    """The benchmarked endpoints, using the newest job that has a transcript."""
+    paths = ["/jobs/?limit=50", "/queue/?limit=50"]
+    jobs = (await client.get("/jobs/", params={"view": "summary", "limit": 50})).json()
+    for job in jobs:
+        if job.get("status") == "COMPLETED" and (await client.get(f"/jobs/{job['id']}/transcript")).status_code == 200:
+            paths[1:1] = [f"/jobs/{job['id']}", f"/jobs/{job['id']}/transcript"]
+            break
+    else:
+        print("  (no completed job: skipping job detail and transcript)")
+    return paths
+
+
+async def hammer(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def bench(url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        token = args.token or await login(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        results = {}
+        for path in await hot_paths(client):
+            await hammer(client, path, min(args.requests, 50), args.concurrency)  # warm-up
+            latencies, errors, elapsed = await hammer(client, path, args.requests, args.concurrency)
+            results[path.split("?")[0]] = {
+                "rps": len(latencies) / elapsed if elapsed else 0.0,
+                "p50": percentile(latencies, 0.50) * 1000,
+                "p99": percentile(latencies, 0.99) * 1000,
+                "errors": errors,
+            }
+        return results
+
+
+def report(all_results: dict):
+    header = f"{'endpoint':<34}{'target':<28}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    endpoints = []
+    for results in all_results.values():
+        endpoints += [e for e in results if e not in endpoints]
+    for endpoint in endpoints:
+        for url, results in all_results.items():
+            row = results.get(endpoint)
+            if row:
+                print(f"{endpoint:<34}{url:<28}{row['rps']:>9.1f}{row['p50']:>9.1f}{row['p99']:>9.1f}{row['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("urls", nargs="+", help="API base URLs, e.g. the sync baseline then the async build")
+    parser.add_argument("--token", help="Bearer token (otherwise log in with --username/--password)")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("--token or --username/--password is required")
+
+    all_results = {}
+    for url in args.urls:
+        print(f"Benchmarking {url} ({args.concurrency} concurrent clients, {args.requests} requests per endpoint)")
+        all_results[url] = asyncio.run(bench(url, args))
+    print()
+    report(all_results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: how long an API process takes to start, measured from launch to
+  - import: `import app.main` finishes (module-level work in a fresh interpreter)
+  - health: uvicorn answers /health (the process can take traffic)
+  - ready:  /ready returns 200 (database and object storage warmed up)
+
+Run it against one or more checkouts with the same environment (.env /
+DATABASE_URL etc.); a checkout without /ready only reports import and health.
+To compare with the startup that ran create_all and the admin seeding:
+
+    git worktree add ../TunAI-before <commit before the startup change>
+    python scripts/bench_startup.py ../TunAI-before .
+
+Usage:
+    cd TunAI
+    python scripts/bench_startup.py [--runs N] [CHECKOUT ...]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status_of(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def time_import(checkout: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=checkout, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_boot(checkout: str, timeout: float):
+    """Seconds from launching uvicorn until /health and /ready answer 200 (None if they never do)."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1"],
+        cwd=checkout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    health = ready = None
+    try:
+        while time.perf_counter() - started < timeout and ready is None:
+            if process.poll() is not None:
+                break
+            if health is None and status_of(f"{base}/health") == 200:
+                health = time.perf_counter() - started
+            if health is not None:
+                code = status_of(f"{base}/ready")
+                if code == 200:
+                    ready = time.perf_counter() - started
+                elif code == 404:
+                    break  # No readiness probe in this checkout
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return health, ready
+
+
+def summary(samples):
+    samples = [sample for sample in samples if sample is not None]
+    if not samples:
+        return "n/a"
+    return f"{statistics.median(samples) * 1000:8.0f} ms (min {min(samples) * 1000:.0f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("checkouts", nargs="*", default=["."], help="Repository checkouts to compare")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for a process to become ready")
+    args = parser.parse_args()
+
+    rows = []
+    for checkout in args.checkouts:
+        checkout = os.path.abspath(checkout)
+        print(f"Measuring {checkout} ({args.runs} runs)")
+        imports, healths, readies = [], [], []
+        for _ in range(args.runs):
+            imports.append(time_import(checkout))
+            health, ready = time_boot(checkout, args.timeout)
+            healths.append(health)
+            readies.append(ready)
+        rows.append((checkout, imports, healths, readies))
+
+    print()
+    print(f"{'checkout':<40}{'import':>28}{'health':>28}{'ready':>28}")
+    for checkout, imports, healths, readies in rows:
+        print(f"{checkout[-40:]:<40}{summary(imports):>28}{summary(healths):>28}{summary(readies):>28}")
+
+
+if __name__ == "__main__":
+    main()
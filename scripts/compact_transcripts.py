@@ -0,0 +1,53 @@
+"""
+Migration: Move large inline transcript bodies into compressed/offloaded storage.
+Run this once after the add_transcript_body_storage Alembic revision; new
+transcripts are stored this way automatically. Safe to re-run.
+
+Usage:
+    cd TunAI
+    python scripts/compact_transcripts.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import func
+from sqlalchemy.orm import undefer
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Transcript
+from app.services.transcript_store import transcript_store
+
+BATCH_SIZE = 100
+
+def compact():
+    db = SessionLocal()
+    moved = 0
+    try:
+        while True:
+            # Still-inline rows whose text alone exceeds the inline limit (so save() always compresses them)
+            batch = db.query(Transcript).options(
+                undefer(Transcript.text_content), undefer(Transcript.json_metadata)
+            ).filter(
+                Transcript.body_encoding.is_(None),
+                func.length(Transcript.text_content) > settings.TRANSCRIPT_INLINE_MAX_BYTES
+            ).order_by(Transcript.id).limit(BATCH_SIZE).all()
+
+            if not batch:
+                break
+            for transcript in batch:
+                # load() also folds in segment edits not yet written back to the body
+                text, metadata = transcript_store.load(transcript)
+                transcript_store.save(db, transcript, text, metadata, rebuild_segments=False)
+            db.commit()
+            moved += len(batch)
+            print(f"  Compacted {moved} transcripts so far")
+    finally:
+        db.close()
+    print(f"Done: {moved} transcripts compacted.")
+
+if __name__ == "__main__":
+    compact()
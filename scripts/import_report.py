@@ -0,0 +1,91 @@
+"""
+Import-time report for the API and worker entry points (`python -X importtime`
+in a fresh interpreter per entry point), with a check that heavy dependencies
+stay out of startup: they are imported on first use instead (python-docx and
+fastapi-mail when an export or email is made, boto3 / google-cloud-storage
+only for the configured storage backend, FastAPI never in the worker).
+
+Exits 1 when a deferred module is imported at startup, or when an entry point
+exceeds --max-ms, so CI can run it as is. Needs the app's environment
+(DATABASE_URL, CELERY_BROKER_URL, ...), like the test suite.
+
+Usage:
+    cd TunAI
+    python scripts/import_report.py [--top N] [--max-ms MS]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point module -> modules that must not be imported by it
+ENTRY_POINTS = {
+    "api": ("app.main", ["docx", "fastapi_mail", "boto3", "botocore", "google.cloud.storage", "requests"]),
+    "worker": ("app.workers.tasks", [
+        "fastapi", "sqlalchemy.ext.asyncio", "docx", "fastapi_mail", "boto3", "botocore", "google.cloud.storage", "requests"
+    ]),
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure(module: str):
+    """([(cumulative_us, depth, name)] in import order, max RSS in KiB) for importing `module`."""
+    snippet = f"import resource, {module}; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            imports.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    rss_kib = int(result.stdout.strip().splitlines()[-1])
+    return imports, rss_kib
+
+
+def report(name: str, module: str, forbidden, top: int, max_ms):
+    imports, rss_kib = measure(module)
+    names = {imported for _, _, imported in imports}
+    total_ms = next(cumulative for cumulative, _, imported in imports if imported == module) / 1000
+
+    print(f"{name}: import {module} took {total_ms:.0f} ms, max RSS {rss_kib / 1024:.0f} MiB")
+    # Heaviest packages at their first (outermost) import
+    outermost = {}
+    for cumulative, _, imported in imports:
+        package = imported.split(".")[0]
+        if package != "app":
+            outermost[package] = max(outermost.get(package, 0), cumulative)
+    for package, cumulative in sorted(outermost.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {package}")
+
+    problems = [f"{name}: {deferred} is imported at startup" for deferred in forbidden if deferred in names]
+    if max_ms is not None and total_ms > max_ms:
+        problems.append(f"{name}: import took {total_ms:.0f} ms (budget {max_ms:.0f} ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages to list per entry point")
+    parser.add_argument("--max-ms", type=float, help="Fail when an entry point takes longer to import")
+    args = parser.parse_args()
+
+    problems = []
+    for name, (module, forbidden) in ENTRY_POINTS.items():
+        problems += report(name, module, forbidden, args.top, args.max_ms)
+        print()
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: no deferred dependency is imported at startup")
+
+
+if __name__ == "__main__":
+    main()
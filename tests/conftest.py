@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db, get_async_db
+from app.services.storage import storage_service
+
+# Named shared-cache memory DB, so the async routes' aiosqlite connections see the same data
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:tunai_tests?mode=memory&cache=shared&uri=true"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# NullPool: TestClient runs every request on a fresh event loop
+async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture(autouse=True)
+def offline_storage(monkeypatch):
+    """
+    Every test starts with storage connected to no backend, whatever the
+    environment: calls fall through without reaching a bucket or emulator.
+    Tests that need one patch mode and a fake client on top.
+    """
+    monkeypatch.setitem(storage_service.__dict__, "mode", None)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+@pytest.fixture
+def shared_db():
+    """
+    Empty schema on the shared database, with get_db and get_async_db pointed
+    at it, for tests that reach the async routes. Yields the sync sessionmaker;
+    the previous dependency overrides are restored afterwards.
+    """
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield TestingSessionLocal
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+@pytest.fixture
+def shared_engines():
+    """The shared database's sync engine and the async engine's sync_engine (for statement listeners)."""
+    return engine, async_engine.sync_engine
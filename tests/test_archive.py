@@ -0,0 +1,164 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import Job, JobStatus, StoredObject, User
+from app.services.storage import storage_service
+from app.workers import tasks
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+ORIGINAL = b"RIFF" + b"\x00" * 4000
+RENDITION = b"\x1aE\xdf\xa3" + b"\x00" * 400
+
+class FakeS3:
+    """Just enough of the boto3 client for content-addressed uploads and deletes."""
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        self.objects[key] = fileobj.read()
+
+    def copy(self, source, bucket, key):
+        self.objects[key] = self.objects[source["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+@pytest.fixture(autouse=True)
+def bucket(monkeypatch):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(User(id="archiver", username="archiver", is_admin=False))
+    db.add(StoredObject(sha256="a" * 64, storage_path="cas/original.wav", size_bytes=len(ORIGINAL), ref_count=1))
+    db.add(StoredObject(sha256="b" * 64, storage_path="cas/playback.webm", size_bytes=len(RENDITION), ref_count=1))
+    db.add(Job(id="j", user_id="archiver", original_filename="hearing.wav", storage_path="cas/original.wav",
+               mime_type="audio/wav", file_size_bytes=len(ORIGINAL), playback_path="cas/playback.webm",
+               status=JobStatus.COMPLETED.value))
+    db.commit()
+    db.close()
+
+    s3 = FakeS3()
+    s3.objects.update({"cas/original.wav": ORIGINAL, "cas/playback.webm": RENDITION})
+    s3.transcodes = []
+    s3.durations = {}
+    s3.tiered = []
+
+    def download_to_temp(path):
+        handle, local_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+        with os.fdopen(handle, "wb") as f:
+            f.write(s3.objects[path])
+        return local_path
+
+    def transcode(input_path, output_path, bitrate):
+        s3.transcodes.append(bitrate)
+        with open(output_path, "wb") as f:
+            f.write(b"OggS" + b"\x00" * 300)
+
+    def duration(path):
+        with open(path, "rb") as f:
+            return s3.durations.get(f.read(4), 60.0)
+
+    monkeypatch.setattr(storage_service, "mode", "S3")
+    monkeypatch.setattr(storage_service, "s3_client", s3, raising=False)
+    monkeypatch.setattr(storage_service, "s3_bucket_name", "test-bucket", raising=False)
+    monkeypatch.setattr(storage_service, "download_to_temp", download_to_temp)
+    monkeypatch.setattr(storage_service, "set_storage_class", lambda path, archival=True: s3.tiered.append(path))
+    monkeypatch.setattr(tasks, "transcode_to_opus", transcode)
+    monkeypatch.setattr(tasks, "get_audio_duration_ffprobe", duration)
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(settings, "ARCHIVE_ORIGINAL_POLICY", "keep")
+    yield s3
+
+def load_job():
+    db = TestingSessionLocal()
+    job = db.query(Job).filter(Job.id == "j").one()
+    refs = {obj.storage_path: obj.ref_count for obj in db.query(StoredObject)}
+    db.close()
+    return job, refs
+
+def test_playback_rendition_is_archived_without_a_second_transcode(bucket):
+    tasks.archive_original_file("j")
+    job, refs = load_job()
+
+    assert bucket.transcodes == []
+    assert job.storage_path == "cas/playback.webm" and job.mime_type == "audio/webm"
+    assert job.original_storage_path == "cas/original.wav"
+    assert (job.file_size_bytes, job.archived_size_bytes) == (len(ORIGINAL), len(RENDITION))
+    assert job.archived_at is not None
+    # playback_path and storage_path each hold a reference; the kept original is untouched
+    assert refs == {"cas/original.wav": 1, "cas/playback.webm": 2}
+
+    # Already archived: nothing changes on a retry
+    tasks.archive_original_file("j")
+    assert load_job()[1] == refs
+
+def test_transcodes_without_rendition_and_deletes_original(bucket, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_ORIGINAL_POLICY", "delete")
+    db = TestingSessionLocal()
+    db.query(Job).update({Job.playback_path: None})
+    db.commit()
+    db.close()
+
+    tasks.archive_original_file("j")
+    job, refs = load_job()
+
+    assert bucket.transcodes == [settings.ARCHIVE_OPUS_BITRATE]
+    assert job.storage_path.startswith("cas/") and job.storage_path.endswith(".opus")
+    assert job.mime_type == "audio/ogg"
+    assert job.original_storage_path is None
+    assert "cas/original.wav" not in bucket.objects and "cas/original.wav" not in refs
+    assert bucket.objects[job.storage_path].startswith(b"OggS")
+
+def test_tier_policy_moves_original_to_cold_storage(bucket, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_ORIGINAL_POLICY", "tier")
+    tasks.archive_original_file("j")
+    job, _ = load_job()
+    assert job.original_storage_path == "cas/original.wav"
+    assert bucket.tiered == ["cas/original.wav"]
+
+def test_tier_policy_leaves_shared_original_alone(bucket, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_ORIGINAL_POLICY", "tier")
+    db = TestingSessionLocal()
+    db.add(Job(id="copy", user_id="archiver", original_filename="copy.wav", storage_path="cas/original.wav",
+               mime_type="audio/wav", file_size_bytes=len(ORIGINAL), status=JobStatus.UPLOADED.value))
+    db.query(StoredObject).filter(StoredObject.storage_path == "cas/original.wav").update({StoredObject.ref_count: 2})
+    db.commit()
+    db.close()
+
+    tasks.archive_original_file("j")
+    job, refs = load_job()
+    assert job.storage_path == "cas/playback.webm" and job.original_storage_path == "cas/original.wav"
+    assert refs["cas/original.wav"] == 2
+    assert bucket.tiered == []
+
+@pytest.mark.parametrize("problem", ["duration", "size", "already_opus"])
+def test_original_is_kept_when_archive_does_not_verify(bucket, problem):
+    db = TestingSessionLocal()
+    if problem == "duration":
+        bucket.durations[RENDITION[:4]] = 30.0
+    elif problem == "size":
+        db.query(Job).update({Job.file_size_bytes: 100})
+    else:
+        db.query(Job).update({Job.mime_type: "audio/ogg"})
+    db.commit()
+    db.close()
+
+    tasks.archive_original_file("j")
+    job, refs = load_job()
+    assert job.storage_path == "cas/original.wav" and job.archived_at is None
+    assert job.mime_type in ("audio/wav", "audio/ogg")
+    assert refs == {"cas/original.wav": 1, "cas/playback.webm": 1}
+    assert bucket.tiered == [] and bucket.transcodes == []
@@ -0,0 +1,8 @@
+from app.db.base import async_database_url
+
+
+def test_async_driver_urls():
+    assert str(async_database_url("postgresql://u:p@db:5432/app")) == "postgresql+asyncpg://u:***@db:5432/app"
+    url = async_database_url("postgresql+psycopg2://u:p@db/app?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg" and dict(url.query) == {"ssl": "require"}
+    assert async_database_url("sqlite:///./tunai.db").drivername == "sqlite+aiosqlite"
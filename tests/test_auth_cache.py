@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.db.models import User
+from app.core import security
+from app.core.cache import TTLCache, user_cache
+
+client = TestClient(app)
+
+user_queries = []
+
+def record_user_lookups(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+        user_queries.append(statement)
+
+def token_for(user):
+    return {"Authorization": "Bearer " + security.create_access_token(
+        {"sub": user.username, "is_admin": user.is_admin, "user_id": user.id}
+    )}
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db, shared_engines):
+    # Real authentication: only the DB is overridden
+    user_cache.local.clear()
+
+    db = shared_db()
+    db.add(User(id="admin_id", username="boss", is_admin=True))
+    db.add(User(id="op_id", username="operator", is_admin=False))
+    db.commit()
+    db.close()
+    user_queries.clear()
+    for engine in shared_engines:
+        event.listen(engine, "before_cursor_execute", record_user_lookups)
+    yield
+    for engine in shared_engines:
+        event.remove(engine, "before_cursor_execute", record_user_lookups)
+
+def test_repeat_requests_skip_user_lookup():
+    headers = token_for(User(id="op_id", username="operator", is_admin=False))
+    assert client.get("/jobs/", headers=headers).status_code == 200
+    assert len(user_queries) == 1
+
+    for _ in range(5):
+        assert client.get("/jobs/", headers=headers).status_code == 200
+    assert len(user_queries) == 1
+
+def test_deleted_user_is_rejected_immediately():
+    operator = token_for(User(id="op_id", username="operator", is_admin=False))
+    admin = token_for(User(id="admin_id", username="boss", is_admin=True))
+    assert client.get("/jobs/", headers=operator).status_code == 200
+
+    assert client.delete("/admin/users/operator", headers=admin).status_code == 200
+    assert client.get("/jobs/", headers=operator).status_code == 401
+
+def test_ttl_cache_expiry_and_eviction(monkeypatch):
+    import app.core.cache as cache_module
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(ttl_seconds=10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # evicts least recently used "b"
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    now[0] += 11
+    assert cache.get("a") is None
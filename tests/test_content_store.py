@@ -0,0 +1,126 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, StoredObject, User
+from app.api.auth import get_current_user
+from app.services.storage import storage_service
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="cas_user", username="cas", is_admin=False)
+
+client = TestClient(app)
+
+class FakeS3:
+    """Just enough of the boto3 client for uploads, copies and deletes."""
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        data = b""
+        while True:
+            chunk = fileobj.read(1024)
+            if not chunk:
+                break
+            data += chunk
+        self.objects[key] = data
+
+    def copy(self, source, bucket, key):
+        self.objects[key] = self.objects[source["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+@pytest.fixture(autouse=True)
+def fake_bucket(monkeypatch):
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.commit()
+    db.close()
+
+    s3 = FakeS3()
+    monkeypatch.setattr(storage_service, "mode", "S3")
+    monkeypatch.setattr(storage_service, "s3_client", s3, raising=False)
+    monkeypatch.setattr(storage_service, "s3_bucket_name", "test-bucket", raising=False)
+    yield s3
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def upload(content: bytes, name: str = "hearing.mp3"):
+    response = client.post("/jobs/upload", files={"file": (name, content, "audio/mpeg")})
+    assert response.status_code == 200
+    return response.json()
+
+def test_identical_uploads_share_one_object(fake_bucket):
+    first = upload(b"ID3same-recording")
+    second = upload(b"ID3same-recording", name="copy.mp3")
+
+    assert first["storage_path"] == second["storage_path"]
+    assert first["storage_path"].startswith("cas/")
+    # Staging copies are gone; exactly one object remains
+    assert list(fake_bucket.objects) == [first["storage_path"]]
+
+    db = TestingSessionLocal()
+    obj = db.query(StoredObject).one()
+    assert obj.ref_count == 2
+    db.close()
+
+def test_object_deleted_only_with_last_reference(fake_bucket):
+    first = upload(b"ID3shared")
+    second = upload(b"ID3shared")
+    path = first["storage_path"]
+
+    assert client.delete(f"/jobs/{first['job_id']}/permanent").status_code == 204
+    assert path in fake_bucket.objects
+
+    assert client.delete(f"/jobs/{second['job_id']}/permanent").status_code == 204
+    assert path not in fake_bucket.objects
+
+    db = TestingSessionLocal()
+    assert db.query(StoredObject).count() == 0
+    assert db.query(Job).count() == 0
+    db.close()
+
+def test_known_hash_resumable_session_is_metadata_only(fake_bucket):
+    import hashlib
+    content = b"ID3already-here"
+    upload(content)
+
+    session = client.post("/uploads/", json={
+        "filename": "again.mp3",
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest()
+    }).json()
+    assert session["offset"] == len(content)
+
+    finalized = client.post(f"/uploads/{session['id']}/finalize").json()
+    assert finalized["job_id"]
+
+    db = TestingSessionLocal()
+    assert db.query(StoredObject).one().ref_count == 2
+    db.close()
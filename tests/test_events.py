@@ -0,0 +1,155 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.models import AudioQueueItem, AudioQueueStatus, User
+from app.api.auth import get_current_user, get_current_user_async
+from app.core.cache import count_cache
+from app.services.events import QUEUE_STREAM, event_bus, user_stream
+
+def override_get_current_user():
+    return User(id="test_user", username="test", is_admin=False)
+
+
+client = TestClient(app)
+
+
+class FakeStreams:
+    """Just enough of Redis Streams for EventBus; shared by the sync and async fakes."""
+
+    def __init__(self):
+        self.streams = {}
+        self.counter = 0
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.counter += 1
+        entry_id = f"{self.counter}-0"
+        entries = self.streams.setdefault(key, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return entry_id
+
+    def after(self, key, position):
+        number = int(position.split("-")[0])
+        return [entry for entry in self.streams.get(key, []) if int(entry[0].split("-")[0]) > number]
+
+
+class FakeAsyncRedis:
+    def __init__(self, streams):
+        self.streams = streams
+        self.closed = False
+
+    async def xread(self, positions, count=None, block=None):
+        response = [(key, self.streams.after(key, position)[:count]) for key, position in positions.items()]
+        return [(key, entries) for key, entries in response if entries]
+
+    async def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.streams.get(key, [])))[:count]
+
+    async def xrange(self, key, count=None):
+        return self.streams.streams.get(key, [])[:count]
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db, monkeypatch):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+
+    streams = FakeStreams()
+    monkeypatch.setattr(event_bus, "redis_url", "redis://fake")
+    monkeypatch.setattr(event_bus, "_client", lambda: streams)
+    monkeypatch.setattr(event_bus, "_async_client", lambda: FakeAsyncRedis(streams))
+
+    count_cache.clear()
+    db = shared_db()
+    db.add(override_get_current_user())
+    db.add(AudioQueueItem(
+        id=str(uuid.uuid4()),
+        original_filename="queued.wav",
+        storage_path="path/to/queued.wav",
+        duration_seconds=90,
+        status=AudioQueueStatus.AVAILABLE.value,
+        uploaded_at=datetime.now(timezone.utc)
+    ))
+    db.commit()
+    db.close()
+    yield streams
+
+def _collect(generator, count):
+    async def run():
+        messages = []
+        try:
+            async for message in generator:
+                if not message.startswith(":"):
+                    messages.append(message)
+                if len(messages) == count:
+                    break
+        finally:
+            await generator.aclose()
+        return messages
+
+    return asyncio.run(run())
+
+
+def _parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields.get("id"), fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+
+def test_claim_publishes_queue_and_job_events(setup_db):
+    streams = setup_db
+    response = client.post("/queue/claim-next")
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    (_, queue_event), = streams.streams[QUEUE_STREAM]
+    assert queue_event["type"] == "queue.claimed"
+    assert json.loads(queue_event["data"])["job_id"] == job_id
+
+    (_, job_event), = streams.streams[user_stream("test_user")]
+    assert job_event["type"] == "job.status"
+    assert json.loads(job_event["data"]) == {"job_id": job_id, "status": "QUEUED"}
+
+
+def test_stream_resumes_from_last_event_id(setup_db):
+    event_bus.queue_changed("queue.added", "q1")
+    event_bus.job_status("test_user", "j1", "PROCESSING")
+    event_bus.job_status("someone_else", "j2", "PROCESSING")
+    event_bus.queue_changed("queue.claimed", "q1", job_id="j1")
+
+    retry, first, second, third = _collect(event_bus.stream("test_user", "0-0,0-0"), 4)
+    assert retry.startswith("retry: ")
+    events = [_parse(message) for message in (first, second, third)]
+    assert [event for _, event, _ in events] == ["queue.added", "queue.claimed", "job.status"]
+    assert events[2][2] == {"job_id": "j1", "status": "PROCESSING"}
+
+    # Reconnecting with the last id only replays what came after it
+    event_bus.job_status("test_user", "j1", "COMPLETED")
+    _, replayed = _collect(event_bus.stream("test_user", events[2][0]), 2)
+    assert _parse(replayed)[1:] == ("job.status", {"job_id": "j1", "status": "COMPLETED"})
+
+
+def test_stream_asks_for_resync_when_trimmed(setup_db, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "EVENTS_STREAM_MAXLEN", 2)
+    for index in range(4):
+        event_bus.queue_changed("queue.added", f"q{index}")
+
+    _, resync, latest = _collect(event_bus.stream("test_user", "1-0,0-0"), 3)
+    assert _parse(resync)[1] == "resync"
+    assert _parse(latest)[2] == {"queue_item_id": "q2"}
+
+
+def test_stream_unavailable_without_redis(monkeypatch):
+    monkeypatch.setattr(event_bus, "redis_url", "")
+    assert client.get("/events/stream").status_code == 503
@@ -0,0 +1,121 @@
+import io
+
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, JobStatus, Transcript, User
+from app.api.auth import get_current_user
+from app.services import exports
+from app.services.storage import storage_service
+from app.services.transcript_store import transcript_store
+from app.workers import tasks
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="export_user", username="exporter", is_admin=False)
+
+client = TestClient(app)
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.reads = 0
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.reads += 1
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+@pytest.fixture(autouse=True)
+def env(monkeypatch):
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.add(Job(id="job", user_id="export_user", original_filename="hearing.mp3",
+               storage_path="hearing.mp3", status=JobStatus.COMPLETED.value))
+    transcript = Transcript(job_id="job")
+    transcript_store.save(db, transcript, "Premier.\nSecond.", {"segments": []})
+    db.add(transcript)
+    db.commit()
+    db.close()
+
+    s3 = FakeS3()
+    monkeypatch.setattr(storage_service, "mode", "S3")
+    monkeypatch.setattr(storage_service, "s3_client", s3, raising=False)
+    monkeypatch.setattr(storage_service, "s3_bucket_name", "test-bucket", raising=False)
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(tasks.render_docx_export, "delay", lambda job_id: None)
+
+    renders = []
+    real_render = exports.render_docx
+    def counting_render(title, paragraphs):
+        renders.append(paragraphs)
+        return real_render(title, paragraphs)
+    monkeypatch.setattr(exports, "render_docx", counting_render)
+    yield s3, renders
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def paragraphs(content):
+    return [p.text for p in Document(io.BytesIO(content)).paragraphs]
+
+def test_rendered_once_then_served_from_storage(env):
+    s3, renders = env
+    first = client.get("/jobs/job/download")
+    assert first.status_code == 200
+    assert paragraphs(first.content) == ["hearing.mp3", "Premier.", "Second."]
+    etag = first.headers["etag"]
+    assert list(s3.objects) == [f"exports/docx/job/{etag.strip(chr(34))}.docx"]
+
+    second = client.get("/jobs/job/download")
+    assert second.content == first.content and second.headers["etag"] == etag
+    assert len(renders) == 1 and s3.reads == 1
+
+    not_modified = client.get("/jobs/job/download", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and s3.reads == 1
+
+def test_edit_changes_hash_and_replaces_object(env):
+    s3, renders = env
+    tasks.render_docx_export_file("job")
+    old_etag = client.get("/jobs/job/download").headers["etag"]
+    assert len(renders) == 1
+
+    client.put("/jobs/job/transcript", json={"text_content": "Premier.\nSecond corrigé."})
+    response = client.get("/jobs/job/download", headers={"If-None-Match": old_etag})
+    assert response.status_code == 200 and response.headers["etag"] != old_etag
+    assert paragraphs(response.content)[-1] == "Second corrigé."
+    assert len(s3.objects) == 1 and len(renders) == 2
+
+    # Precomputing again is a no-op while the hash matches
+    tasks.render_docx_export_file("job")
+    assert len(renders) == 2
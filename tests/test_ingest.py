@@ -0,0 +1,42 @@
+import hashlib
+import struct
+from io import BytesIO
+
+from app.services.ingest import IngestReader, sniff_mime_type, wav_duration_seconds
+
+
+def make_wav(seconds: int, sample_rate: int = 8000) -> bytes:
+    data = b"\x00\x00" * sample_rate * seconds
+    fmt = struct.pack("<HHIIHH", 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    return (
+        b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", len(data)) + data
+    )
+
+
+def test_reader_measures_while_streaming():
+    payload = make_wav(3)
+    reader = IngestReader(BytesIO(payload))
+
+    # Consume the way a storage SDK would: fixed-size chunks until EOF
+    while reader.read(4096):
+        pass
+
+    result = reader.result("abc.wav", "recording.wav")
+    assert result.size_bytes == len(payload)
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+    assert result.mime_type == "audio/wav"
+    assert result.duration_seconds == 3
+    assert not reader.seekable()
+
+
+def test_sniff_prefers_magic_bytes_over_client_type():
+    assert sniff_mime_type(b"ID3\x04\x00", "clip.bin", "application/octet-stream") == "audio/mpeg"
+    assert sniff_mime_type(b"%PDF-1.7", "scan.pdf", "text/plain") == "application/pdf"
+    assert sniff_mime_type(b"????", "notes.txt", "text/plain") == "text/plain"
+    assert sniff_mime_type(b"????", "voice.m4a", None) == "audio/mp4"
+
+
+def test_non_wav_has_no_header_duration():
+    assert wav_duration_seconds(b"OggS" + b"\x00" * 40, 1000) is None
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.models import Job, JobStatus, User
+from app.api.auth import get_current_user, get_current_user_async
+from app.services import exports
+
+def override_get_current_user():
+    return User(id="ledger_user", username="ledger", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db, monkeypatch):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+    # Small batches so the tests cross chunk boundaries
+    monkeypatch.setattr(exports, "EXPORT_BATCH_ROWS", 2)
+
+    db = shared_db()
+    db.add(override_get_current_user())
+    db.add(User(id="other_user", username="other", is_admin=False))
+    start = datetime(2024, 3, 1, 9, 30)
+    for i in range(5):
+        db.add(Job(
+            id=f"job{i}", user_id="ledger_user", original_filename=f"file{i}.mp3", storage_path=f"file{i}.mp3",
+            status=JobStatus.TRASHED.value if i == 4 else JobStatus.COMPLETED.value,
+            service_type="Interview" if i % 2 else "Hearing",
+            client_name="Zoë" if i == 0 else f"Client {i}", payment="12,50 €" if i == 0 else None,
+            duration_seconds=60 * i, created_at=start + timedelta(days=i)
+        ))
+    db.add(Job(id="foreign", user_id="other_user", original_filename="x.mp3", storage_path="x.mp3",
+               status=JobStatus.COMPLETED.value, created_at=start))
+    db.commit()
+    db.close()
+    yield
+def test_csv_matches_list_filters_and_order():
+    response = client.get("/jobs/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].endswith('.csv"')
+    rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    listed = [job["id"] for job in client.get("/jobs/").json()]
+    assert [row["id"] for row in rows] == listed == ["job3", "job2", "job1", "job0"]
+    assert rows[-1]["client_name"] == "Zoë" and rows[-1]["payment"] == "12,50 €"
+    assert rows[-1]["created_at"] == "2024-03-01T09:30:00"
+
+    trashed = client.get("/jobs/export?format=csv&status=TRASHED").content.decode("utf-8-sig")
+    assert [row["id"] for row in csv.DictReader(io.StringIO(trashed))] == ["job4"]
+
+def test_csv_neutralizes_formula_cells(shared_db):
+    db = shared_db()
+    db.query(Job).filter(Job.id == "job1").update({
+        Job.client_name: '=HYPERLINK("http://evil.example","x")', Job.client_surname: "@SUM(A1)",
+        Job.phone_number: "+33612345678", Job.payment: "-10"
+    })
+    db.commit()
+    db.close()
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/jobs/export?format=csv").content.decode("utf-8-sig"))))
+    row = next(row for row in rows if row["id"] == "job1")
+    assert row["client_name"] == '\'=HYPERLINK("http://evil.example","x")'
+    assert (row["client_surname"], row["phone_number"], row["payment"]) == ("'@SUM(A1)", "'+33612345678", "'-10")
+    # Numbers and dates are not user text and stay as they are
+    assert row["duration_seconds"] == "60" and row["created_at"] == "2024-03-02T09:30:00"
+
+    # Only the CSV writer escapes; NDJSON keeps the stored value
+    records = [json.loads(line) for line in client.get("/jobs/export?format=ndjson").text.splitlines()]
+    assert next(r for r in records if r["id"] == "job1")["payment"] == "-10"
+
+def test_ndjson_with_service_type_filter():
+    response = client.get("/jobs/export?format=ndjson&service_type=Interview")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["id"] for record in records] == ["job3", "job1"]
+    assert records[0]["duration_seconds"] == 180 and records[0]["service_type"] == "Interview"
+    assert list(records[0]) == list(exports.LEDGER_COLUMNS)
+
+def test_xlsx_is_a_valid_workbook():
+    response = client.get("/jobs/export?format=xlsx")
+    assert response.headers["content-type"] == exports.XLSX_MEDIA_TYPE
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert "[Content_Types].xml" in archive.namelist()
+    sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row ") == 5
+    assert '<c r="A2" t="inlineStr"><is><t xml:space="preserve">job3</t></is></c>' in sheet
+    assert "Zoë" in sheet
+    # 2024-03-01 09:30 as an Excel serial date
+    assert '<c r="L5" s="1"><v>45352.395833</v></c>' in sheet
+
+def test_zip_stream_round_trip():
+    archive = exports.ZipStream()
+    data = b"".join(archive.add("a.txt", [b"hello ", b"world"]))
+    data += b"".join(archive.add("b.bin", iter([b"\x00" * 10000]), compress=False))
+    data += archive.close()
+    unpacked = zipfile.ZipFile(io.BytesIO(data))
+    assert unpacked.read("a.txt") == b"hello world"
+    assert unpacked.read("b.bin") == b"\x00" * 10000
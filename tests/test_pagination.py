@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.models import Job, User
+from app.api.auth import get_current_user, get_current_user_async
+from app.services.pagination import encode_cursor, decode_cursor
+
+def override_get_current_user():
+    return User(id="pager", username="pager", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+
+    db = shared_db()
+    db.add(override_get_current_user())
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    # Five jobs, two sharing a timestamp so the id tiebreak matters
+    for i, offset in enumerate([0, 1, 1, 2, 3]):
+        db.add(Job(id=f"job-{i}", user_id="pager", original_filename=f"{i}.mp3", storage_path=f"{i}.mp3",
+                   created_at=base + timedelta(minutes=offset)))
+    db.commit()
+    db.close()
+    yield
+
+def test_cursor_walk_returns_every_job_once_newest_first():
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/jobs/", params=params)
+        assert response.status_code == 200
+        seen += [job["id"] for job in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == ["job-4", "job-3", "job-2", "job-1", "job-0"]
+
+def test_cursor_round_trip_and_rejection():
+    stamp = datetime(2026, 3, 1, 12, 0, 5)
+    assert decode_cursor(encode_cursor(stamp, "abc")) == (stamp, "abc")
+    assert client.get("/jobs/", params={"cursor": "%%%"}).status_code == 400
@@ -0,0 +1,78 @@
+import pytest
+from array import array
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, AudioQueueItem, User
+from app.api.auth import get_current_user
+from app.services.media import _window_peak
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="peaks_user", username="listener", is_admin=False)
+
+client = TestClient(app)
+
+PEAKS = bytes([0, 64, 255, 128, 12])
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.add(Job(id="job-with-peaks", user_id="peaks_user", original_filename="a.mp3", storage_path="a.mp3", waveform_peaks=PEAKS))
+    db.add(Job(id="job-pending", user_id="peaks_user", original_filename="b.mp3", storage_path="b.mp3"))
+    db.add(AudioQueueItem(id="queued", original_filename="c.mp3", storage_path="c.mp3", waveform_peaks=PEAKS))
+    db.commit()
+    db.close()
+    yield
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def test_peaks_served_with_cache_headers():
+    response = client.get("/jobs/job-with-peaks/peaks")
+    assert response.status_code == 200
+    assert response.content == PEAKS
+    assert response.headers["x-peaks-per-second"] == "10"
+    assert "max-age" in response.headers["cache-control"]
+
+    revalidated = client.get("/jobs/job-with-peaks/peaks", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+def test_missing_peaks_is_404():
+    assert client.get("/jobs/job-pending/peaks").status_code == 404
+
+def test_queue_item_peaks_and_claim_copies_them():
+    assert client.get("/queue/queued/peaks").content == PEAKS
+
+    job_id = client.post("/queue/queued/claim").json()["job_id"]
+    assert client.get(f"/jobs/{job_id}/peaks").content == PEAKS
+
+def test_window_peak_scales_to_byte():
+    assert _window_peak(array("h", [0, 0, 0]).tobytes()) == 0
+    assert _window_peak(array("h", [100, -32767, 5]).tobytes()) == 255
+    assert _window_peak(array("h", [16384, -10]).tobytes()) == 127
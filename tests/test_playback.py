@@ -0,0 +1,122 @@
+import io
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, AudioQueueItem, User
+from app.api.auth import get_current_user
+from app.services.storage import storage_service
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="playback_user", username="reviewer", is_admin=False)
+
+client = TestClient(app)
+
+class FakeBody(io.BytesIO):
+    def iter_chunks(self, chunk_size):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+class FakeS3:
+    """Ranged reads and presigning; records which ranges were fetched."""
+    def __init__(self, objects):
+        self.objects = objects
+        self.ranges = []
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(v) for v in Range.replace("bytes=", "").split("-"))
+        self.ranges.append((Key, start, end))
+        return {"Body": FakeBody(self.objects[Key][start:end + 1])}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://bucket.example/{Params['Key']}?sig=1"
+
+ORIGINAL = b"O" * 1000
+RENDITION = bytes(range(100))
+
+@pytest.fixture(autouse=True)
+def fake_bucket(monkeypatch):
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.add(Job(id="rendered", user_id="playback_user", original_filename="long.mkv",
+               storage_path="cas/aa/orig.mkv", playback_path="cas/bb/play.webm"))
+    db.add(Job(id="raw", user_id="playback_user", original_filename="short.wav", storage_path="cas/cc/raw.wav"))
+    db.add(AudioQueueItem(id="shared", original_filename="q.mkv",
+                          storage_path="cas/aa/orig.mkv", playback_path="cas/bb/play.webm"))
+    db.commit()
+    db.close()
+
+    s3 = FakeS3({"cas/aa/orig.mkv": ORIGINAL, "cas/bb/play.webm": RENDITION, "cas/cc/raw.wav": ORIGINAL})
+    monkeypatch.setattr(storage_service, "mode", "S3")
+    monkeypatch.setattr(storage_service, "s3_client", s3, raising=False)
+    monkeypatch.setattr(storage_service, "s3_bucket_name", "test-bucket", raising=False)
+    yield s3
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def test_audio_prefers_rendition_and_reads_only_requested_range(fake_bucket):
+    response = client.get("/jobs/rendered/audio", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == RENDITION[10:20]
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.headers["content-type"] == "audio/webm"
+    assert fake_bucket.ranges == [("cas/bb/play.webm", 10, 19)]
+
+def test_audio_falls_back_to_stored_object(fake_bucket):
+    response = client.get("/jobs/raw/audio")
+    assert response.status_code == 200
+    assert response.content == ORIGINAL
+    assert response.headers["content-type"] == "audio/wav"
+
+def test_suffix_and_unsatisfiable_ranges(fake_bucket):
+    tail = client.get("/jobs/raw/audio", headers={"Range": "bytes=-5"})
+    assert tail.status_code == 206
+    assert tail.headers["content-range"] == "bytes 995-999/1000"
+    assert client.get("/jobs/raw/audio", headers={"Range": "bytes=5000-"}).status_code == 416
+
+def test_playback_source_is_signed_rendition_url():
+    source = client.get("/jobs/rendered/playback").json()
+    assert source["direct"] is True
+    assert source["is_rendition"] is True
+    assert source["url"].startswith("https://bucket.example/cas/bb/play.webm")
+    assert source["hls_url"] is None
+
+    shared = client.get("/queue/shared/playback").json()
+    assert shared["media_type"] == "audio/webm"
+
+def test_claim_shares_rendition():
+    job_id = client.post("/queue/shared/claim").json()["job_id"]
+    db = TestingSessionLocal()
+    assert db.query(Job).filter(Job.id == job_id).one().playback_path == "cas/bb/play.webm"
+    db.close()
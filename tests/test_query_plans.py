@@ -0,0 +1,121 @@
+import re
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.db.models import Job, AudioQueueItem, User, SupportingDocument
+from app.api.auth import get_current_user, get_current_user_async
+
+def override_get_current_user():
+    return User(id="planner", username="planner", is_admin=False)
+
+client = TestClient(app)
+
+captured = []
+
+def capture_selects(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, parameters))
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db, shared_engines):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+
+    db = shared_db()
+    db.add(override_get_current_user())
+    for i in range(3):
+        db.add(Job(user_id="planner", original_filename="a.mp3", storage_path="a.mp3",
+                   service_type="OFPRA", created_at=datetime(2026, 1, 1) + timedelta(hours=i)))
+        db.add(AudioQueueItem(original_filename="q.mp3", storage_path="q.mp3"))
+    db.commit()
+    db.close()
+    captured.clear()
+    for engine in shared_engines:
+        event.listen(engine, "before_cursor_execute", capture_selects)
+    yield shared_db
+    for engine in shared_engines:
+        event.remove(engine, "before_cursor_execute", capture_selects)
+
+def plan_steps(Session, table):
+    """(plan step, statement) for every captured statement that touches `table`."""
+    steps = []
+    with Session() as db:
+        conn = db.connection()
+        for statement, parameters in captured:
+            if f"FROM {table}" not in statement:
+                continue
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            steps.extend((row[-1], statement) for row in plan)
+    return steps
+
+def full_scans(Session, table):
+    """Tables read by a full scan (no index) in the captured statements that touch `table`."""
+    return [
+        (detail, statement) for detail, statement in plan_steps(Session, table)
+        if re.match(rf"SCAN {table}\b", detail) and "INDEX" not in detail
+    ]
+
+@pytest.mark.parametrize("params, index", [
+    ({}, "ix_jobs_user_id_created_at_id"),
+    ({"status": "COMPLETED"}, "ix_jobs_user_id_status_created_at_id"),
+    ({"status": "TRASHED"}, "ix_jobs_user_id_status_created_at_id"),
+    ({"service_type": "OFPRA"}, "ix_jobs_user_id_service_type_created_at_id"),
+    ({"limit": 1}, "ix_jobs_user_id_created_at_id"),
+])
+def test_job_listing_uses_indexes(setup_db, params, index):
+    response = client.get("/jobs/", params=params)
+    assert response.status_code == 200
+    cursor = response.headers.get("x-next-cursor")
+    if cursor:
+        assert client.get("/jobs/", params={**params, "cursor": cursor}).status_code == 200
+    assert full_scans(setup_db, "jobs") == []
+    # The filter's own index also yields ORDER BY created_at, id: searched, not sorted per page
+    steps = [detail for detail, _ in plan_steps(setup_db, "jobs")]
+    assert any(f"INDEX {index} " in detail for detail in steps), steps
+    assert not any("TEMP B-TREE" in detail for detail in steps), steps
+
+def test_queue_listing_uses_indexes(setup_db):
+    first = client.get("/queue/", params={"limit": 1}).json()
+    client.get("/queue/", params={"limit": 1, "cursor": first["next_cursor"]})
+    assert full_scans(setup_db, "audio_queue") == []
+
+def add_jobs_with_documents(Session, count):
+    db = Session()
+    for i in range(count):
+        job = Job(user_id="planner", original_filename=f"{i}.mp3", storage_path=f"{i}.mp3")
+        job.supporting_documents = [SupportingDocument(original_filename="id.pdf", storage_path="id.pdf")]
+        db.add(job)
+    db.commit()
+    db.close()
+    captured.clear()
+
+def job_selects():
+    return [s for s, _ in captured if "FROM jobs" in s or "FROM supporting_documents" in s]
+
+def test_full_listing_batches_documents(setup_db):
+    add_jobs_with_documents(setup_db, 3)
+    small = client.get("/jobs/").json()
+    small_queries = len(job_selects())
+
+    add_jobs_with_documents(setup_db, 20)
+    large = client.get("/jobs/").json()
+    assert len(large) > len(small)
+    assert len(job_selects()) == small_queries == 2  # jobs page + one IN (...) for all documents
+    assert all(len(job["supporting_documents"]) == 1 for job in large if job["original_filename"] != "a.mp3")
+
+def test_summary_and_sparse_fields(setup_db):
+    add_jobs_with_documents(setup_db, 5)
+    summary = client.get("/jobs/", params={"view": "summary"}).json()
+    assert "supporting_documents" not in summary[0]
+    assert set(summary[0]) >= {"id", "status", "original_filename"}
+    assert not any("FROM supporting_documents" in s for s in job_selects())
+    assert not any("error_message" in s for s in job_selects())
+
+    sparse = client.get("/jobs/", params={"fields": "status,supporting_documents", "limit": 2})
+    assert sparse.headers.get("x-next-cursor")
+    assert set(sparse.json()[0]) == {"id", "status", "supporting_documents"}
+
+    assert client.get("/jobs/", params={"fields": "hashed_password"}).status_code == 400
@@ -1,48 +1,24 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 import uuid
 from datetime import datetime, timezone
 
 from app.main import app
-from app.db.base import Base, get_db
 from app.db.models import AudioQueueItem, AudioQueueStatus, User
-from app.api.auth import get_current_user
-
-# Setup in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base.metadata.create_all(bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+from app.api.auth import get_current_user, get_current_user_async
+from app.core.cache import count_cache
 
 def override_get_current_user():
     return User(id="test_user", username="test", is_admin=False)
 
-app.dependency_overrides[get_db] = override_get_db
-app.dependency_overrides[get_current_user] = override_get_current_user
-
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
-def setup_db():
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+def setup_db(shared_db):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+    count_cache.clear()
+    db = shared_db()
     
     # Add an AP-originated queue item
     ap_item = AudioQueueItem(
@@ -139,3 +115,48 @@ def test_queue_item_claim():
     
     assert queue_data["total"] == 1
     assert queue_data["items"][0]["id"] != "e97ebc93-ecdc-4cf8-a5ef-ccea77fea553"
+
+def test_queue_cursor_pagination():
+    first = client.get("/queue/", params={"limit": 1}).json()
+    assert len(first["items"]) == 1
+    assert first["total"] == 2
+    assert first["next_cursor"]
+
+    second = client.get("/queue/", params={"limit": 1, "cursor": first["next_cursor"], "include_total": False}).json()
+    assert len(second["items"]) == 1
+    assert second["items"][0]["id"] != first["items"][0]["id"]
+    assert second["total"] is None
+    assert second["next_cursor"] is None
+
+    assert client.get("/queue/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    # Deprecated offset paging still works for older clients
+    skipped = client.get("/queue/", params={"limit": 1, "skip": 1}).json()
+    assert [item["id"] for item in skipped["items"]] == [second["items"][0]["id"]]
+    assert skipped["next_cursor"] is None
+
+def test_claim_next_hands_out_oldest_matching_items():
+    ap_id = "e97ebc93-ecdc-4cf8-a5ef-ccea77fea553"
+    # Filters: only the long AP recording qualifies
+    assert client.post("/queue/claim-next", params={"max_duration": 60}).status_code == 404
+    first = client.post("/queue/claim-next", params={"min_duration": 600, "source": "tunaide_ap"})
+    assert first.status_code == 200
+    assert first.json()["queue_item_id"] == ap_id and first.json()["status"] == "QUEUED"
+
+    # Each call claims a different item until none are left
+    second = client.post("/queue/claim-next").json()
+    assert second["queue_item_id"] != ap_id
+    assert client.post("/queue/claim-next").status_code == 404
+    assert client.get("/queue/").json()["total"] == 0
+
+def test_claim_next_skips_locked_rows(shared_db):
+    from sqlalchemy.dialects import postgresql
+    from app.api.queue import next_available_query
+
+    db = shared_db()
+    try:
+        sql = str(next_available_query(db, max_duration=300).statement.compile(dialect=postgresql.dialect()))
+    finally:
+        db.close()
+    assert sql.rstrip().endswith("FOR UPDATE SKIP LOCKED")
+    assert "ORDER BY audio_queue.uploaded_at, audio_queue.id" in sql
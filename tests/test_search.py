@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, JobStatus, Transcript, User
+from app.api.auth import get_current_user
+from app.services.search import search_index, highlight
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="search_user", username="searcher", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.add(User(id="other_user", username="other", is_admin=False))
+    db.commit()
+    db.close()
+    yield
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def add_job(job_id, transcript, user_id="search_user", status=JobStatus.COMPLETED, **ledger):
+    db = TestingSessionLocal()
+    job = Job(id=job_id, user_id=user_id, original_filename=f"{job_id}.mp3", storage_path=f"{job_id}.mp3",
+              status=status.value, **ledger)
+    db.add(job)
+    db.add(Transcript(job_id=job_id, text_content=transcript, json_metadata={"segments": []}))
+    db.flush()
+    search_index.index_job(db, job, transcript)
+    db.commit()
+    db.close()
+
+def test_search_ranks_and_highlights():
+    add_job("one", "Recours Martin. Le demandeur a quitté Kaboul en 2019.", client_name="Martin")
+    add_job("two", "OFPRA Diallo. Arrivée à Kaboul, puis Kaboul encore, Kaboul toujours.")
+    add_job("three", "Tribunal Nguyen. Rien à signaler.")
+
+    body = client.get("/jobs/search", params={"q": "kaboul"}).json()
+    assert [hit["job_id"] for hit in body["items"]] == ["two", "one"]
+    assert "<mark>Kaboul</mark>" in body["items"][0]["highlight"]
+    assert body["has_more"] is False and body["next_offset"] is None
+
+    # Ledger matches outrank transcript-only ones; accents are folded
+    add_job("four", "Martin a témoigné.")
+    ranked = client.get("/jobs/search", params={"q": "martin"}).json()["items"]
+    assert ranked[0]["job_id"] == "one"
+    assert client.get("/jobs/search", params={"q": "quitte"}).json()["items"][0]["highlight"].count("<mark>quitté</mark>") == 1
+
+def test_search_scoped_to_user_and_hides_trash():
+    add_job("mine", "audience prévue lundi")
+    add_job("theirs", "audience prévue mardi", user_id="other_user")
+    add_job("binned", "audience annulée", status=JobStatus.TRASHED)
+
+    items = client.get("/jobs/search", params={"q": "audience"}).json()["items"]
+    assert [hit["job_id"] for hit in items] == ["mine"]
+
+def test_search_paginates():
+    for i in range(5):
+        add_job(f"job{i}", f"dossier numéro {i}")
+    first = client.get("/jobs/search", params={"q": "dossier", "limit": 2}).json()
+    assert len(first["items"]) == 2 and first["has_more"] and first["next_offset"] == 2
+    last = client.get("/jobs/search", params={"q": "dossier", "limit": 2, "offset": 4}).json()
+    assert len(last["items"]) == 1 and not last["has_more"]
+
+def test_index_follows_edits_and_deletes():
+    add_job("edit", "texte original")
+    assert client.put("/jobs/edit/transcript", json={"text_content": "texte corrigé"}).status_code == 200
+    assert client.get("/jobs/search", params={"q": "original"}).json()["items"] == []
+    assert len(client.get("/jobs/search", params={"q": "corrige"}).json()["items"]) == 1
+
+    assert client.patch("/jobs/edit", json={"client_name": "Okafor"}).status_code == 200
+    assert client.get("/jobs/search", params={"q": "okafor"}).json()["items"][0]["job_id"] == "edit"
+
+    assert client.delete("/jobs/edit/permanent").status_code == 204
+    db = TestingSessionLocal()
+    assert db.execute(text("SELECT count(*) FROM job_search")).scalar() == 0
+    db.close()
+
+def test_highlight_escapes_html():
+    snippet = highlight("<b>Kaboul</b> & co", ["kaboul"])
+    assert snippet == "&lt;b&gt;<mark>Kaboul</mark>&lt;/b&gt; &amp; co"
@@ -0,0 +1,115 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, JobStatus, Transcript, TranscriptSegment, User
+from app.api.auth import get_current_user
+from app.services.transcript_store import transcript_store
+from app.services.transcript_segments import time_to_ms
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="segment_user", username="segments", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.commit()
+    db.close()
+    yield
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def add_job(job_id, text, metadata, through_store=True):
+    db = TestingSessionLocal()
+    db.add(Job(id=job_id, user_id="segment_user", original_filename=f"{job_id}.mp3",
+               storage_path=f"{job_id}.mp3", status=JobStatus.COMPLETED.value))
+    transcript = Transcript(job_id=job_id, text_content=text, json_metadata=metadata)
+    if through_store:
+        transcript_store.save(db, transcript, text, metadata)
+    db.add(transcript)
+    db.commit()
+    db.close()
+
+def timed_segments(count):
+    return [{"text": f"segment {i}.", "start": i * 5.0, "end": i * 5.0 + 5.0} for i in range(count)]
+
+def test_window_by_index_is_bounded():
+    segments = timed_segments(1000)
+    add_job("long", " ".join(s["text"] for s in segments), {"segments": segments})
+
+    first = client.get("/jobs/long/segments", params={"limit": 100}).json()
+    assert first["total"] == 1000
+    assert [s["index"] for s in first["items"]] == list(range(100))
+    assert first["items"][1] == {"index": 1, "start": 5.0, "end": 10.0, "text": "segment 1."}
+    assert first["next_offset"] == 100
+
+    last = client.get("/jobs/long/segments", params={"offset": 950, "limit": 100}).json()
+    assert len(last["items"]) == 50 and last["next_offset"] is None
+
+def test_seek_by_timestamp():
+    add_job("seek", "x", {"segments": timed_segments(100)})
+    window = client.get("/jobs/seek/segments", params={"at": 123.4, "limit": 3}).json()
+    # 123.4s falls in segment 24 (120s-125s)
+    assert window["offset"] == 24
+    assert [s["index"] for s in window["items"]] == [24, 25, 26]
+    assert client.get("/jobs/seek/segments", params={"at": 0}).json()["offset"] == 0
+
+def test_untimed_transcripts_page_by_paragraph():
+    add_job("plain", "Premier paragraphe.\n\nDeuxième paragraphe.\nTroisième.", {"segments": []})
+    items = client.get("/jobs/plain/segments").json()["items"]
+    assert [(s["text"], s["start"]) for s in items] == [
+        ("Premier paragraphe.", None), ("Deuxième paragraphe.", None), ("Troisième.", None)
+    ]
+
+def test_legacy_transcript_segmented_on_first_read():
+    add_job("legacy", "a", {"segments": [{"text": "a", "start": "00:01:00", "end": "--:--:--"}]}, through_store=False)
+    items = client.get("/jobs/legacy/segments").json()["items"]
+    assert items == [{"index": 0, "start": 60.0, "end": None, "text": "a"}]
+
+    db = TestingSessionLocal()
+    assert db.query(TranscriptSegment).filter(TranscriptSegment.job_id == "legacy").count() == 1
+    db.close()
+
+def test_edit_and_delete_keep_segments_in_sync():
+    add_job("edit", "un\ndeux", {"segments": []})
+    client.put("/jobs/edit/transcript", json={"text_content": "un\ndeux\ntrois"})
+    assert client.get("/jobs/edit/segments").json()["total"] == 3
+
+    assert client.delete("/jobs/edit/permanent").status_code == 204
+    db = TestingSessionLocal()
+    assert db.query(TranscriptSegment).count() == 0
+    db.close()
+
+def test_time_to_ms():
+    assert time_to_ms(1.5) == 1500
+    assert time_to_ms("01:02:03.5") == 3723500
+    assert time_to_ms("02:03") == 123000
+    assert time_to_ms("--:--:--") is None
@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+
+import boto3
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.config import settings
+from app.db.base import Base
+from app.services.storage import StorageService, storage_service
+
+
+class RecordingS3:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def head_bucket(self, Bucket):
+        self.calls.append(("head_bucket", Bucket))
+
+
+@pytest.fixture
+def s3_settings(monkeypatch):
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY_ID", "key")
+    monkeypatch.setattr(settings, "S3_SECRET_ACCESS_KEY", "secret")
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", "bucket")
+    calls = []
+
+    def client(*args, **kwargs):
+        calls.append(("client", args[0]))
+        return RecordingS3(calls)
+
+    monkeypatch.setattr(boto3, "client", client)
+    return calls
+
+
+def test_storage_connects_on_first_use(s3_settings):
+    service = StorageService()
+    assert s3_settings == []
+
+    assert service.mode == "S3"
+    assert s3_settings == [("client", "s3"), ("head_bucket", "bucket")]
+    assert service.s3_bucket_name == "bucket"
+    assert service.ready() is True
+    assert len(s3_settings) == 2
+
+
+def test_unconfigured_storage_is_not_ready(monkeypatch):
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY_ID", "")
+    monkeypatch.setattr(settings, "GCP_BUCKET_NAME", "")
+    service = StorageService()
+
+    assert service.ready() is False
+    with pytest.raises(RuntimeError):
+        service.mode
+    # Reads with a default (monkeypatch.setattr, hasattr) see an unset attribute
+    assert getattr(service, "mode", "unset") == "unset"
+    assert not hasattr(service, "mode")
+    # Nothing is cached, so the next use tries again
+    assert "mode" not in service.__dict__
+
+
+def test_ready_reports_dependencies(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(storage_service, "ready", lambda: True)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "checks": {"database": True, "storage": True}}
+
+    monkeypatch.setattr(storage_service, "ready", lambda: False)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["storage"] is False
+
+
+def test_lifespan_leaves_schema_to_alembic(monkeypatch):
+    warmed = []
+    monkeypatch.setattr(main, "warm_up", lambda: warmed.append(True))
+    monkeypatch.setattr(Base.metadata, "create_all", lambda *args, **kwargs: pytest.fail("create_all at startup"))
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200
+    assert warmed == [True]
+
+
+def test_heavy_dependencies_stay_out_of_startup():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, os.path.join(root, "scripts", "import_report.py"), "--top", "0"],
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "api: import app.main" in result.stdout and "worker: import app.workers.tasks" in result.stdout
@@ -0,0 +1,146 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import case, create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, JobStatus, User
+from app.api.auth import get_current_user
+from app.services.stats import stats_service
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="stats_user", username="counter", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.commit()
+    db.close()
+    yield
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def aggregate_daily_counts(db, user_id, start, end):
+    """The rollup's shape computed live from jobs in one GROUP BY (current statuses)."""
+    day = func.date(Job.created_at)
+    rows = db.query(
+        day.label("day"),
+        func.count(Job.id),
+        func.sum(case((Job.status == JobStatus.COMPLETED.value, 1), else_=0))
+    ).filter(
+        Job.user_id == user_id,
+        Job.created_at >= datetime.combine(start, datetime.min.time()),
+        Job.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    ).group_by(day).all()
+    # SQLite returns date() as text
+    counts = {date.fromisoformat(d): (uploaded, completed or 0) for d, uploaded, completed in rows}
+    return stats_service._fill_days(start, end, counts)
+
+def test_rollup_matches_grouped_aggregate():
+    today = datetime.now(timezone.utc).replace(tzinfo=None)
+    yesterday = today - timedelta(days=1)
+    db = TestingSessionLocal()
+    for created_at, status in [(today, JobStatus.COMPLETED), (today, JobStatus.UPLOADED), (yesterday, JobStatus.COMPLETED)]:
+        db.add(Job(user_id="stats_user", original_filename="a.mp3", storage_path="a.mp3",
+                   status=status.value, created_at=created_at))
+        stats_service.record_upload(db, "stats_user", created_at)
+        if status == JobStatus.COMPLETED:
+            stats_service.record_completion(db, "stats_user", created_at)
+    db.commit()
+
+    user = db.query(User).filter(User.id == "stats_user").one()
+    assert (user.total_uploads, user.total_completed) == (3, 2)
+
+    start, end = yesterday.date() - timedelta(days=5), today.date()
+    expected = aggregate_daily_counts(db, "stats_user", start, end)
+    db.close()
+
+    days = client.get("/jobs/stats/daily").json()
+    assert days == expected
+    assert len(days) == 7
+    assert (days[-1]["uploaded"], days[-1]["completed"]) == (2, 1)
+    assert (days[-2]["uploaded"], days[-2]["completed"]) == (1, 1)
+
+def test_custom_range_and_validation():
+    days = client.get("/jobs/stats/daily", params={"start": "2025-01-30", "end": "2025-02-02"}).json()
+    assert [d["date"] for d in days] == ["2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02"]
+    assert all(d["uploaded"] == 0 for d in days)
+
+    assert client.get("/jobs/stats/daily", params={"start": "2025-02-02", "end": "2025-01-30"}).status_code == 400
+    assert client.get("/jobs/stats/daily", params={"start": "2020-01-01", "end": "2025-01-01"}).status_code == 400
+
+def test_admin_user_totals_materialized_matches_live(monkeypatch):
+    from app.core.config import settings
+    from app.db.models import UserJobStat
+
+    app.dependency_overrides[get_current_user] = lambda: User(id="admin_id", username="admin", is_admin=True)
+    db = TestingSessionLocal()
+    db.add(User(id="admin_id", username="admin", is_admin=True))
+    kept = Job(user_id="stats_user", original_filename="a.mp3", storage_path="a.mp3", duration_seconds=120)
+    gone = Job(id="gone", user_id="stats_user", original_filename="b.mp3", storage_path="b.mp3",
+               duration_seconds=60, status=JobStatus.TRASHED.value)
+    db.add_all([kept, gone])
+    for job in (kept, gone):
+        stats_service.record_upload(db, job.user_id, duration_seconds=job.duration_seconds)
+    db.commit()
+    db.close()
+
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    assert client.delete("/jobs/gone/permanent").status_code == 204
+    app.dependency_overrides[get_current_user] = lambda: User(id="admin_id", username="admin", is_admin=True)
+
+    monkeypatch.setattr(settings, "ADMIN_USER_STATS_MATERIALIZED", True)
+    materialized = client.get("/admin/users").json()
+    monkeypatch.setattr(settings, "ADMIN_USER_STATS_MATERIALIZED", False)
+    live = client.get("/admin/users").json()
+
+    assert sorted(materialized, key=lambda u: u["username"]) == sorted(live, key=lambda u: u["username"])
+    counter = next(u for u in live if u["username"] == "counter")
+    assert (counter["upload_count"], counter["transcribed_minutes"]) == (1, 2.0)
+
+    # Rebuild reproduces the incrementally maintained totals
+    assert client.post("/admin/users/stats/rebuild").json()["users"] == 1
+    db = TestingSessionLocal()
+    assert db.query(UserJobStat).filter(UserJobStat.user_id == "stats_user").one().duration_seconds == 120
+    db.close()
+
+def test_repeat_completion_only_moves_duration():
+    db = TestingSessionLocal()
+    stats_service.record_upload(db, "stats_user", duration_seconds=0)
+    stats_service.record_completion(db, "stats_user", duration_delta=60)
+    # Reprocessed: the job is already counted, only its duration changes
+    stats_service.record_completion(db, "stats_user", duration_delta=30, first=False)
+    db.commit()
+
+    today = datetime.now(timezone.utc).date()
+    assert db.query(User).filter(User.id == "stats_user").one().total_completed == 1
+    assert stats_service.daily_counts(db, "stats_user", today, today)[0]["completed"] == 1
+    assert [row[4] for row in stats_service.user_totals(db) if row[0] == "counter"] == [90]
+    db.close()
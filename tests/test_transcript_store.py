@@ -0,0 +1,105 @@
+import gzip
+import io
+
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.db.models import Job, JobStatus, Transcript, User
+from app.api.auth import get_current_user, get_current_user_async
+from app.services.storage import storage_service
+from app.services.transcript_store import transcript_store
+
+def override_get_current_user():
+    return User(id="body_user", username="bodies", is_admin=False)
+
+client = TestClient(app)
+
+class FakeS3:
+    """put/get/delete for transcript bodies."""
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key, **kwargs):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+@pytest.fixture(autouse=True)
+def fake_bucket(shared_db, monkeypatch):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+
+    db = shared_db()
+    db.add(override_get_current_user())
+    db.commit()
+    db.close()
+
+    s3 = FakeS3()
+    monkeypatch.setattr(storage_service, "mode", "S3")
+    monkeypatch.setattr(storage_service, "s3_client", s3, raising=False)
+    monkeypatch.setattr(storage_service, "s3_bucket_name", "test-bucket", raising=False)
+    yield s3
+
+def add_transcript(Session, job_id, text, metadata=None):
+    db = Session()
+    db.add(Job(id=job_id, user_id="body_user", original_filename=f"{job_id}.mp3",
+               storage_path=f"{job_id}.mp3", status=JobStatus.COMPLETED.value))
+    transcript = Transcript(job_id=job_id)
+    transcript_store.save(db, transcript, text, metadata)
+    db.add(transcript)
+    db.commit()
+    db.close()
+
+def stored(Session, job_id):
+    db = Session()
+    row = db.query(Transcript).filter(Transcript.job_id == job_id).one()
+    values = (row.body_encoding, row.body_path, row.text_content, row.body_blob)
+    db.close()
+    return values
+
+def test_short_transcripts_stay_inline(shared_db):
+    add_transcript(shared_db, "short", "Recours Martin, bref.", {"segments": [{"text": "Recours Martin, bref."}]})
+    assert stored(shared_db, "short") == (None, None, "Recours Martin, bref.", None)
+    assert client.get("/jobs/short/transcript").json()["json_metadata"]["segments"][0]["text"] == "Recours Martin, bref."
+
+def test_long_transcript_compressed_inline_with_preview(shared_db):
+    text = " ".join(f"phrase{i}" for i in range(5000))
+    add_transcript(shared_db, "long", text, {"duration": 3600, "segments": [{"text": text}]})
+
+    encoding, path, preview, blob = stored(shared_db, "long")
+    assert (encoding, path) == ("gzip", None)
+    assert len(preview) <= settings.TRANSCRIPT_PREVIEW_CHARS + 1 and preview.endswith("…")
+    assert len(blob) < len(text)  # body and its segment copy, compressed
+
+    body = client.get("/jobs/long/transcript").json()
+    assert body["text_content"] == text
+    assert body["json_metadata"] == {"duration": 3600, "segments": [{"text": text}]}
+
+    docx = Document(io.BytesIO(client.get("/jobs/long/download").content))
+    assert docx.paragraphs[-1].text == text
+
+def test_very_large_transcript_offloaded_and_cleaned_up(fake_bucket, shared_db, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPT_OBJECT_MIN_BYTES", 1024)
+    text = " ".join(f"mot{i}" for i in range(20000))
+    add_transcript(shared_db, "huge", text)
+
+    encoding, path, _, blob = stored(shared_db, "huge")
+    assert path.startswith("transcripts/huge/") and blob is None
+    assert gzip.decompress(fake_bucket.objects[path]).decode().count("mot19999") == 1
+    assert client.get("/jobs/huge/transcript").json()["text_content"] == text
+
+    # An edit writes a new object and drops the old one
+    edited = text.replace("mot0 ", "début ", 1)
+    assert client.put("/jobs/huge/transcript", json={"text_content": edited}).json()["text_content"] == edited
+    new_path = stored(shared_db, "huge")[1]
+    assert new_path != path and list(fake_bucket.objects) == [new_path]
+
+    assert client.delete("/jobs/huge/permanent").status_code == 204
+    assert fake_bucket.objects == {}
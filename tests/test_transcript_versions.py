@@ -0,0 +1,139 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.models import Job, JobStatus, Transcript, TranscriptVersion, User
+from app.api.auth import get_current_user, get_current_user_async
+from app.services.transcript_store import transcript_store
+from app.workers import tasks
+
+def override_get_current_user():
+    return User(id="editor_user", username="editor", is_admin=False)
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db(shared_db, monkeypatch):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_current_user_async] = override_get_current_user
+
+    db = shared_db()
+    db.add(override_get_current_user())
+    db.add(Job(id="job", user_id="editor_user", original_filename="job.mp3",
+               storage_path="job.mp3", status=JobStatus.COMPLETED.value))
+    transcript = Transcript(job_id="job")
+    segments = [
+        {"text": "Bonjour madame.", "start": 0.0, "end": 2.0},
+        {"text": "Je suis arrive en France en 2019.", "start": 2.0, "end": 6.0},
+        {"text": "Merci.", "start": 6.0, "end": 7.0},
+    ]
+    transcript_store.save(db, transcript, " ".join(s["text"] for s in segments), {"duration": 7, "segments": segments})
+    db.add(transcript)
+    db.commit()
+    db.close()
+
+    scheduled = []
+    monkeypatch.setattr(tasks.refresh_transcript, "apply_async", lambda args, **kwargs: scheduled.append(args))
+    yield scheduled
+
+def patch(base_version, edits):
+    return client.patch("/jobs/job/transcript", json={"base_version": base_version, "edits": edits})
+
+def test_patch_touches_only_edited_segment(setup_db, shared_db):
+    response = patch(0, [{"index": 1, "ops": [{"start": 8, "end": 14, "text": "arrivé"}]}])
+    assert response.status_code == 200
+    assert response.json() == {
+        "version": 1,
+        "items": [{"index": 1, "start": 2.0, "end": 6.0, "text": "Je suis arrivé en France en 2019."}]
+    }
+    assert setup_db == [("job", 1)]
+
+    db = shared_db()
+    delta = db.query(TranscriptVersion).one().delta
+    # The stored delta is the changed span only, not the segment or the transcript
+    assert delta == {"ops": [{"index": 1, "start": 13, "end": 14, "text": "e"}]}
+    transcript = db.query(Transcript).one()
+    assert (transcript.version, transcript.body_version) == (1, 0)
+    db.close()
+
+    # Readers see the edit before the body is rewritten
+    body = client.get("/jobs/job/transcript").json()
+    assert body["text_content"] == "Bonjour madame. Je suis arrivé en France en 2019. Merci."
+    assert body["json_metadata"]["duration"] == 7
+
+def test_stale_base_version_conflicts():
+    assert patch(0, [{"index": 0, "text": "Bonjour monsieur."}]).status_code == 200
+    response = patch(0, [{"index": 2, "text": "Merci beaucoup."}])
+    assert response.status_code == 409
+    assert client.put("/jobs/job/transcript", json={"text_content": "x", "base_version": 0}).status_code == 409
+    assert client.get("/jobs/job/segments").json()["version"] == 1
+
+def test_invalid_edits_rejected_without_new_version():
+    assert patch(0, [{"index": 9, "text": "nope"}]).status_code == 400
+    assert patch(0, [{"index": 0, "ops": [{"start": 3, "end": 99, "text": ""}]}]).status_code == 400
+    assert patch(0, [{"index": 0}]).status_code == 400
+    assert client.get("/jobs/job/segments").json()["version"] == 0
+
+def test_old_versions_are_reconstructed():
+    patch(0, [{"index": 0, "text": "Bonjour monsieur."}])
+    patch(1, [{"index": 0, "ops": [{"start": 8, "end": 16, "text": "maître"}]}, {"index": 2, "text": "Merci bien."}])
+    client.put("/jobs/job/transcript", json={"text_content": "Texte réécrit."})
+
+    history = client.get("/jobs/job/transcript/versions").json()
+    assert [(v["version"], v["segments_changed"]) for v in history] == [(3, 3), (2, 2), (1, 1)]
+
+    expected = {
+        0: "Bonjour madame. Je suis arrive en France en 2019. Merci.",
+        1: "Bonjour monsieur. Je suis arrive en France en 2019. Merci.",
+        2: "Bonjour maître. Je suis arrive en France en 2019. Merci bien.",
+    }
+    for version, text in expected.items():
+        body = client.get(f"/jobs/job/transcript/versions/{version}").json()
+        assert body["text_content"] == text
+        assert body["segments"][1]["start"] == 2.0
+    assert client.get("/jobs/job/transcript/versions/3").json()["text_content"] == "Texte réécrit."
+    assert client.get("/jobs/job/transcript/versions/4").status_code == 404
+
+def test_refresh_folds_edits_into_body(shared_db, monkeypatch):
+    monkeypatch.setattr(tasks, "SessionLocal", shared_db)
+    patch(0, [{"index": 2, "text": "Merci infiniment."}])
+
+    tasks.refresh_transcript_file("job", 1)
+    db = shared_db()
+    transcript = db.query(Transcript).one()
+    assert transcript.body_version == 1
+    assert transcript.text_content.endswith("Merci infiniment.")
+    db.close()
+
+    # A refresh scheduled for an older version is a no-op once a newer edit exists
+    patch(1, [{"index": 0, "text": "Salut."}])
+    tasks.refresh_transcript_file("job", 1)
+    db = shared_db()
+    assert db.query(Transcript).one().body_version == 1
+    db.close()
+
+def test_full_text_save_keeps_segment_timings(shared_db):
+    text = "Bonjour madame, je suis arrivé en France en 2019. Merci. Au revoir."
+    response = client.put("/jobs/job/transcript", json={"text_content": text, "base_version": 0})
+    assert response.status_code == 200
+    assert response.json()["text_content"] == text
+
+    segments = client.get("/jobs/job/segments").json()
+    assert segments["version"] == 1
+    assert [(s["start"], s["end"], s["text"]) for s in segments["items"]] == [
+        (0.0, 2.0, "Bonjour madame,"),
+        (2.0, 6.0, "je suis arrivé en France en 2019."),
+        (6.0, 7.0, "Merci. Au revoir."),
+    ]
+    # Stored like a PATCH: reverse ops for the changed segments, no snapshot
+    db = shared_db()
+    assert db.query(TranscriptVersion).one().delta == {"ops": [
+        {"index": 0, "start": 14, "end": 15, "text": "."},
+        {"index": 1, "start": 0, "end": 14, "text": "Je suis arrive"},
+        {"index": 2, "start": 6, "end": 17, "text": ""},
+    ]}
+    assert db.query(Transcript).one().body_version == 1
+    db.close()
+    assert client.get("/jobs/job/transcript/versions/0").json()["text_content"] == (
+        "Bonjour madame. Je suis arrive en France en 2019. Merci."
+    )
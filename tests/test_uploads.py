@@ -0,0 +1,276 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base, get_db
+from app.db.models import Job, AudioQueueItem, StoredObject, UploadSession, User
+from app.api.auth import get_current_user
+from app.core.config import settings
+from app.services.storage import storage_service
+from app.workers import tasks
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return User(id="upload_user", username="uploader", is_admin=False)
+
+client = TestClient(app)
+
+class Received(list):
+    """Backend calls in order; .objects holds the completed bucket objects, .adopted the queued adopt_upload tasks."""
+
+@pytest.fixture(autouse=True)
+def setup_db(monkeypatch):
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(override_get_current_user())
+    db.commit()
+    db.close()
+
+    # Fake backend: records parts in memory instead of talking to a bucket
+    received = Received()
+    objects = {}
+    staged = {}
+    opened = iter(range(1, 1000))
+
+    def begin_multipart(filename, size, content_type=None):
+        number = next(opened)
+        return f"obj-{number}.wav", f"upload-{number}"
+
+    def upload_part(path, upload_id, part_number, data, offset, total):
+        received.append((part_number, offset, data))
+        staged.setdefault(path, []).append(data)
+        return f"etag-{part_number}"
+
+    def complete_multipart(path, upload_id, parts):
+        received.append(("complete", parts))
+        objects[path] = b"".join(staged.pop(path))
+
+    def abort_multipart(path, upload_id):
+        received.append(("abort", upload_id))
+        staged.pop(path, None)
+
+    monkeypatch.setattr(settings, "RESUMABLE_CHUNK_SIZE", 4)
+    monkeypatch.setattr(storage_service, "begin_multipart", begin_multipart)
+    monkeypatch.setattr(storage_service, "upload_part", upload_part)
+    monkeypatch.setattr(storage_service, "complete_multipart", complete_multipart)
+    monkeypatch.setattr(storage_service, "abort_multipart", abort_multipart)
+    monkeypatch.setattr(storage_service, "iter_object", lambda path, chunk_size=None: iter([objects[path]]))
+    monkeypatch.setattr(storage_service, "copy_object", lambda src, dst: objects.__setitem__(dst, objects[src]))
+    monkeypatch.setattr(storage_service, "delete_file", lambda path: objects.pop(path, None))
+    # The worker side of finalize runs inline against the test database
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(tasks.adopt_upload, "delay", lambda upload_id: received.adopted.append(upload_id))
+    monkeypatch.setattr(tasks.prepare_queue_item_media, "delay", lambda queue_item_id: None)
+    received.objects = objects
+    received.adopted = []
+    yield received
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+def finalize(upload_id):
+    """Finalize and run the queued adopt_upload task, as the worker would."""
+    finalized = client.post(f"/uploads/{upload_id}/finalize")
+    if finalized.status_code == 202:
+        assert finalized.json()["status"] == "PROCESSING"
+        tasks.adopt_upload_file(upload_id)
+        return client.get(f"/uploads/{upload_id}")
+    return finalized
+
+def send_chunk(upload_id, offset, data):
+    return client.patch(
+        f"/uploads/{upload_id}",
+        content=data,
+        headers={"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"},
+    )
+
+def test_resume_after_dropped_chunk_and_finalize_job(setup_db):
+    created = client.post("/uploads/", json={"filename": "hearing.wav", "size": 10, "target": "job"})
+    assert created.status_code == 201
+    upload_id = created.json()["id"]
+    assert created.json()["chunk_size"] == 4
+
+    assert send_chunk(upload_id, 0, b"RIFF").status_code == 200
+
+    # A retried/duplicate chunk at a stale offset is rejected; the client asks where to resume
+    assert send_chunk(upload_id, 0, b"RIFF").status_code == 409
+    status = client.get(f"/uploads/{upload_id}")
+    assert status.json()["offset"] == 4
+    assert status.headers["Upload-Offset"] == "4"
+
+    # Finalizing early is refused
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 409
+
+    assert send_chunk(upload_id, 4, b"abcd").status_code == 200
+    assert send_chunk(upload_id, 8, b"ef").json()["offset"] == 10
+
+    # All bytes stored: finalize hands hashing to the worker instead of re-reading the object in the request
+    finalized = client.post(f"/uploads/{upload_id}/finalize")
+    assert finalized.status_code == 202
+    assert finalized.json()["status"] == "PROCESSING" and finalized.json()["job_id"] is None
+    assert setup_db.adopted == [upload_id]
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 202
+
+    tasks.adopt_upload_file(upload_id)
+    finalized = client.get(f"/uploads/{upload_id}")
+    job_id = finalized.json()["job_id"]
+    assert finalized.json()["status"] == "COMPLETED"
+
+    # Only the missing bytes were sent, in order, then completed with every part ETag
+    assert [p[1] for p in setup_db[:3]] == [0, 4, 8]
+    assert setup_db[-1] == ("complete", [
+        {"PartNumber": 1, "ETag": "etag-1"},
+        {"PartNumber": 2, "ETag": "etag-2"},
+        {"PartNumber": 3, "ETag": "etag-3"},
+    ])
+
+    db = TestingSessionLocal()
+    job = db.query(Job).filter(Job.id == job_id).first()
+    # Hashed at finalize and moved to its content-addressed key
+    sha256 = hashlib.sha256(b"RIFFabcdef").hexdigest()
+    assert job.content_sha256 == sha256
+    assert job.storage_path == f"cas/{sha256[:2]}/{sha256}.wav"
+    assert set(setup_db.objects) == {job.storage_path}
+    assert db.query(StoredObject).filter(StoredObject.sha256 == sha256).one().ref_count == 1
+    assert job.file_size_bytes == 10
+    db.close()
+
+    # Finalize is idempotent
+    finalized = client.post(f"/uploads/{upload_id}/finalize")
+    assert finalized.status_code == 200 and finalized.json()["job_id"] == job_id
+
+def test_finalize_into_shared_queue():
+    upload_id = client.post("/uploads/", json={"filename": "ap.mp3", "size": 3, "target": "queue"}).json()["id"]
+    assert send_chunk(upload_id, 0, b"ID3").status_code == 200
+
+    finalized = finalize(upload_id).json()
+    db = TestingSessionLocal()
+    item = db.query(AudioQueueItem).filter(AudioQueueItem.id == finalized["queue_item_id"]).first()
+    assert item.mime_type == "audio/mpeg"
+    db.close()
+
+def test_short_middle_chunk_rejected():
+    upload_id = client.post("/uploads/", json={"filename": "a.wav", "size": 10}).json()["id"]
+    assert send_chunk(upload_id, 0, b"ab").status_code == 400
+
+def upload(data, filename="a.wav", **extra):
+    created = client.post("/uploads/", json={"filename": filename, "size": len(data), **extra}).json()
+    for offset in range(created["offset"], len(data), 4):
+        assert send_chunk(created["id"], offset, data[offset:offset + 4]).status_code == 200
+    return created, finalize(created["id"]).json()
+
+def test_identical_uploads_share_one_object(setup_db):
+    _, first = upload(b"same bytes")
+    _, second = upload(b"same bytes", filename="copy.wav")
+
+    db = TestingSessionLocal()
+    paths = {job.storage_path for job in db.query(Job).filter(Job.id.in_([first["job_id"], second["job_id"]]))}
+    assert len(paths) == 1
+    assert db.query(StoredObject).one().ref_count == 2
+    db.close()
+    # The second upload's staging object was dropped
+    assert set(setup_db.objects) == paths
+
+def test_declared_hash_only_skips_upload_for_own_content(setup_db, monkeypatch):
+    data = b"private recording"
+    sha256 = hashlib.sha256(data).hexdigest()
+    _, first = upload(data)
+
+    # Same user: known content, no bytes needed
+    created, finalized = upload(data, sha256=sha256)
+    assert created["offset"] == len(data)
+    assert finalized["status"] == "COMPLETED"
+    assert len([call for call in setup_db if call[0] == "complete"]) == 1
+
+    # Another user knowing the hash and size still has to send the bytes
+    db = TestingSessionLocal()
+    db.add(User(id="other_user", username="other", is_admin=False))
+    db.commit()
+    db.close()
+    app.dependency_overrides[get_current_user] = lambda: User(id="other_user", username="other", is_admin=False)
+    created = client.post("/uploads/", json={"filename": "x.wav", "size": len(data), "sha256": sha256}).json()
+    assert created["offset"] == 0
+    assert client.post(f"/uploads/{created['id']}/finalize").status_code == 409
+
+def test_failed_adoption_aborts_the_session(setup_db, monkeypatch):
+    upload_id = client.post("/uploads/", json={"filename": "a.wav", "size": 3}).json()["id"]
+    assert send_chunk(upload_id, 0, b"abc").status_code == 200
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 202
+
+    def unreadable(path, chunk_size=None):
+        raise IOError("bucket unavailable")
+    monkeypatch.setattr(storage_service, "iter_object", unreadable)
+    tasks.adopt_upload_file(upload_id)
+
+    assert client.get(f"/uploads/{upload_id}").json()["status"] == "ABORTED"
+    assert setup_db.objects == {}
+    db = TestingSessionLocal()
+    assert db.query(Job).count() == 0
+    db.close()
+
+def test_chunk_upload_runs_outside_the_row_lock(setup_db, monkeypatch):
+    upload_id = client.post("/uploads/", json={"filename": "a.wav", "size": 8}).json()["id"]
+    upload_part = storage_service.upload_part
+
+    def slow_upload_part(path, backend_id, part_number, data, offset, total):
+        # While this request writes to the bucket, a retry of the same chunk commits first
+        db = TestingSessionLocal()
+        db.query(UploadSession).filter(UploadSession.id == upload_id).update(
+            {UploadSession.offset: 4, UploadSession.parts: [{"PartNumber": 1, "ETag": "etag-retry"}]}
+        )
+        db.commit()
+        db.close()
+        return upload_part(path, backend_id, part_number, data, offset, total)
+    monkeypatch.setattr(storage_service, "upload_part", slow_upload_part)
+
+    # The slower request loses the compare-and-set instead of recording the chunk twice
+    late = send_chunk(upload_id, 0, b"RIFF")
+    assert late.status_code == 409
+    db = TestingSessionLocal()
+    session = db.query(UploadSession).filter(UploadSession.id == upload_id).one()
+    assert (session.offset, session.parts) == (4, [{"PartNumber": 1, "ETag": "etag-retry"}])
+    db.close()
+
+def test_stale_sessions_are_aborted(setup_db):
+    stale_id = client.post("/uploads/", json={"filename": "a.wav", "size": 8}).json()["id"]
+    fresh_id = client.post("/uploads/", json={"filename": "b.wav", "size": 8}).json()["id"]
+    assert send_chunk(stale_id, 0, b"RIFF").status_code == 200
+
+    db = TestingSessionLocal()
+    session = db.query(UploadSession).filter(UploadSession.id == stale_id).one()
+    backend_id = session.backend_upload_id
+    assert session.expires_at > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=settings.RESUMABLE_SESSION_TTL_HOURS - 1)
+    session.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db.commit()
+    db.close()
+
+    tasks.expire_upload_sessions()
+
+    assert setup_db[-1] == ("abort", backend_id)
+    assert client.get(f"/uploads/{stale_id}").json()["status"] == "ABORTED"
+    assert client.get(f"/uploads/{fresh_id}").json()["status"] == "ACTIVE"
+    assert send_chunk(stale_id, 4, b"abcd").status_code == 409